@@ -0,0 +1,38 @@
+"""
+Backends de Banco de Dados
+O DatabaseManager conversa com o banco por um cliente com a interface do
+Supabase; cada backend fornece esse cliente para um banco diferente
+"""
+
+from backends.base import Backend, ConsultaBase, RespostaConsulta
+from backends.memoria import BackendMemoria, ClienteMemoria
+from backends.remoto import BackendSupabase
+from backends.sqlite import BackendSQLite, ClienteSQLite
+from config import Config
+
+__all__ = [
+    'Backend', 'ConsultaBase', 'RespostaConsulta',
+    'BackendMemoria', 'ClienteMemoria',
+    'BackendSupabase',
+    'BackendSQLite', 'ClienteSQLite',
+    'criar_backend',
+]
+
+
+def criar_backend(nome: str) -> Backend:
+    """
+    Cria o backend pelo nome usado em Config.BACKEND
+
+    Args:
+        nome: "supabase", "sqlite" ou "memoria"
+
+    Returns:
+        Backend: Backend correspondente
+    """
+    if nome == "supabase":
+        return BackendSupabase()
+    if nome == "sqlite":
+        return BackendSQLite(Config.SQLITE_ARQUIVO)
+    if nome == "memoria":
+        return BackendMemoria()
+    raise ValueError(f"Backend desconhecido: {nome!r} (use supabase, sqlite ou memoria)")
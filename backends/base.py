@@ -0,0 +1,383 @@
+"""
+Interface dos Backends
+Contrato comum entre o DatabaseManager e os bancos suportados, e a base
+das consultas locais que imitam o construtor de consultas do PostgREST
+"""
+
+from typing import Optional, List, Dict, Any, Callable, Tuple, NamedTuple, Union
+from datetime import date
+from functools import lru_cache
+import re
+
+
+# Relações para os recursos embutidos: (tabela, embutida) -> (coluna local, coluna da embutida, muitos)
+RELACOES = {
+    ("instrutores", "unidades"): ("unidade_id", "id", False),
+    ("alunos", "instrutores"): ("instrutor_id", "id", False),
+    ("alunos", "unidades"): ("unidade_id", "id", False),
+    ("alunos", "acoes"): ("id", "aluno_id", True),
+    ("acoes", "alunos"): ("aluno_id", "id", False),
+    ("acoes", "instrutores"): ("instrutor_resp_id", "id", False),
+    ("logs", "instrutores"): ("instrutor_id", "id", False),
+    ("logs", "unidades"): ("unidade_id", "id", False),
+}
+
+# Colunas BOOLEAN do schema.sql
+COLUNAS_BOOLEANAS = {
+    "instrutores": {"ativo"},
+    "alunos": {"arquivado"},
+}
+
+# Unidades criadas pelo schema.sql
+UNIDADES_PADRAO = ["Ipiaú", "Irecê"]
+
+OPERADORES = ("eq", "neq", "gt", "gte", "lt", "lte", "is", "in", "ilike")
+
+_IDENTIFICADOR = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class RespostaConsulta(NamedTuple):
+    """Resposta no formato do cliente Supabase (data e count)"""
+
+    data: List[Dict[str, Any]]
+    count: Optional[int] = None
+
+
+class ChamadaLocal:
+    """Chamada rpc() de um cliente local: executa a função equivalente à do schema.sql"""
+
+    def __init__(self, funcao: Callable[..., Any], parametros: Dict[str, Any]):
+        self.funcao = funcao
+        self.parametros = parametros
+
+    def execute(self) -> RespostaConsulta:
+        # Como no PostgREST, uma função escalar devolve o valor em data
+        return RespostaConsulta(self.funcao(**self.parametros))
+
+
+class Condicao(NamedTuple):
+    """Filtro simples: coluna, operador do PostgREST e valor"""
+
+    coluna: str
+    operador: str
+    valor: Any
+
+
+class Logica(NamedTuple):
+    """Filtro lógico: condições unidas por "and" ou "or" """
+
+    juncao: str
+    condicoes: List[Union[Condicao, "Logica"]]
+
+
+class ItemSelect(NamedTuple):
+    """Item da lista de colunas de um select"""
+
+    # "todas" (*), "coluna" ou "embutido"
+    tipo: str
+    nome: str
+    # Somente recursos embutidos
+    tabela: Optional[str] = None
+    colunas: Optional[List[str]] = None
+    contagem: bool = False
+    interna: bool = False
+
+
+def identificador(nome: str) -> str:
+    """Valida o nome de uma tabela ou coluna"""
+    if not _IDENTIFICADOR.match(nome):
+        raise ValueError(f"Identificador inválido: {nome!r}")
+    return nome
+
+
+def dividir(texto: str, separador: str = ",") -> List[str]:
+    """Divide no separador de nível superior (fora de parênteses e aspas)"""
+    partes, atual, nivel, aspas, escape = [], [], 0, False, False
+    for caractere in texto:
+        if escape:
+            escape = False
+        elif caractere == "\\" and aspas:
+            escape = True
+        elif caractere == '"':
+            aspas = not aspas
+        elif not aspas and caractere == "(":
+            nivel += 1
+        elif not aspas and caractere == ")":
+            nivel -= 1
+        elif not aspas and nivel == 0 and caractere == separador:
+            partes.append("".join(atual).strip())
+            atual = []
+            continue
+        atual.append(caractere)
+    if "".join(atual).strip():
+        partes.append("".join(atual).strip())
+    return partes
+
+
+def _valor_texto(texto: str) -> Any:
+    """Converte o valor textual de um filtro lógico (or=...)"""
+    if texto.startswith('"') and texto.endswith('"'):
+        return re.sub(r"\\(.)", r"\1", texto[1:-1])
+    if texto in ("true", "false"):
+        return texto == "true"
+    if texto == "null":
+        return None
+    return texto
+
+
+# Acentos removidos pela normalização da busca (normalizar_busca do schema.sql)
+_SEM_ACENTOS = str.maketrans("áàâãäéèêëíìîïóòôõöúùûüçñ", "aaaaaeeeeiiiiooooouuuucn")
+
+# Semelhança mínima de uma busca aproximada (pg_trgm.word_similarity_threshold)
+LIMIAR_SEMELHANCA = 0.6
+
+
+def normalizar_busca(texto: Optional[str]) -> str:
+    """Texto em minúsculas e sem acentos, como normalizar_busca do schema.sql"""
+    return (texto or "").lower().translate(_SEM_ACENTOS)
+
+
+@lru_cache(maxsize=65536)
+def _trigramas(texto: str) -> frozenset:
+    """
+    Trigramas de cada palavra, como o pg_trgm (dois espaços antes e um
+    depois); guardados por texto, pois cada busca compara os mesmos alunos
+    """
+    trigramas = set()
+    for palavra in re.findall(r"\w+", texto):
+        palavra = f"  {palavra} "
+        trigramas.update(palavra[i:i + 3] for i in range(len(palavra) - 2))
+    return frozenset(trigramas)
+
+
+def _semelhanca(termo: str, texto: str) -> float:
+    """Fração dos trigramas do termo presentes no texto (aproxima word_similarity)"""
+    trigramas_termo = _trigramas(termo)
+    if not trigramas_termo:
+        return 0.0
+    return len(trigramas_termo & _trigramas(texto)) / len(trigramas_termo)
+
+
+def relevancia_busca(termo: str, nome: Optional[str], curso: Optional[str],
+                     observacoes: Optional[str]) -> Optional[float]:
+    """
+    Relevância de um aluno para um termo já normalizado, com os mesmos
+    critérios da função buscar_alunos do schema.sql
+
+    Returns:
+        float: Relevância (maior primeiro), ou None se o aluno não corresponde
+    """
+    nome_normalizado = normalizar_busca(nome)
+    texto = normalizar_busca(f"{nome or ''} {curso or ''} {observacoes or ''}")
+    semelhanca = _semelhanca(termo, texto)
+    if termo not in texto and semelhanca < LIMIAR_SEMELHANCA:
+        return None
+
+    if nome_normalizado.startswith(termo):
+        bonus = 2
+    elif termo in nome_normalizado:
+        bonus = 1
+    else:
+        bonus = 0
+    return bonus + _semelhanca(termo, nome_normalizado) + semelhanca
+
+
+def inicio_retencao_logs(meses_retidos: int, hoje: Optional[date] = None) -> str:
+    """
+    Primeiro dia retido pela retenção de logs (reter_logs do schema.sql):
+    o início do mês atual recuado meses_retidos meses
+
+    Returns:
+        str: Data ISO (AAAA-MM-DD), comparável às colunas de data e hora
+    """
+    hoje = hoje or date.today()
+    meses = hoje.year * 12 + hoje.month - 1 - meses_retidos
+    return date(meses // 12, meses % 12 + 1, 1).isoformat()
+
+
+class Backend:
+    """
+    Banco de dados usado pelo DatabaseManager (interface)
+
+    criar_cliente() devolve um objeto com table(nome), que monta consultas
+    com a interface do cliente Supabase (select/eq/.../execute).
+    """
+
+    # Nome usado em Config.BACKEND
+    nome = ""
+    # True quando outros computadores alteram os mesmos dados (tempo real e réplica fazem sentido)
+    remoto = False
+
+    def validar(self) -> Tuple[bool, str]:
+        """Verifica a configuração antes de conectar"""
+        return True, "Configuração válida"
+
+    def criar_cliente(self):
+        raise NotImplementedError
+
+    def encerrar(self):
+        pass
+
+
+class ConsultaBase:
+    """
+    Consulta montada em cadeia, como o construtor de consultas do PostgREST
+
+    Guarda a operação, as colunas, os filtros e a ordenação em uma forma
+    neutra; cada backend local implementa a execução. Suporta o subconjunto
+    usado pelo aplicativo: select com colunas, colunas calculadas e recursos
+    embutidos (inclusive agregados count), filtros eq/neq/gt/gte/lt/lte/is_/
+    in_/ilike, filtros lógicos (or_), order, limit, insert, upsert, update e
+    delete.
+    """
+
+    def __init__(self, tabela: str):
+        self.tabela = identificador(tabela)
+        self.operacao = "select"
+        self.colunas = "*"
+        self.contar = False
+        self.dados: Any = None
+        self.conflito = "id"
+        self.filtros: List[Union[Condicao, Logica]] = []
+        self.filtros_embutidos: Dict[str, List[Condicao]] = {}
+        self.ordem: List[Tuple[str, bool]] = []
+        self.limite: Optional[int] = None
+
+    # ============================================
+    # OPERAÇÕES
+    # ============================================
+
+    def select(self, colunas: str = "*", count: Optional[str] = None):
+        self.operacao = "select"
+        self.colunas = colunas
+        self.contar = count is not None
+        return self
+
+    def insert(self, dados: Any):
+        self.operacao = "insert"
+        self.dados = dados
+        return self
+
+    def upsert(self, dados: Any, on_conflict: str = "id"):
+        self.operacao = "upsert"
+        self.dados = dados
+        self.conflito = identificador(on_conflict)
+        return self
+
+    def update(self, dados: Dict[str, Any]):
+        self.operacao = "update"
+        self.dados = dados
+        return self
+
+    def delete(self):
+        self.operacao = "delete"
+        return self
+
+    # ============================================
+    # FILTROS
+    # ============================================
+
+    def _filtrar(self, coluna: str, operador: str, valor: Any):
+        """Adiciona um filtro; 'embutida.coluna' filtra o recurso embutido"""
+        if "." in coluna:
+            embutida, coluna = coluna.split(".", 1)
+            self.filtros_embutidos.setdefault(embutida, []).append(
+                Condicao(identificador(coluna), operador, valor)
+            )
+        else:
+            self.filtros.append(Condicao(identificador(coluna), operador, valor))
+        return self
+
+    def eq(self, coluna: str, valor: Any):
+        return self._filtrar(coluna, "eq", valor)
+
+    def neq(self, coluna: str, valor: Any):
+        return self._filtrar(coluna, "neq", valor)
+
+    def gt(self, coluna: str, valor: Any):
+        return self._filtrar(coluna, "gt", valor)
+
+    def gte(self, coluna: str, valor: Any):
+        return self._filtrar(coluna, "gte", valor)
+
+    def lt(self, coluna: str, valor: Any):
+        return self._filtrar(coluna, "lt", valor)
+
+    def lte(self, coluna: str, valor: Any):
+        return self._filtrar(coluna, "lte", valor)
+
+    def ilike(self, coluna: str, padrao: str):
+        return self._filtrar(coluna, "ilike", padrao)
+
+    def is_(self, coluna: str, valor: Any):
+        if valor == "null":
+            valor = None
+        elif valor in ("true", "false"):
+            valor = valor == "true"
+        return self._filtrar(coluna, "is", valor)
+
+    def in_(self, coluna: str, valores: List[Any]):
+        return self._filtrar(coluna, "in", list(valores))
+
+    def or_(self, filtros: str):
+        """Filtro lógico do PostgREST, ex.: 'nome.gt.\"Ana\",and(nome.eq.\"Ana\",id.gt.3)'"""
+        self.filtros.append(self._analisar_logica(filtros, "or"))
+        return self
+
+    def _analisar_logica(self, texto: str, juncao: str) -> Logica:
+        """Converte uma lista de condições do PostgREST em Logica"""
+        condicoes = []
+        for condicao in dividir(texto):
+            for operador in ("and", "or"):
+                if condicao.startswith(f"{operador}(") and condicao.endswith(")"):
+                    condicoes.append(self._analisar_logica(condicao[len(operador) + 1:-1], operador))
+                    break
+            else:
+                coluna, operador, valor = condicao.split(".", 2)
+                if operador not in OPERADORES:
+                    raise ValueError(f"Operador não suportado: {operador}")
+                if operador == "in":
+                    valor = [_valor_texto(v) for v in dividir(valor.strip("()"))]
+                else:
+                    valor = _valor_texto(valor)
+                condicoes.append(Condicao(identificador(coluna), operador, valor))
+        return Logica(juncao, condicoes)
+
+    def order(self, coluna: str, desc: bool = False):
+        self.ordem.append((identificador(coluna), desc))
+        return self
+
+    def limit(self, limite: int):
+        self.limite = int(limite)
+        return self
+
+    # ============================================
+    # EXECUÇÃO
+    # ============================================
+
+    def _itens_select(self) -> List[ItemSelect]:
+        """Interpreta a lista de colunas do select"""
+        itens = []
+        for item in dividir(self.colunas):
+            if item == "*":
+                itens.append(ItemSelect("todas", "*"))
+            elif "(" in item:
+                nome, colunas = item[:-1].split("(", 1)
+                apelido = None
+                if ":" in nome:
+                    apelido, nome = nome.split(":", 1)
+                interna = nome.endswith("!inner")
+                tabela = identificador(nome.replace("!inner", ""))
+                if (self.tabela, tabela) not in RELACOES:
+                    raise ValueError(f"Relação não suportada: {self.tabela} -> {tabela}")
+                colunas = [c.strip() for c in colunas.split(",")]
+                itens.append(ItemSelect(
+                    "embutido", identificador(apelido or tabela), tabela,
+                    colunas, colunas == ["count"], interna
+                ))
+            else:
+                itens.append(ItemSelect("coluna", identificador(item)))
+        return itens
+
+    def execute(self) -> RespostaConsulta:
+        raise NotImplementedError
@@ -0,0 +1,451 @@
+"""
+Backend em Memória
+Banco mantido em dicionários Python, sem arquivo nem rede: usado em
+testes e em medições de desempenho reproduzíveis
+"""
+
+from typing import Optional, List, Dict, Any, Callable, Union
+from datetime import datetime, date, timezone
+from backends.base import (
+    Backend, ChamadaLocal, ConsultaBase, Condicao, Logica, RespostaConsulta,
+    RELACOES, UNIDADES_PADRAO, identificador, inicio_retencao_logs,
+    normalizar_busca, relevancia_busca
+)
+import copy
+import re
+import threading
+
+
+def agora() -> str:
+    """Instante atual (UTC) no mesmo formato das colunas de data e hora do SQLite"""
+    return datetime.now(timezone.utc).replace(tzinfo=None).isoformat(timespec="milliseconds")
+
+
+def _hoje() -> str:
+    return date.today().isoformat()
+
+
+# Colunas de cada tabela com o valor padrão (funções são chamadas a cada inserção)
+ESQUEMA_MEMORIA: Dict[str, Dict[str, Any]] = {
+    "unidades": {"id": None, "nome": None, "criado_em": agora},
+    "instrutores": {
+        "id": None, "nome": None, "unidade_id": None, "ativo": True,
+        "criado_em": agora, "atualizado_em": agora,
+    },
+    "alunos": {
+        "id": None, "nome": None, "data_inicio": None, "curso_matriculado": None,
+        "tipo_plano": None, "modulo": None, "aulas": None, "dia_horario": None,
+        "situacao_academica": None, "observacoes": None, "pagamento_parcelas": None,
+        "instrutor_id": None, "unidade_id": None, "arquivado": False, "acoes_pendentes": 0,
+        "criado_em": agora, "atualizado_em": agora,
+    },
+    "acoes": {
+        "id": None, "aluno_id": None, "acao_proposta": None, "status": "Pendente",
+        "instrutor_resp_id": None, "data_proposta": _hoje, "data_conclusao": None,
+        "criado_em": agora, "atualizado_em": agora,
+    },
+    "logs": {"id": None, "instrutor_id": None, "atividade": None, "data_hora": agora, "unidade_id": None},
+    "logs_resumo_diario": {
+        "id": None, "dia": None, "unidade_id": None, "instrutor_id": None, "instrutor_nome": None,
+        "quantidade": None, "primeira_atividade": None, "ultima_atividade": None,
+    },
+    "registros_excluidos": {
+        "id": None, "tabela": None, "registro_id": None, "unidade_id": None, "excluido_em": agora,
+    },
+}
+
+
+# Colunas NOT NULL do schema.sql (além das que têm valor padrão)
+OBRIGATORIAS: Dict[str, set] = {
+    "unidades": {"nome"},
+    "instrutores": {"nome", "unidade_id"},
+    "alunos": {"nome", "data_inicio", "curso_matriculado", "tipo_plano", "situacao_academica", "unidade_id"},
+    "acoes": {"aluno_id", "acao_proposta", "status", "data_proposta"},
+    "logs": {"atividade"},
+    "logs_resumo_diario": {"dia", "quantidade"},
+    "registros_excluidos": {"tabela", "registro_id"},
+}
+
+
+def _validar_obrigatorias(tabela: str, linha: Dict[str, Any]):
+    for coluna in OBRIGATORIAS[tabela]:
+        if linha.get(coluna) is None:
+            raise ValueError(f"Valor nulo em coluna obrigatória: {tabela}.{coluna}")
+
+
+def _observacoes_resumo(aluno: Dict[str, Any]) -> Optional[str]:
+    observacoes = aluno.get('observacoes')
+    if observacoes and len(observacoes) > 50:
+        return observacoes[:47] + "..."
+    return observacoes
+
+
+# Colunas calculadas que o PostgREST expõe por funções do schema.sql
+COLUNAS_CALCULADAS: Dict[tuple, Callable[[Dict[str, Any]], Any]] = {
+    ("alunos", "observacoes_resumo"): _observacoes_resumo,
+}
+
+
+def _chave(valor: Any) -> Any:
+    """Chave de comparação e ordenação (textos sem diferenciar maiúsculas)"""
+    if isinstance(valor, str):
+        return valor.casefold()
+    return valor
+
+
+def _alinhar(valor_linha: Any, valor: Any) -> Any:
+    """Converte o valor textual de um filtro lógico para o tipo da coluna"""
+    if isinstance(valor, str) and not isinstance(valor_linha, str):
+        try:
+            if isinstance(valor_linha, bool):
+                return valor == "true"
+            if isinstance(valor_linha, (int, float)):
+                return type(valor_linha)(valor)
+        except ValueError:
+            pass
+    return valor
+
+
+def _avaliar(filtro: Union[Condicao, Logica], linha: Dict[str, Any]) -> bool:
+    """Avalia um filtro em uma linha, com a semântica de NULL do SQL"""
+    if isinstance(filtro, Logica):
+        resultados = (_avaliar(condicao, linha) for condicao in filtro.condicoes)
+        return all(resultados) if filtro.juncao == "and" else any(resultados)
+
+    valor_linha = linha.get(filtro.coluna)
+    if filtro.operador == "is":
+        if filtro.valor is None:
+            return valor_linha is None
+        return valor_linha is not None and bool(valor_linha) == bool(filtro.valor)
+    if valor_linha is None:
+        return False
+    if filtro.operador == "in":
+        return any(_chave(valor_linha) == _chave(_alinhar(valor_linha, v)) for v in filtro.valor)
+    if filtro.operador == "ilike":
+        padrao = re.escape(filtro.valor).replace(r"\*", ".*").replace("%", ".*").replace("_", ".")
+        return re.fullmatch(padrao, str(valor_linha), re.IGNORECASE | re.DOTALL) is not None
+
+    a, b = _chave(valor_linha), _chave(_alinhar(valor_linha, filtro.valor))
+    if filtro.operador == "eq":
+        return a == b
+    if filtro.operador == "neq":
+        return a != b
+    if filtro.operador == "gt":
+        return a > b
+    if filtro.operador == "gte":
+        return a >= b
+    if filtro.operador == "lt":
+        return a < b
+    if filtro.operador == "lte":
+        return a <= b
+    raise ValueError(f"Operador não suportado: {filtro.operador}")
+
+
+class ConsultaMemoria(ConsultaBase):
+    """Consulta executada nos dicionários do ClienteMemoria"""
+
+    def __init__(self, cliente: "ClienteMemoria", tabela: str):
+        super().__init__(tabela)
+        self.cliente = cliente
+        if tabela not in cliente.tabelas:
+            raise ValueError(f"Tabela inexistente: {tabela}")
+
+    def execute(self) -> RespostaConsulta:
+        with self.cliente.lock:
+            if self.operacao == "select":
+                return self._executar_select()
+            if self.operacao in ("insert", "upsert"):
+                return self._executar_insercao()
+            return self._executar_alteracao()
+
+    def _filtradas(self) -> List[Dict[str, Any]]:
+        return [
+            linha for linha in self.cliente.tabelas[self.tabela].values()
+            if all(_avaliar(filtro, linha) for filtro in self.filtros)
+        ]
+
+    def _executar_select(self) -> RespostaConsulta:
+        itens = self._itens_select()
+        linhas = self._filtradas()
+
+        # Cada recurso embutido é indexado uma vez por consulta
+        indices = {item.nome: self._indexar_embutido(item) for item in itens if item.tipo == "embutido"}
+
+        registros = []
+        for linha in linhas:
+            registro = {}
+            descartar = False
+            for item in itens:
+                if item.tipo == "todas":
+                    registro.update(copy.deepcopy(linha))
+                elif item.tipo == "coluna":
+                    calculada = COLUNAS_CALCULADAS.get((self.tabela, item.nome))
+                    registro[item.nome] = calculada(linha) if calculada else copy.deepcopy(linha.get(item.nome))
+                else:
+                    valor = self._valor_embutido(item, indices[item.nome], linha)
+                    if item.interna and not valor:
+                        descartar = True
+                    registro[item.nome] = valor
+            if not descartar:
+                registros.append((linha, registro))
+
+        total = len(registros) if self.contar else None
+
+        for coluna, desc in reversed(self.ordem):
+            # NULLS LAST em ordem crescente e NULLS FIRST em decrescente, como no PostgreSQL
+            def chave(par, coluna=coluna):
+                valor = par[0].get(coluna)
+                return (valor is None, _chave(valor) if valor is not None else 0)
+            registros.sort(key=chave, reverse=desc)
+
+        if self.limite is not None:
+            registros = registros[:self.limite]
+        return RespostaConsulta([registro for _, registro in registros], total)
+
+    def _indexar_embutido(self, item) -> Dict[Any, List[Dict[str, Any]]]:
+        """Agrupa as linhas da tabela embutida pela coluna da relação"""
+        _, coluna_embutida, _ = RELACOES[(self.tabela, item.tabela)]
+        filtros = self.filtros_embutidos.get(item.nome, [])
+        indice: Dict[Any, List[Dict[str, Any]]] = {}
+        for linha in self.cliente.tabelas[item.tabela].values():
+            if all(_avaliar(filtro, linha) for filtro in filtros):
+                indice.setdefault(linha.get(coluna_embutida), []).append(linha)
+        return indice
+
+    def _valor_embutido(self, item, indice: Dict[Any, List[Dict[str, Any]]], linha: Dict[str, Any]) -> Any:
+        coluna_local, _, muitos = RELACOES[(self.tabela, item.tabela)]
+        relacionadas = indice.get(linha.get(coluna_local), []) if linha.get(coluna_local) is not None else []
+
+        if item.contagem:
+            return [{"count": len(relacionadas)}]
+
+        def projetar(relacionada):
+            if item.colunas == ["*"]:
+                return copy.deepcopy(relacionada)
+            return {c: copy.deepcopy(relacionada.get(c)) for c in item.colunas}
+
+        if muitos:
+            return [projetar(r) for r in relacionadas]
+        return projetar(relacionadas[0]) if relacionadas else None
+
+    def _executar_insercao(self) -> RespostaConsulta:
+        registros = self.dados if isinstance(self.dados, list) else [self.dados]
+        tabela = self.cliente.tabelas[self.tabela]
+        esquema = ESQUEMA_MEMORIA[self.tabela]
+        inseridos = []
+
+        for registro in registros:
+            for coluna in registro:
+                if coluna not in esquema:
+                    raise ValueError(f"Coluna inexistente: {self.tabela}.{coluna}")
+
+            existente = None
+            if self.operacao == "upsert":
+                existente = next(
+                    (l for l in tabela.values() if l.get(self.conflito) == registro.get(self.conflito)),
+                    None
+                )
+            if existente is not None:
+                _validar_obrigatorias(self.tabela, {**existente, **registro})
+                anterior = dict(existente)
+                existente.update(copy.deepcopy(registro))
+                inseridos.append(copy.deepcopy(existente))
+                self.cliente.apos_alterar(self.tabela, anterior, existente)
+                continue
+
+            linha = {c: (v() if callable(v) else v) for c, v in esquema.items()}
+            linha.update(copy.deepcopy(registro))
+            _validar_obrigatorias(self.tabela, linha)
+            if linha["id"] is None:
+                linha["id"] = self.cliente.proximo_id(self.tabela)
+            elif linha["id"] in tabela:
+                raise ValueError(f"Chave duplicada: {self.tabela}.id = {linha['id']}")
+            else:
+                self.cliente.reservar_id(self.tabela, linha["id"])
+            tabela[linha["id"]] = linha
+            inseridos.append(copy.deepcopy(linha))
+            self.cliente.apos_inserir(self.tabela, linha)
+        return RespostaConsulta(inseridos)
+
+    def _executar_alteracao(self) -> RespostaConsulta:
+        tabela = self.cliente.tabelas[self.tabela]
+        alteradas = []
+        for linha in self._filtradas():
+            if self.operacao == "update":
+                _validar_obrigatorias(self.tabela, {**linha, **self.dados})
+                anterior = dict(linha)
+                linha.update(copy.deepcopy(self.dados))
+                if "atualizado_em" in linha and "atualizado_em" not in self.dados:
+                    linha["atualizado_em"] = agora()
+                self.cliente.apos_alterar(self.tabela, anterior, linha)
+            else:
+                del tabela[linha["id"]]
+                self.cliente.apos_excluir(self.tabela, linha)
+            alteradas.append(copy.deepcopy(linha))
+        return RespostaConsulta(alteradas)
+
+
+class ClienteMemoria:
+    """
+    Banco em memória com a interface de consultas do cliente Supabase
+
+    Reproduz os triggers do schema.sql usados pela sincronização
+    incremental (atualizado_em, registros_excluidos e o toque no aluno
+    quando suas ações mudam) e o contador alunos.acoes_pendentes.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.tabelas: Dict[str, Dict[int, Dict[str, Any]]] = {nome: {} for nome in ESQUEMA_MEMORIA}
+        self._ultimo_id: Dict[str, int] = {nome: 0 for nome in ESQUEMA_MEMORIA}
+
+    def table(self, nome: str) -> ConsultaMemoria:
+        """Inicia uma consulta na tabela"""
+        return ConsultaMemoria(self, identificador(nome))
+
+    def proximo_id(self, tabela: str) -> int:
+        self._ultimo_id[tabela] += 1
+        return self._ultimo_id[tabela]
+
+    def reservar_id(self, tabela: str, registro_id: int):
+        self._ultimo_id[tabela] = max(self._ultimo_id[tabela], registro_id)
+
+    def criar_unidades_padrao(self):
+        """Cria as unidades padrão do schema.sql (sem efeito se já existirem)"""
+        with self.lock:
+            existentes = {u["nome"] for u in self.tabelas["unidades"].values()}
+            for nome in UNIDADES_PADRAO:
+                if nome not in existentes:
+                    self.table("unidades").insert({"nome": nome}).execute()
+
+    # ============================================
+    # TRIGGERS
+    # ============================================
+
+    def _tocar_alunos(self, *aluno_ids: Optional[int]):
+        instante = agora()
+        for aluno_id in set(aluno_ids):
+            aluno = self.tabelas["alunos"].get(aluno_id)
+            if aluno is not None:
+                aluno["atualizado_em"] = instante
+
+    def _contar_pendente(self, acao: Dict[str, Any], sinal: int):
+        aluno = self.tabelas["alunos"].get(acao["aluno_id"])
+        if aluno is not None and acao.get("status") == "Pendente":
+            aluno["acoes_pendentes"] += sinal
+
+    def apos_inserir(self, tabela: str, linha: Dict[str, Any]):
+        if tabela == "acoes":
+            self._tocar_alunos(linha["aluno_id"])
+            self._contar_pendente(linha, 1)
+
+    def apos_alterar(self, tabela: str, anterior: Dict[str, Any], linha: Dict[str, Any]):
+        if tabela == "acoes":
+            self._tocar_alunos(anterior["aluno_id"], linha["aluno_id"])
+            self._contar_pendente(anterior, -1)
+            self._contar_pendente(linha, 1)
+
+    def apos_excluir(self, tabela: str, linha: Dict[str, Any]):
+        if tabela == "alunos":
+            self.table("registros_excluidos").insert({
+                "tabela": "alunos", "registro_id": linha["id"], "unidade_id": linha["unidade_id"]
+            }).execute()
+        elif tabela == "acoes":
+            self._tocar_alunos(linha["aluno_id"])
+            self._contar_pendente(linha, -1)
+
+    # ============================================
+    # FUNÇÕES (RPC)
+    # ============================================
+
+    def rpc(self, funcao: str, parametros: Optional[Dict[str, Any]] = None) -> ChamadaLocal:
+        """Chama uma das funções do schema.sql implementadas localmente"""
+        funcoes = {
+            "buscar_alunos": self.buscar_alunos,
+            "reconciliar_acoes_pendentes": self.reconciliar_acoes_pendentes,
+            "reter_logs": self.reter_logs,
+        }
+        if funcao not in funcoes:
+            raise ValueError(f"Função desconhecida: {funcao}")
+        return ChamadaLocal(funcoes[funcao], parametros or {})
+
+    def buscar_alunos(self, p_unidade_id: int, p_termo: str, p_incluir_arquivados: bool = False,
+                      p_limite: int = 50, p_deslocamento: int = 0) -> List[Dict[str, Any]]:
+        """Busca aproximada de alunos; devolve os ids com a relevância, da mais alta para a mais baixa"""
+        termo = normalizar_busca(p_termo)
+        with self.lock:
+            encontrados = []
+            for aluno in self.tabelas["alunos"].values():
+                if aluno["unidade_id"] != p_unidade_id or (aluno["arquivado"] and not p_incluir_arquivados):
+                    continue
+                relevancia = relevancia_busca(
+                    termo, aluno["nome"], aluno.get("curso_matriculado"), aluno.get("observacoes")
+                )
+                if relevancia is not None:
+                    encontrados.append((-relevancia, aluno["nome"].lower(), aluno["id"]))
+        encontrados.sort()
+        return [
+            {"aluno_id": aluno_id, "relevancia": -relevancia}
+            for relevancia, _, aluno_id in encontrados[p_deslocamento:p_deslocamento + p_limite]
+        ]
+
+    def reconciliar_acoes_pendentes(self, p_unidade_id: Optional[int] = None) -> int:
+        """Recalcula alunos.acoes_pendentes e devolve quantos alunos foram corrigidos"""
+        with self.lock:
+            pendentes: Dict[int, int] = {}
+            for acao in self.tabelas["acoes"].values():
+                if acao["status"] == "Pendente":
+                    pendentes[acao["aluno_id"]] = pendentes.get(acao["aluno_id"], 0) + 1
+
+            corrigidos = 0
+            for aluno in self.tabelas["alunos"].values():
+                if p_unidade_id is not None and aluno["unidade_id"] != p_unidade_id:
+                    continue
+                if aluno["acoes_pendentes"] != pendentes.get(aluno["id"], 0):
+                    aluno["acoes_pendentes"] = pendentes.get(aluno["id"], 0)
+                    aluno["atualizado_em"] = agora()
+                    corrigidos += 1
+            return corrigidos
+
+    def reter_logs(self, p_meses_retidos: int = 12) -> int:
+        """Resume por dia e remove os logs anteriores ao período retido; devolve quantos foram resumidos"""
+        limite = inicio_retencao_logs(p_meses_retidos)
+        with self.lock:
+            antigos = [log for log in self.tabelas["logs"].values() if (log["data_hora"] or "") < limite]
+            resumos = {
+                (r["dia"], r["unidade_id"], r["instrutor_id"]): r
+                for r in self.tabelas["logs_resumo_diario"].values()
+            }
+            for log in antigos:
+                chave = (log["data_hora"][:10], log["unidade_id"], log["instrutor_id"])
+                instrutor = self.tabelas["instrutores"].get(log["instrutor_id"]) or {}
+                resumo = resumos.get(chave)
+                if resumo is None:
+                    resumo = resumos[chave] = {
+                        "id": self.proximo_id("logs_resumo_diario"), "dia": chave[0],
+                        "unidade_id": chave[1], "instrutor_id": chave[2], "instrutor_nome": None,
+                        "quantidade": 0, "primeira_atividade": log["data_hora"],
+                        "ultima_atividade": log["data_hora"],
+                    }
+                    self.tabelas["logs_resumo_diario"][resumo["id"]] = resumo
+                resumo["quantidade"] += 1
+                resumo["instrutor_nome"] = instrutor.get("nome") or resumo["instrutor_nome"]
+                resumo["primeira_atividade"] = min(resumo["primeira_atividade"], log["data_hora"])
+                resumo["ultima_atividade"] = max(resumo["ultima_atividade"], log["data_hora"])
+                del self.tabelas["logs"][log["id"]]
+            return len(antigos)
+
+
+class BackendMemoria(Backend):
+    """Banco em memória (os dados se perdem ao fechar o aplicativo)"""
+
+    nome = "memoria"
+
+    def __init__(self):
+        self.cliente: Optional[ClienteMemoria] = None
+
+    def criar_cliente(self) -> ClienteMemoria:
+        if self.cliente is None:
+            self.cliente = ClienteMemoria()
+            self.cliente.criar_unidades_padrao()
+        return self.cliente
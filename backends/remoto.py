@@ -0,0 +1,23 @@
+"""
+Backend Supabase
+Banco PostgreSQL do Supabase, acessado pela API REST (PostgREST)
+"""
+
+from typing import Tuple
+from backends.base import Backend
+from config import Config
+
+
+class BackendSupabase(Backend):
+    """Banco compartilhado entre as unidades (padrão)"""
+
+    nome = "supabase"
+    remoto = True
+
+    def validar(self) -> Tuple[bool, str]:
+        return Config.validar_credenciais()
+
+    def criar_cliente(self):
+        from supabase import create_client
+
+        return create_client(Config.SUPABASE_URL, Config.SUPABASE_KEY)
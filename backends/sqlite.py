@@ -0,0 +1,563 @@
+"""
+Backend SQLite
+Banco local com a mesma interface de consultas do cliente Supabase
+(table().select().eq()...execute()), para que o DatabaseManager use o
+SQLite sem mudar as consultas
+"""
+
+from typing import Optional, List, Dict, Any, Tuple, Union
+from contextlib import contextmanager
+from backends.base import (
+    Backend, ChamadaLocal, ConsultaBase, Condicao, Logica, RespostaConsulta,
+    COLUNAS_BOOLEANAS, RELACOES, UNIDADES_PADRAO, identificador, inicio_retencao_logs,
+    normalizar_busca, relevancia_busca
+)
+import json
+import sqlite3
+import threading
+
+
+# Expressão do instante atual no mesmo formato ISO devolvido pelo PostgREST
+AGORA_SQL = "strftime('%Y-%m-%dT%H:%M:%f', 'now')"
+
+# Equivalente SQLite do schema.sql (tabelas, índices e triggers usados pelo aplicativo).
+# Os nomes usam COLLATE NOCASE para ordenar como a lista da tela principal.
+ESQUEMA_SQLITE = f"""
+CREATE TABLE IF NOT EXISTS unidades (
+    id INTEGER PRIMARY KEY,
+    nome TEXT NOT NULL UNIQUE,
+    criado_em TEXT DEFAULT ({AGORA_SQL})
+);
+
+CREATE TABLE IF NOT EXISTS instrutores (
+    id INTEGER PRIMARY KEY,
+    nome TEXT NOT NULL COLLATE NOCASE,
+    unidade_id INTEGER NOT NULL,
+    ativo INTEGER DEFAULT 1,
+    criado_em TEXT DEFAULT ({AGORA_SQL}),
+    atualizado_em TEXT DEFAULT ({AGORA_SQL})
+);
+CREATE INDEX IF NOT EXISTS idx_instrutores_unidade ON instrutores(unidade_id, nome);
+
+CREATE TABLE IF NOT EXISTS alunos (
+    id INTEGER PRIMARY KEY,
+    nome TEXT NOT NULL COLLATE NOCASE,
+    data_inicio TEXT NOT NULL,
+    curso_matriculado TEXT NOT NULL,
+    tipo_plano TEXT NOT NULL,
+    modulo TEXT,
+    aulas INTEGER,
+    dia_horario TEXT,
+    situacao_academica TEXT NOT NULL,
+    observacoes TEXT,
+    pagamento_parcelas TEXT,
+    instrutor_id INTEGER,
+    unidade_id INTEGER NOT NULL,
+    arquivado INTEGER DEFAULT 0,
+    acoes_pendentes INTEGER NOT NULL DEFAULT 0,
+    criado_em TEXT DEFAULT ({AGORA_SQL}),
+    atualizado_em TEXT DEFAULT ({AGORA_SQL})
+);
+CREATE INDEX IF NOT EXISTS idx_alunos_unidade_nome ON alunos(unidade_id, arquivado, nome, id);
+CREATE INDEX IF NOT EXISTS idx_alunos_unidade_atualizado ON alunos(unidade_id, atualizado_em, id);
+
+CREATE TABLE IF NOT EXISTS acoes (
+    id INTEGER PRIMARY KEY,
+    aluno_id INTEGER NOT NULL,
+    acao_proposta TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'Pendente',
+    instrutor_resp_id INTEGER,
+    data_proposta TEXT NOT NULL DEFAULT (date('now')),
+    data_conclusao TEXT,
+    criado_em TEXT DEFAULT ({AGORA_SQL}),
+    atualizado_em TEXT DEFAULT ({AGORA_SQL})
+);
+CREATE INDEX IF NOT EXISTS idx_acoes_aluno ON acoes(aluno_id, status);
+
+CREATE TABLE IF NOT EXISTS logs (
+    id INTEGER PRIMARY KEY,
+    instrutor_id INTEGER,
+    atividade TEXT NOT NULL,
+    data_hora TEXT DEFAULT ({AGORA_SQL}),
+    unidade_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_logs_unidade_data ON logs(unidade_id, data_hora, id);
+
+-- Resumo diário dos logs removidos pela retenção (ver reter_logs)
+CREATE TABLE IF NOT EXISTS logs_resumo_diario (
+    id INTEGER PRIMARY KEY,
+    dia TEXT NOT NULL,
+    unidade_id INTEGER,
+    instrutor_id INTEGER,
+    instrutor_nome TEXT,
+    quantidade INTEGER NOT NULL,
+    primeira_atividade TEXT,
+    ultima_atividade TEXT
+);
+-- Um resumo por dia, unidade e instrutor (NULL incluído, como NULLS NOT DISTINCT)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_logs_resumo_chave
+    ON logs_resumo_diario(dia, IFNULL(unidade_id, 0), IFNULL(instrutor_id, 0));
+CREATE INDEX IF NOT EXISTS idx_logs_resumo_unidade_dia ON logs_resumo_diario(unidade_id, dia, id);
+
+CREATE TABLE IF NOT EXISTS registros_excluidos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tabela TEXT NOT NULL,
+    registro_id INTEGER NOT NULL,
+    unidade_id INTEGER,
+    excluido_em TEXT DEFAULT ({AGORA_SQL})
+);
+CREATE INDEX IF NOT EXISTS idx_registros_excluidos_busca
+    ON registros_excluidos(tabela, unidade_id, excluido_em, id);
+
+-- atualizado_em acompanha cada alteração (exceto quando informado na própria alteração)
+CREATE TRIGGER IF NOT EXISTS trigger_atualizar_instrutores
+    AFTER UPDATE ON instrutores FOR EACH ROW
+    WHEN NEW.atualizado_em IS OLD.atualizado_em
+BEGIN
+    UPDATE instrutores SET atualizado_em = {AGORA_SQL} WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trigger_atualizar_alunos
+    AFTER UPDATE ON alunos FOR EACH ROW
+    WHEN NEW.atualizado_em IS OLD.atualizado_em
+BEGIN
+    UPDATE alunos SET atualizado_em = {AGORA_SQL} WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trigger_atualizar_acoes
+    AFTER UPDATE ON acoes FOR EACH ROW
+    WHEN NEW.atualizado_em IS OLD.atualizado_em
+BEGIN
+    UPDATE acoes SET atualizado_em = {AGORA_SQL} WHERE id = NEW.id;
+END;
+
+-- Exclusões e mudanças nas ações, como no schema.sql (sincronização incremental)
+CREATE TRIGGER IF NOT EXISTS trigger_exclusao_alunos
+    AFTER DELETE ON alunos FOR EACH ROW
+BEGIN
+    INSERT INTO registros_excluidos (tabela, registro_id, unidade_id)
+    VALUES ('alunos', OLD.id, OLD.unidade_id);
+END;
+
+-- O toque no aluno também mantém o contador acoes_pendentes
+CREATE TRIGGER IF NOT EXISTS trigger_tocar_aluno_insercao_acoes
+    AFTER INSERT ON acoes FOR EACH ROW
+BEGIN
+    UPDATE alunos SET atualizado_em = {AGORA_SQL},
+        acoes_pendentes = acoes_pendentes + (NEW.status = 'Pendente')
+    WHERE id = NEW.aluno_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trigger_tocar_aluno_alteracao_acoes
+    AFTER UPDATE ON acoes FOR EACH ROW
+BEGIN
+    UPDATE alunos SET atualizado_em = {AGORA_SQL},
+        acoes_pendentes = acoes_pendentes - (OLD.status = 'Pendente')
+    WHERE id = OLD.aluno_id;
+    UPDATE alunos SET atualizado_em = {AGORA_SQL},
+        acoes_pendentes = acoes_pendentes + (NEW.status = 'Pendente')
+    WHERE id = NEW.aluno_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trigger_tocar_aluno_exclusao_acoes
+    AFTER DELETE ON acoes FOR EACH ROW
+BEGIN
+    UPDATE alunos SET atualizado_em = {AGORA_SQL},
+        acoes_pendentes = acoes_pendentes - (OLD.status = 'Pendente')
+    WHERE id = OLD.aluno_id;
+END;
+"""
+
+# Colunas calculadas que o PostgREST expõe por funções do schema.sql
+COLUNAS_CALCULADAS = {
+    ("alunos", "observacoes_resumo"):
+        "CASE WHEN length(t.observacoes) > 50 THEN substr(t.observacoes, 1, 47) || '...' "
+        "ELSE t.observacoes END",
+}
+
+# Operadores de comparação do PostgREST em SQL
+OPERADORES_SQL = {"eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+
+def valor_sqlite(valor: Any) -> Any:
+    """Converte um valor Python para parâmetro do SQLite"""
+    if isinstance(valor, (dict, list)):
+        return json.dumps(valor, ensure_ascii=False)
+    return valor
+
+
+def _sql_filtro(filtro: Union[Condicao, Logica], apelido: str) -> Tuple[str, list]:
+    """Converte um filtro em SQL sobre a tabela com o apelido informado"""
+    if isinstance(filtro, Logica):
+        partes, parametros = [], []
+        for condicao in filtro.condicoes:
+            sql, params = _sql_filtro(condicao, apelido)
+            partes.append(f"({sql})")
+            parametros.extend(params)
+        return f" {filtro.juncao.upper()} ".join(partes) or "1", parametros
+
+    coluna = f'{apelido}."{filtro.coluna}"'
+    if filtro.operador in OPERADORES_SQL:
+        return f"{coluna} {OPERADORES_SQL[filtro.operador]} ?", [valor_sqlite(filtro.valor)]
+    if filtro.operador == "is":
+        return (f"{coluna} IS NULL", []) if filtro.valor is None else (f"{coluna} IS ?", [filtro.valor])
+    if filtro.operador == "ilike":
+        # O LIKE do SQLite já ignora maiúsculas/minúsculas (ASCII)
+        return f"{coluna} LIKE ?", [filtro.valor.replace("*", "%")]
+    if filtro.operador == "in":
+        if not filtro.valor:
+            return "0", []
+        return f"{coluna} IN ({', '.join('?' for _ in filtro.valor)})", list(filtro.valor)
+    raise ValueError(f"Operador não suportado: {filtro.operador}")
+
+
+class ConsultaSQLite(ConsultaBase):
+    """Consulta executada no SQLite (traduzida para SQL)"""
+
+    def __init__(self, cliente: "ClienteSQLite", tabela: str):
+        super().__init__(tabela)
+        self.cliente = cliente
+
+    def execute(self) -> RespostaConsulta:
+        """Executa a consulta no SQLite"""
+        with self.cliente.lock:
+            if self.operacao == "select":
+                return self._executar_select()
+            return self._executar_escrita()
+
+    def _where(self) -> Tuple[str, list]:
+        if not self.filtros:
+            return "", []
+        partes, parametros = [], []
+        for filtro in self.filtros:
+            sql, params = _sql_filtro(filtro, "t")
+            partes.append(f"({sql})")
+            parametros.extend(params)
+        return " WHERE " + " AND ".join(partes), parametros
+
+    def _executar_select(self) -> RespostaConsulta:
+        expressoes, parametros, embutidas, internas = [], [], {}, []
+
+        for item in self._itens_select():
+            if item.tipo == "embutido":
+                sql, params = self._expressao_embutida(item)
+                expressoes.append(f'{sql} AS "{item.nome}"')
+                parametros.extend(params)
+                embutidas[item.nome] = item.tabela
+                if item.interna:
+                    internas.append(item.nome)
+            elif item.tipo == "todas":
+                expressoes.append("t.*")
+            elif (self.tabela, item.nome) in COLUNAS_CALCULADAS:
+                expressoes.append(f'{COLUNAS_CALCULADAS[(self.tabela, item.nome)]} AS "{item.nome}"')
+            else:
+                expressoes.append(f't."{item.nome}"')
+
+        where, parametros_where = self._where()
+        sql = f'SELECT {", ".join(expressoes)} FROM "{self.tabela}" t{where}'
+        parametros_total = parametros + parametros_where
+
+        if internas:
+            # Recurso embutido com !inner: descarta as linhas sem correspondência
+            sql = f"SELECT * FROM ({sql}) WHERE " + " AND ".join(
+                f'"{nome}" IS NOT NULL' for nome in internas
+            )
+
+        total = None
+        if self.contar:
+            total = self.cliente.conexao.execute(
+                f"SELECT count(*) FROM ({sql})", parametros_total
+            ).fetchone()[0]
+
+        if self.ordem:
+            sql += " ORDER BY " + ", ".join(
+                f'"{coluna}" {"DESC NULLS FIRST" if desc else "ASC NULLS LAST"}'
+                for coluna, desc in self.ordem
+            )
+        if self.limite is not None:
+            sql += f" LIMIT {self.limite}"
+
+        cursor = self.cliente.conexao.execute(sql, parametros_total)
+        nomes = [d[0] for d in cursor.description]
+        registros = []
+        for linha in cursor.fetchall():
+            registro = dict(zip(nomes, linha))
+            for nome, tabela in embutidas.items():
+                if registro[nome] is not None:
+                    registro[nome] = self.cliente.converter(tabela, json.loads(registro[nome]))
+            registros.append(self.cliente.converter(self.tabela, registro))
+        return RespostaConsulta(registros, total)
+
+    def _expressao_embutida(self, item) -> Tuple[str, list]:
+        """Monta a subconsulta JSON de um recurso embutido, ex.: instrutores(nome)"""
+        coluna_local, coluna_embutida, muitos = RELACOES[(self.tabela, item.tabela)]
+
+        condicoes = [f'e."{coluna_embutida}" = t."{coluna_local}"']
+        parametros = []
+        for condicao in self.filtros_embutidos.get(item.nome, []):
+            sql, params = _sql_filtro(condicao, "e")
+            condicoes.append(sql)
+            parametros.extend(params)
+        where = " AND ".join(f"({c})" for c in condicoes)
+        origem = f'FROM "{item.tabela}" e WHERE {where}'
+
+        if item.contagem:
+            return f"(SELECT json_array(json_object('count', count(*))) {origem})", parametros
+
+        nomes = item.colunas
+        if nomes == ["*"]:
+            nomes = self.cliente.colunas_da_tabela(item.tabela)
+        objeto = "json_object(" + ", ".join(f"'{c}', e.\"{c}\"" for c in nomes) + ")"
+        if muitos:
+            return f"(SELECT json_group_array({objeto}) {origem})", parametros
+        return f"(SELECT {objeto} {origem} LIMIT 1)", parametros
+
+    def _executar_escrita(self) -> RespostaConsulta:
+        tabela = f'"{self.tabela}"'
+
+        if self.operacao in ("insert", "upsert"):
+            registros = self.dados if isinstance(self.dados, list) else [self.dados]
+            inseridos = []
+            for registro in registros:
+                colunas = [identificador(c) for c in registro.keys()]
+                nomes = ", ".join(f'"{c}"' for c in colunas)
+                sql = f"INSERT INTO {tabela} ({nomes}) VALUES ({', '.join('?' for _ in colunas)})"
+                if self.operacao == "upsert":
+                    atualizacoes = ", ".join(
+                        f'"{c}" = excluded."{c}"' for c in colunas if c != self.conflito
+                    )
+                    sql += f' ON CONFLICT("{self.conflito}") DO ' + (
+                        f"UPDATE SET {atualizacoes}" if atualizacoes else "NOTHING"
+                    )
+                cursor = self.cliente.conexao.execute(
+                    sql + " RETURNING *", [valor_sqlite(registro[c]) for c in colunas]
+                )
+                inseridos.extend(self._linhas(cursor))
+            return RespostaConsulta(inseridos)
+
+        where, parametros = self._where()
+        if self.operacao == "update":
+            dados = dict(self.dados)
+            if "atualizado_em" in self.cliente.colunas_da_tabela(self.tabela):
+                dados.setdefault("atualizado_em", self.cliente.agora())
+            colunas = [identificador(c) for c in dados.keys()]
+            atribuicoes = ", ".join(f'"{c}" = ?' for c in colunas)
+            sql = f"UPDATE {tabela} AS t SET {atribuicoes}{where} RETURNING *"
+            parametros = [valor_sqlite(dados[c]) for c in colunas] + parametros
+        else:
+            sql = f"DELETE FROM {tabela} AS t{where} RETURNING *"
+        return RespostaConsulta(self._linhas(self.cliente.conexao.execute(sql, parametros)))
+
+    def _linhas(self, cursor: sqlite3.Cursor) -> List[Dict[str, Any]]:
+        nomes = [d[0] for d in cursor.description]
+        return [self.cliente.converter(self.tabela, dict(zip(nomes, linha))) for linha in cursor.fetchall()]
+
+
+class ClienteSQLite:
+    """
+    Banco SQLite com a interface de consultas do cliente Supabase
+
+    Uma única conexão é compartilhada entre as threads e protegida por um
+    lock; as transações explícitas usam o mesmo lock (ver transacao()).
+    """
+
+    def __init__(self, caminho: str = ":memory:"):
+        """
+        Args:
+            caminho: Arquivo do banco (":memory:" para um banco temporário)
+        """
+        self.caminho = caminho
+        self.lock = threading.RLock()
+        self.conexao = sqlite3.connect(caminho, check_same_thread=False, isolation_level=None)
+        if caminho != ":memory:":
+            # WAL + synchronous=FULL: cada transação confirmada sobrevive a uma queda de energia
+            self.conexao.execute("PRAGMA journal_mode=WAL")
+            self.conexao.execute("PRAGMA synchronous=FULL")
+        self._colunas: Dict[str, List[str]] = {}
+        self.conexao.create_function("relevancia_busca", 4, relevancia_busca, deterministic=True)
+        migrar_contador = self._migrar()
+        self.conexao.executescript(ESQUEMA_SQLITE)
+        if migrar_contador:
+            self.reconciliar_acoes_pendentes()
+
+    def _migrar(self) -> bool:
+        """
+        Atualiza um arquivo criado por uma versão anterior do esquema
+
+        Returns:
+            bool: True se a coluna acoes_pendentes foi criada agora (o
+                contador precisa ser preenchido depois do esquema)
+        """
+        colunas = [linha[1] for linha in self.conexao.execute('PRAGMA table_info("alunos")')]
+        if not colunas or "acoes_pendentes" in colunas:
+            return False
+        self.conexao.executescript("""
+            ALTER TABLE alunos ADD COLUMN acoes_pendentes INTEGER NOT NULL DEFAULT 0;
+            DROP TRIGGER IF EXISTS trigger_tocar_aluno_insercao_acoes;
+            DROP TRIGGER IF EXISTS trigger_tocar_aluno_alteracao_acoes;
+            DROP TRIGGER IF EXISTS trigger_tocar_aluno_exclusao_acoes;
+        """)
+        return True
+
+    def table(self, nome: str) -> ConsultaSQLite:
+        """Inicia uma consulta na tabela"""
+        return ConsultaSQLite(self, nome)
+
+    def rpc(self, funcao: str, parametros: Optional[Dict[str, Any]] = None) -> ChamadaLocal:
+        """Chama uma das funções do schema.sql implementadas localmente"""
+        funcoes = {
+            "buscar_alunos": self.buscar_alunos,
+            "reconciliar_acoes_pendentes": self.reconciliar_acoes_pendentes,
+            "reter_logs": self.reter_logs,
+        }
+        if funcao not in funcoes:
+            raise ValueError(f"Função desconhecida: {funcao}")
+        return ChamadaLocal(funcoes[funcao], parametros or {})
+
+    def buscar_alunos(self, p_unidade_id: int, p_termo: str, p_incluir_arquivados: bool = False,
+                      p_limite: int = 50, p_deslocamento: int = 0) -> List[Dict[str, Any]]:
+        """
+        Busca aproximada de alunos (como a função do schema.sql, sem índice:
+        a relevância é calculada em cada aluno da unidade)
+
+        Returns:
+            list: Ids dos alunos com a relevância, da mais alta para a mais baixa
+        """
+        with self.lock:
+            linhas = self.conexao.execute(
+                """
+                SELECT id, relevancia FROM (
+                    SELECT id, nome,
+                           relevancia_busca(?, nome, curso_matriculado, observacoes) AS relevancia
+                    FROM alunos
+                    WHERE unidade_id = ? AND (? OR arquivado = 0)
+                )
+                WHERE relevancia IS NOT NULL
+                ORDER BY relevancia DESC, nome, id
+                LIMIT ? OFFSET ?
+                """,
+                [normalizar_busca(p_termo), p_unidade_id, bool(p_incluir_arquivados),
+                 p_limite, p_deslocamento]
+            ).fetchall()
+        return [{"aluno_id": aluno_id, "relevancia": relevancia} for aluno_id, relevancia in linhas]
+
+    def reconciliar_acoes_pendentes(self, p_unidade_id: Optional[int] = None) -> int:
+        """
+        Recalcula alunos.acoes_pendentes (como a função do schema.sql)
+
+        Returns:
+            int: Quantidade de alunos corrigidos
+        """
+        contagem = (
+            "(SELECT COUNT(*) FROM acoes WHERE acoes.aluno_id = alunos.id "
+            "AND acoes.status = 'Pendente')"
+        )
+        # trigger_atualizar_alunos avança o atualizado_em dos corrigidos, como no schema.sql
+        with self.transacao():
+            cursor = self.conexao.execute(
+                f"UPDATE alunos SET acoes_pendentes = {contagem} "
+                f"WHERE acoes_pendentes <> {contagem} AND (? IS NULL OR unidade_id = ?)",
+                [p_unidade_id, p_unidade_id]
+            )
+            return cursor.rowcount
+
+    def reter_logs(self, p_meses_retidos: int = 12) -> int:
+        """
+        Resume por dia e remove os logs anteriores ao período retido (como
+        a função do schema.sql, sem partições)
+
+        Returns:
+            int: Quantidade de logs resumidos
+        """
+        limite = inicio_retencao_logs(p_meses_retidos)
+        with self.transacao():
+            # WHERE antes do ON CONFLICT evita a ambiguidade do upsert com SELECT no SQLite
+            self.conexao.execute(
+                """
+                INSERT INTO logs_resumo_diario (
+                    dia, unidade_id, instrutor_id, instrutor_nome, quantidade,
+                    primeira_atividade, ultima_atividade
+                )
+                SELECT substr(l.data_hora, 1, 10), l.unidade_id, l.instrutor_id, MAX(i.nome),
+                       COUNT(*), MIN(l.data_hora), MAX(l.data_hora)
+                FROM logs l LEFT JOIN instrutores i ON i.id = l.instrutor_id
+                WHERE l.data_hora < ?
+                GROUP BY substr(l.data_hora, 1, 10), l.unidade_id, l.instrutor_id
+                ON CONFLICT (dia, IFNULL(unidade_id, 0), IFNULL(instrutor_id, 0)) DO UPDATE SET
+                    instrutor_nome = IFNULL(excluded.instrutor_nome, instrutor_nome),
+                    quantidade = quantidade + excluded.quantidade,
+                    primeira_atividade = MIN(primeira_atividade, excluded.primeira_atividade),
+                    ultima_atividade = MAX(ultima_atividade, excluded.ultima_atividade)
+                """,
+                [limite]
+            )
+            return self.conexao.execute("DELETE FROM logs WHERE data_hora < ?", [limite]).rowcount
+
+    @contextmanager
+    def transacao(self):
+        """Agrupa várias consultas em uma transação (confirmada ou desfeita em bloco)"""
+        with self.lock:
+            if self.conexao.in_transaction:
+                # Transação aninhada: a externa confirma ou desfaz tudo
+                yield self
+                return
+            self.conexao.execute("BEGIN IMMEDIATE")
+            try:
+                yield self
+            except BaseException:
+                self.conexao.execute("ROLLBACK")
+                raise
+            self.conexao.execute("COMMIT")
+
+    def agora(self) -> str:
+        """Instante atual no formato das colunas de data e hora"""
+        return self.conexao.execute(f"SELECT {AGORA_SQL}").fetchone()[0]
+
+    def colunas_da_tabela(self, tabela: str) -> List[str]:
+        """Nomes das colunas de uma tabela"""
+        if tabela not in self._colunas:
+            cursor = self.conexao.execute(f'PRAGMA table_info("{identificador(tabela)}")')
+            self._colunas[tabela] = [linha[1] for linha in cursor.fetchall()]
+        return self._colunas[tabela]
+
+    def converter(self, tabela: str, valor: Any) -> Any:
+        """Converte as colunas booleanas (0/1) de um registro ou lista de registros"""
+        if isinstance(valor, list):
+            return [self.converter(tabela, v) for v in valor]
+        if isinstance(valor, dict):
+            for coluna in COLUNAS_BOOLEANAS.get(tabela, ()):
+                if valor.get(coluna) is not None:
+                    valor[coluna] = bool(valor[coluna])
+        return valor
+
+    def fechar(self):
+        """Fecha a conexão"""
+        with self.lock:
+            self.conexao.close()
+
+    def criar_unidades_padrao(self):
+        """Cria as unidades padrão do schema.sql (sem efeito se já existirem)"""
+        with self.transacao():
+            for nome in UNIDADES_PADRAO:
+                self.conexao.execute("INSERT OR IGNORE INTO unidades (nome) VALUES (?)", [nome])
+
+
+class BackendSQLite(Backend):
+    """Banco SQLite em arquivo, para instalações de uma só unidade sem Supabase"""
+
+    nome = "sqlite"
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self.cliente: Optional[ClienteSQLite] = None
+
+    def criar_cliente(self) -> ClienteSQLite:
+        if self.cliente is None:
+            self.cliente = ClienteSQLite(self.caminho)
+            self.cliente.criar_unidades_padrao()
+        return self.cliente
+
+    def encerrar(self):
+        if self.cliente is not None:
+            self.cliente.fechar()
+            self.cliente = None
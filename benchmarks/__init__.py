@@ -0,0 +1 @@
+"""Pacote de medições de desempenho"""
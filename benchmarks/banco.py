@@ -0,0 +1,227 @@
+"""
+Medição de Desempenho do Banco de Dados
+Executa os métodos do DatabaseManager sobre dados sintéticos e mede
+latência (percentis), requisições, linhas e bytes de resposta por chamada
+
+Uso:
+    python -m benchmarks.banco --tamanhos 1k,10k --saida resultado.json
+    python -m benchmarks.banco --comparar anterior.json --saida atual.json
+
+Os dados são gerados em um backend local ("sqlite" em memória, padrão, ou
+"memoria"), nunca no Supabase. As chamadas são medidas com o cache de
+consultas vazio: é o custo de uma consulta que de fato chega ao banco.
+"""
+
+from typing import Optional, List, Dict, Any, Callable, NamedTuple
+from datetime import datetime
+from benchmarks.dados_sinteticos import TAMANHOS, ResumoDados, gerar_dados
+from config import Config
+from database import DatabaseManager
+from diagnostico import percentil
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+
+# ============================================
+# CENÁRIOS
+# ============================================
+
+class Cenario(NamedTuple):
+    """Método medido: nome no relatório e chamada (db, dados, rng)"""
+
+    nome: str
+    chamar: Callable[[DatabaseManager, ResumoDados, random.Random], Any]
+    # Executada antes de cada repetição, fora da medição
+    preparar: Optional[Callable[[DatabaseManager, ResumoDados, random.Random], Any]] = None
+
+
+def _unidade(dados: ResumoDados) -> int:
+    """Unidade com mais alunos"""
+    return max(dados.unidades, key=lambda u: len(dados.alunos[u]))
+
+
+def _aluno(dados: ResumoDados, rng: random.Random) -> int:
+    return rng.choice(dados.alunos[_unidade(dados)])
+
+
+def _alterar_um_aluno(db: DatabaseManager, dados: ResumoDados, rng: random.Random):
+    """Deixa a cópia local sincronizada com exatamente um aluno alterado no banco"""
+    db.sincronizar_alunos(_unidade(dados))
+    db.client.table("alunos").update({"modulo": f"Módulo {rng.randint(1, 8)}"}).eq(
+        "id", _aluno(dados, rng)
+    ).execute()
+
+
+CENARIOS = [
+    Cenario("listar_unidades", lambda db, d, rng: db.listar_unidades()),
+    Cenario("listar_instrutores", lambda db, d, rng: db.listar_instrutores(_unidade(d))),
+    Cenario("listar_alunos", lambda db, d, rng: db.listar_alunos(_unidade(d))),
+    Cenario("listar_alunos[arquivados]", lambda db, d, rng: db.listar_alunos(_unidade(d), apenas_arquivados=True)),
+    Cenario("listar_alunos_com_pendencias", lambda db, d, rng: db.listar_alunos_com_pendencias(_unidade(d))),
+    Cenario("sincronizar_alunos[completa]", lambda db, d, rng: db.sincronizar_alunos(_unidade(d), completa=True)),
+    Cenario("sincronizar_alunos[delta]", lambda db, d, rng: db.sincronizar_alunos(_unidade(d)),
+            _alterar_um_aluno),
+    Cenario("obter_aluno", lambda db, d, rng: db.obter_aluno(_aluno(d, rng))),
+    Cenario("contar_acoes_pendentes", lambda db, d, rng: db.contar_acoes_pendentes(_aluno(d, rng))),
+    Cenario("listar_acoes", lambda db, d, rng: db.listar_acoes(_aluno(d, rng))),
+    Cenario("listar_logs", lambda db, d, rng: db.listar_logs(_unidade(d))),
+]
+
+
+# ============================================
+# EXECUÇÃO
+# ============================================
+
+def medir_cenario(db: DatabaseManager, cenario: Cenario, dados: ResumoDados,
+                  repeticoes: int, semente: int) -> Dict[str, Any]:
+    """Executa um cenário várias vezes e resume as medições"""
+    rng = random.Random(semente)
+    latencias, requisicoes, linhas, tamanhos = [], [], [], []
+
+    for _ in range(repeticoes):
+        if cenario.preparar:
+            cenario.preparar(db, dados, rng)
+        db.cache.limpar()
+        with db.rastreador.acao(cenario.nome) as contagem:
+            inicio = time.perf_counter()
+            cenario.chamar(db, dados, rng)
+            latencias.append((time.perf_counter() - inicio) * 1000)
+        requisicoes.append(contagem.requisicoes)
+        linhas.append(contagem.linhas)
+        tamanhos.append(contagem.bytes)
+
+    return {
+        "repeticoes": repeticoes,
+        "latencia_ms": {
+            "min": round(min(latencias), 3),
+            "p50": round(percentil(latencias, 50), 3),
+            "p95": round(percentil(latencias, 95), 3),
+            "p99": round(percentil(latencias, 99), 3),
+            "max": round(max(latencias), 3),
+            "media": round(sum(latencias) / len(latencias), 3),
+        },
+        # Médias por chamada
+        "requisicoes": round(sum(requisicoes) / repeticoes, 2),
+        "linhas": round(sum(linhas) / repeticoes, 2),
+        "bytes": round(sum(tamanhos) / repeticoes),
+    }
+
+
+def executar(tamanhos: List[str], backend: str = "sqlite", repeticoes: int = 20,
+             semente: int = 42, cenarios: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Gera os dados de cada tamanho em um banco novo e mede os cenários
+
+    Args:
+        tamanhos: Chaves de TAMANHOS ("1k", "10k", "100k") ou números de alunos
+        backend: "sqlite" (em memória) ou "memoria"
+        repeticoes: Execuções de cada cenário
+        semente: Semente dos dados e da escolha de alunos
+        cenarios: Nomes dos cenários a medir (todos, se omitido)
+
+    Returns:
+        dict: Relatório serializável em JSON
+    """
+    if backend not in ("sqlite", "memoria"):
+        raise ValueError("As medições usam somente os backends locais (sqlite ou memoria)")
+
+    relatorio = {
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "backend": backend,
+        "semente": semente,
+        "repeticoes": repeticoes,
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "tamanhos": {},
+    }
+
+    for tamanho in tamanhos:
+        total_alunos = TAMANHOS.get(tamanho) or int(tamanho)
+        Config.BACKEND = backend
+        Config.SQLITE_ARQUIVO = ":memory:"
+        db = DatabaseManager()
+        # O relatório inclui os bytes de resposta de cada cenário
+        db.rastreador.medir_bytes = True
+        sucesso, mensagem = db.conectar()
+        if not sucesso:
+            raise RuntimeError(mensagem)
+
+        inicio = time.perf_counter()
+        dados = gerar_dados(db.client, total_alunos, semente)
+        geracao = time.perf_counter() - inicio
+        print(f"[{tamanho}] dados gerados em {geracao:.1f}s: {dados.como_dict()}", file=sys.stderr)
+
+        resultados = {}
+        for cenario in CENARIOS:
+            if cenarios and cenario.nome not in cenarios:
+                continue
+            resultados[cenario.nome] = medir_cenario(db, cenario, dados, repeticoes, semente)
+            latencia = resultados[cenario.nome]["latencia_ms"]
+            print(f"[{tamanho}] {cenario.nome}: p50 {latencia['p50']} ms, p95 {latencia['p95']} ms",
+                  file=sys.stderr)
+
+        relatorio["tamanhos"][tamanho] = {
+            "dados": {**dados.como_dict(), "geracao_s": round(geracao, 2)},
+            "metodos": resultados,
+        }
+        db.backend.encerrar()
+
+    return relatorio
+
+
+def comparar(anterior: Dict[str, Any], atual: Dict[str, Any]) -> List[str]:
+    """Linhas com a variação de p50, requisições e bytes entre dois relatórios"""
+    linhas = []
+    for tamanho, resultado in atual["tamanhos"].items():
+        base = anterior.get("tamanhos", {}).get(tamanho, {}).get("metodos", {})
+        for metodo, medicao in resultado["metodos"].items():
+            if metodo not in base:
+                continue
+            antes, depois = base[metodo], medicao
+            p50_antes, p50_depois = antes["latencia_ms"]["p50"], depois["latencia_ms"]["p50"]
+            variacao = (p50_depois - p50_antes) / p50_antes * 100 if p50_antes else 0.0
+            linhas.append(
+                f"{tamanho:>6} {metodo:<32} p50 {p50_antes:>9.3f} -> {p50_depois:>9.3f} ms ({variacao:+.0f}%)"
+                f"  req {antes['requisicoes']} -> {depois['requisicoes']}"
+                f"  bytes {antes['bytes']} -> {depois['bytes']}"
+            )
+    return linhas
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Mede os métodos do DatabaseManager sobre dados sintéticos")
+    parser.add_argument("--tamanhos", default="1k,10k", help="Ex.: 1k,10k,100k ou números de alunos")
+    parser.add_argument("--backend", default="sqlite", choices=["sqlite", "memoria"])
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--cenarios", help="Nomes separados por vírgula (padrão: todos)")
+    parser.add_argument("--saida", help="Arquivo JSON do relatório (padrão: saída padrão)")
+    parser.add_argument("--comparar", help="Relatório JSON anterior para comparação")
+    args = parser.parse_args(argv)
+
+    relatorio = executar(
+        args.tamanhos.split(","), args.backend, args.repeticoes, args.semente,
+        args.cenarios.split(",") if args.cenarios else None
+    )
+
+    texto = json.dumps(relatorio, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(texto)
+    else:
+        print(texto)
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            anterior = json.load(arquivo)
+        for linha in comparar(anterior, relatorio):
+            print(linha, file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
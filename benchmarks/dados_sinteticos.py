@@ -0,0 +1,192 @@
+"""
+Dados Sintéticos
+Gera unidades, instrutores, alunos, ações e logs realistas e reproduzíveis
+(mesma semente, mesmos dados) para as medições de desempenho
+"""
+
+from typing import List, Dict, Any, NamedTuple
+from datetime import datetime, date, timedelta
+from config import TIPOS_PLANO, SITUACOES_ACADEMICAS, DIAS_SEMANA, OPCOES_PAGAMENTO
+import json
+import random
+
+
+# Tamanhos padrão (número de alunos)
+TAMANHOS = {"1k": 1_000, "10k": 10_000, "100k": 100_000}
+
+# Registros por requisição de inserção
+TAMANHO_LOTE = 1000
+
+PRIMEIROS_NOMES = [
+    "Ana", "Bruno", "Carla", "Daniel", "Eduarda", "Felipe", "Gabriela", "Heitor",
+    "Isabela", "João", "Kaio", "Larissa", "Mateus", "Natália", "Otávio", "Paula",
+    "Rafael", "Sofia", "Tiago", "Vitória", "Álvaro", "Érica", "Ícaro", "Luana",
+]
+SOBRENOMES = [
+    "Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves",
+    "Pereira", "Lima", "Gomes", "Costa", "Ribeiro", "Martins", "Carvalho",
+    "Araújo", "Melo", "Barbosa", "Cardoso", "Nascimento", "Rocha",
+]
+CURSOS = [
+    "Informática Básica", "Excel Avançado", "Design Gráfico", "Programação",
+    "Inglês", "Administração", "Manutenção de Computadores", "Marketing Digital",
+]
+ACOES = [
+    "Ligar para o responsável", "Agendar reposição de aulas", "Enviar material de apoio",
+    "Conversar sobre frequência", "Renegociar parcelas", "Aplicar avaliação de módulo",
+    "Reforçar conteúdo do módulo", "Confirmar horário das aulas",
+]
+OBSERVACOES = [
+    "", "Prefere aulas pela manhã.", "Dificuldade com a parte prática, acompanhar de perto.",
+    "Trabalha em horário comercial; remarcações frequentes nas sextas-feiras.",
+    "Responsável financeiro é a mãe. Contato preferencial por WhatsApp no fim da tarde.",
+]
+HORARIOS = ["08:00", "09:00", "10:00", "14:00", "15:00", "16:00", "18:00", "19:00", "20:00"]
+
+# Frações aproximadas da base
+FRACAO_ARQUIVADOS = 0.1
+FRACAO_FORMADOS = 0.15
+ALUNOS_POR_INSTRUTOR = 50
+
+
+class ResumoDados(NamedTuple):
+    """Quantidades geradas e IDs usados pelas medições"""
+
+    unidades: List[int]
+    instrutores: Dict[int, List[int]]
+    alunos: Dict[int, List[int]]
+    acoes: int
+    logs: int
+
+    def como_dict(self) -> Dict[str, Any]:
+        return {
+            "unidades": len(self.unidades),
+            "instrutores": sum(len(ids) for ids in self.instrutores.values()),
+            "alunos": sum(len(ids) for ids in self.alunos.values()),
+            "acoes": self.acoes,
+            "logs": self.logs,
+        }
+
+
+def _inserir(cliente, tabela: str, registros: List[Dict[str, Any]]) -> List[int]:
+    """Insere em lotes e devolve os IDs na ordem dos registros"""
+    ids = []
+    for inicio in range(0, len(registros), TAMANHO_LOTE):
+        resposta = cliente.table(tabela).insert(registros[inicio:inicio + TAMANHO_LOTE]).execute()
+        ids.extend(linha['id'] for linha in resposta.data)
+    return ids
+
+
+def _dia_horario(rng: random.Random) -> str:
+    dias = rng.sample(DIAS_SEMANA[:6], rng.randint(1, 3))
+    return json.dumps({
+        dia: sorted(rng.sample(HORARIOS, rng.randint(1, 2))) for dia in dias
+    })
+
+
+def _aluno(rng: random.Random, unidade_id: int, instrutores: List[int], hoje: date) -> Dict[str, Any]:
+    situacao = rng.choice(SITUACOES_ACADEMICAS[:-1])
+    if rng.random() < FRACAO_FORMADOS:
+        situacao = "Formado(a)"
+    inicio = hoje - timedelta(days=rng.randint(1, 3 * 365))
+    # Datas no passado: a sincronização incremental não deve ver a base inteira como recém-alterada
+    atualizado = datetime.combine(inicio, datetime.min.time()) + timedelta(days=rng.randint(0, (hoje - inicio).days - 1), seconds=rng.randint(0, 86399))
+    return {
+        "nome": f"{rng.choice(PRIMEIROS_NOMES)} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)}",
+        "data_inicio": inicio.isoformat(),
+        "curso_matriculado": rng.choice(CURSOS),
+        "tipo_plano": rng.choice(TIPOS_PLANO),
+        "modulo": f"Módulo {rng.randint(1, 8)}",
+        "aulas": rng.randint(1, 30),
+        "dia_horario": _dia_horario(rng),
+        "situacao_academica": situacao,
+        "observacoes": rng.choice(OBSERVACOES),
+        "pagamento_parcelas": rng.choice(OPCOES_PAGAMENTO),
+        "instrutor_id": rng.choice(instrutores),
+        "unidade_id": unidade_id,
+        "arquivado": rng.random() < FRACAO_ARQUIVADOS,
+        "criado_em": inicio.isoformat(),
+        "atualizado_em": atualizado.isoformat(timespec="milliseconds"),
+    }
+
+
+def gerar_dados(cliente, total_alunos: int, semente: int = 42,
+                acoes_por_aluno: float = 3.0, logs_por_aluno: float = 5.0) -> ResumoDados:
+    """
+    Preenche um banco vazio com dados sintéticos
+
+    Usa as unidades existentes (as do schema.sql) e divide os alunos entre
+    elas. As ações ficam ~40% pendentes; os logs se espalham pelo último ano.
+
+    Args:
+        cliente: Cliente com a interface do Supabase (qualquer backend)
+        total_alunos: Número de alunos a gerar
+        semente: Semente do gerador aleatório
+        acoes_por_aluno: Média de ações por aluno
+        logs_por_aluno: Média de logs por aluno
+
+    Returns:
+        ResumoDados: Quantidades e IDs gerados
+    """
+    rng = random.Random(semente)
+    hoje = date.today()
+    agora = datetime.now()
+
+    unidades = sorted(u['id'] for u in cliente.table("unidades").select("id").execute().data)
+    if not unidades:
+        unidades = _inserir(cliente, "unidades", [{"nome": "Unidade Sintética"}])
+
+    instrutores: Dict[int, List[int]] = {}
+    alunos: Dict[int, List[int]] = {}
+    total_acoes = total_logs = 0
+
+    for indice, unidade_id in enumerate(unidades):
+        # A primeira unidade fica com a sobra da divisão
+        quantidade = total_alunos // len(unidades) + (total_alunos % len(unidades) if indice == 0 else 0)
+
+        num_instrutores = max(2, quantidade // ALUNOS_POR_INSTRUTOR)
+        instrutores[unidade_id] = _inserir(cliente, "instrutores", [
+            {
+                "nome": f"{rng.choice(PRIMEIROS_NOMES)} {rng.choice(SOBRENOMES)}",
+                "unidade_id": unidade_id,
+                "ativo": rng.random() > 0.1,
+            }
+            for _ in range(num_instrutores)
+        ])
+
+        alunos[unidade_id] = _inserir(cliente, "alunos", [
+            _aluno(rng, unidade_id, instrutores[unidade_id], hoje) for _ in range(quantidade)
+        ])
+
+        acoes = []
+        for aluno_id in alunos[unidade_id]:
+            for _ in range(rng.randint(0, int(2 * acoes_por_aluno))):
+                proposta = hoje - timedelta(days=rng.randint(0, 365))
+                concluida = rng.random() < 0.6
+                acoes.append({
+                    "aluno_id": aluno_id,
+                    "acao_proposta": rng.choice(ACOES),
+                    "status": "Concluída" if concluida else "Pendente",
+                    "instrutor_resp_id": rng.choice(instrutores[unidade_id]),
+                    "data_proposta": proposta.isoformat(),
+                    "data_conclusao": (
+                        (proposta + timedelta(days=rng.randint(0, 30))).isoformat() if concluida else None
+                    ),
+                })
+        total_acoes += len(_inserir(cliente, "acoes", acoes))
+
+        logs = [
+            {
+                "instrutor_id": rng.choice(instrutores[unidade_id]),
+                "atividade": rng.choice([
+                    "Login no sistema", "Editou aluno", "Adicionou aluno",
+                    "Propôs ação", "Concluiu ação", "Arquivou aluno",
+                ]),
+                "unidade_id": unidade_id,
+                "data_hora": (agora - timedelta(seconds=rng.randint(0, 365 * 86400))).isoformat(),
+            }
+            for _ in range(int(quantidade * logs_por_aluno))
+        ]
+        total_logs += len(_inserir(cliente, "logs", logs))
+
+    return ResumoDados(unidades, instrutores, alunos, total_acoes, total_logs)
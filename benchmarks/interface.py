@@ -0,0 +1,436 @@
+"""
+Medição de Desempenho da Interface
+Abre e atualiza as telas sem janela (QT_QPA_PLATFORM=offscreen) sobre um
+banco local com dados sintéticos e mede tempo, memória e itens Qt
+
+Uso:
+    python -m benchmarks.interface --tamanhos 1k,10k --saida interface.json
+
+Cada medição espera o resultado das consultas em segundo plano chegar à
+tela e inclui a renderização da janela (grab), para contar também o
+tempo de pintura do delegate e do cabeçalho. Termina com código 1 se
+alguma tela passar do orçamento de requisições (Config.ORCAMENTO_REQUISICOES).
+"""
+
+import os
+
+# Precisa estar definido antes de o Qt ser carregado
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from typing import Optional, List, Dict, Any, Callable, NamedTuple
+from datetime import datetime
+from PySide6.QtCore import QObject
+from PySide6.QtWidgets import QApplication, QTableWidget, QWidget
+from benchmarks.dados_sinteticos import TAMANHOS, ResumoDados, gerar_dados
+from config import Config
+from database import db
+from diagnostico import percentil
+from rastreio_requisicoes import rastreador
+import argparse
+import gc
+import json
+import platform
+import random
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def memoria_pico_kb() -> Optional[int]:
+    """Pico de memória residente do processo (KB), se o sistema informar"""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é em bytes no macOS e em KB no Linux
+    return pico // 1024 if sys.platform == "darwin" else pico
+
+
+def aguardar(condicao: Callable[[], bool], timeout_s: float = 120.0):
+    """Processa eventos do Qt até a condição ser verdadeira"""
+    limite = time.perf_counter() + timeout_s
+    while not condicao():
+        if time.perf_counter() > limite:
+            raise TimeoutError("A tela não terminou de carregar a tempo")
+        QApplication.processEvents()
+        time.sleep(0.0005)
+    QApplication.processEvents()
+
+
+def contar_itens_qt(janela: QWidget) -> Dict[str, int]:
+    """QObjects filhos da janela e itens de QTableWidget (um por célula preenchida)"""
+    itens_tabela = 0
+    for tabela in janela.findChildren(QTableWidget):
+        for linha in range(tabela.rowCount()):
+            for coluna in range(tabela.columnCount()):
+                if tabela.item(linha, coluna) is not None:
+                    itens_tabela += 1
+    return {
+        "objetos_qt": len(janela.findChildren(QObject)),
+        "itens_tabela": itens_tabela,
+    }
+
+
+# ============================================
+# CENÁRIOS
+# ============================================
+
+class Contexto:
+    """Dados e janelas compartilhados pelos cenários de um tamanho"""
+
+    def __init__(self, dados: ResumoDados, rng: random.Random):
+        self.dados = dados
+        self.rng = rng
+        self.unidade_id = max(dados.unidades, key=lambda u: len(dados.alunos[u]))
+        self.instrutor_id = dados.instrutores[self.unidade_id][0]
+        self.tela = None
+        # Tempo medido pelo próprio cenário, quando só parte dele interessa
+        self.tempo_ajustado: Optional[float] = None
+
+    def aluno_id(self) -> int:
+        return self.rng.choice(self.dados.alunos[self.unidade_id])
+
+
+class Cenario(NamedTuple):
+    """Ação medida: devolve a janela usada (para contar os itens Qt)"""
+
+    nome: str
+    executar: Callable[[Contexto], QWidget]
+    # Ação do rastreio de requisições cujo orçamento é conferido (Config.ORCAMENTO_REQUISICOES)
+    acao: Optional[str] = None
+
+
+def _lista_pronta(tela) -> bool:
+    return tela._tarefa_lista is None and not tela._sincronizacao_pendente
+
+
+def _abrir_tela_principal(ctx: Contexto) -> QWidget:
+    from ui.tela_principal import TelaPrincipal
+
+    if ctx.tela is not None:
+        ctx.tela.close()
+        ctx.tela.deleteLater()
+    ctx.tela = TelaPrincipal(ctx.unidade_id, "Unidade", ctx.instrutor_id, "Instrutor")
+    ctx.tela.show()
+    aguardar(lambda: _lista_pronta(ctx.tela))
+    ctx.tela.grab()
+    return ctx.tela
+
+
+def _atualizar_lista(completa: bool) -> Callable[[Contexto], QWidget]:
+    def executar(ctx: Contexto) -> QWidget:
+        if ctx.tela is None:
+            _abrir_tela_principal(ctx)
+        if not completa:
+            # Outro instrutor editou um aluno: é o que a sincronização incremental traz
+            db.client.table("alunos").update({"modulo": f"Módulo {ctx.rng.randint(1, 8)}"}).eq(
+                "id", ctx.aluno_id()
+            ).execute()
+        db.cache.limpar()
+        inicio = time.perf_counter()
+        ctx.tela.atualizar_lista(completa=completa)
+        aguardar(lambda: _lista_pronta(ctx.tela))
+        ctx.tela.grab()
+        ctx.tempo_ajustado = time.perf_counter() - inicio
+        return ctx.tela
+    return executar
+
+
+def _buscar_alunos(ctx: Contexto) -> QWidget:
+    if ctx.tela is None:
+        _abrir_tela_principal(ctx)
+    # Parte do nome de um aluno, como um instrutor digitaria
+    nome = db.client.table("alunos").select("nome").eq("id", ctx.aluno_id()).execute().data[0]["nome"]
+    ctx.tela.campo_busca.blockSignals(True)
+    ctx.tela.campo_busca.setText(nome[:5])
+    ctx.tela.campo_busca.blockSignals(False)
+    db.cache.limpar()
+    inicio = time.perf_counter()
+    ctx.tela.buscar_alunos()
+    aguardar(lambda: ctx.tela._tarefa_busca is None)
+    ctx.tela.grab()
+    ctx.tempo_ajustado = time.perf_counter() - inicio
+    # Volta à lista completa para os cenários seguintes
+    ctx.tela.campo_busca.blockSignals(True)
+    ctx.tela.campo_busca.clear()
+    ctx.tela.campo_busca.blockSignals(False)
+    ctx.tela._encerrar_busca()
+    return ctx.tela
+
+
+def _abrir_dialog_logs(ctx: Contexto) -> QWidget:
+    from ui.dialog_logs import DialogLogs
+
+    dialog = DialogLogs(ctx.unidade_id, parent=ctx.tela)
+    dialog.show()
+    aguardar(lambda: not dialog.modelo.carregando)
+    dialog.grab()
+    return dialog
+
+
+def _carregar_logs(ctx: Contexto) -> QWidget:
+    from ui.dialog_logs import DialogLogs
+
+    dialog = DialogLogs(ctx.unidade_id, parent=ctx.tela)
+    dialog.show()
+    aguardar(lambda: not dialog.modelo.carregando)
+    db.cache.limpar()
+    inicio = time.perf_counter()
+    dialog.carregar_logs()
+    aguardar(lambda: not dialog.modelo.carregando)
+    dialog.grab()
+    ctx.tempo_ajustado = time.perf_counter() - inicio
+    return dialog
+
+
+def _abrir_dialog_acoes(ctx: Contexto) -> QWidget:
+    from ui.dialog_acoes import DialogAcoes
+
+    dialog = DialogAcoes(ctx.aluno_id(), "Aluno", ctx.instrutor_id, ctx.unidade_id, parent=ctx.tela)
+    dialog.show()
+    aguardar(lambda: dialog._tarefa_acoes is None)
+    dialog.grab()
+    return dialog
+
+
+def _carregar_acoes(ctx: Contexto) -> QWidget:
+    from ui.dialog_acoes import DialogAcoes
+
+    dialog = DialogAcoes(ctx.aluno_id(), "Aluno", ctx.instrutor_id, ctx.unidade_id, parent=ctx.tela)
+    dialog.show()
+    aguardar(lambda: dialog._tarefa_acoes is None)
+    db.cache.limpar()
+    inicio = time.perf_counter()
+    dialog.carregar_acoes()
+    aguardar(lambda: dialog._tarefa_acoes is None)
+    dialog.grab()
+    ctx.tempo_ajustado = time.perf_counter() - inicio
+    return dialog
+
+
+def _abrir_dialog_aluno(ctx: Contexto) -> QWidget:
+    from ui.dialog_aluno import DialogAluno
+
+    dialog = DialogAluno(ctx.unidade_id, ctx.instrutor_id, ctx.aluno_id(), parent=ctx.tela)
+    dialog.show()
+    QApplication.processEvents()
+    dialog.grab()
+    return dialog
+
+
+def _abrir_pre_carregado(abrir: Callable[[Contexto, int], QWidget],
+                        pronto: Callable[[QWidget], bool]) -> Callable[[Contexto], QWidget]:
+    """Abre o dialog de um aluno já pré-carregado, com o cache de consultas vazio"""
+    def executar(ctx: Contexto) -> QWidget:
+        aluno_id = ctx.aluno_id()
+        # Como ao selecionar a linha na tela principal
+        db.pre_carregar_aluno(aluno_id)
+        db.cache.limpar()
+        inicio = time.perf_counter()
+        dialog = abrir(ctx, aluno_id)
+        dialog.show()
+        QApplication.processEvents()
+        dialog.grab()
+        # Só a abertura interessa; a conferência em segundo plano termina fora da medição
+        ctx.tempo_ajustado = time.perf_counter() - inicio
+        aguardar(lambda: pronto(dialog))
+        return dialog
+    return executar
+
+
+def _dialog_aluno(ctx: Contexto, aluno_id: int) -> QWidget:
+    from ui.dialog_aluno import DialogAluno
+
+    return DialogAluno(ctx.unidade_id, ctx.instrutor_id, aluno_id, parent=ctx.tela)
+
+
+def _dialog_acoes(ctx: Contexto, aluno_id: int) -> QWidget:
+    from ui.dialog_acoes import DialogAcoes
+
+    return DialogAcoes(aluno_id, "Aluno", ctx.instrutor_id, ctx.unidade_id, parent=ctx.tela)
+
+
+CENARIOS = [
+    Cenario("TelaPrincipal.abrir", _abrir_tela_principal, "abrir_tela_principal"),
+    Cenario("TelaPrincipal.atualizar_lista[completa]", _atualizar_lista(True), "atualizar_lista"),
+    Cenario("TelaPrincipal.atualizar_lista[delta]", _atualizar_lista(False), "atualizar_lista"),
+    Cenario("TelaPrincipal.buscar_alunos", _buscar_alunos, "buscar_alunos"),
+    Cenario("DialogLogs.abrir", _abrir_dialog_logs, "abrir_logs"),
+    Cenario("DialogLogs.carregar_logs", _carregar_logs),
+    Cenario("DialogAcoes.abrir", _abrir_dialog_acoes, "abrir_acoes"),
+    Cenario("DialogAcoes.carregar_acoes", _carregar_acoes),
+    Cenario(
+        "DialogAcoes.abrir[pre-carregado]",
+        _abrir_pre_carregado(_dialog_acoes, lambda dialog: dialog._tarefa_acoes is None),
+        "abrir_acoes"
+    ),
+    Cenario("DialogAluno.abrir", _abrir_dialog_aluno, "abrir_aluno"),
+    Cenario(
+        "DialogAluno.abrir[pre-carregado]",
+        _abrir_pre_carregado(_dialog_aluno, lambda dialog: dialog._tarefa_revalidacao is None),
+        "abrir_aluno"
+    ),
+]
+
+
+# ============================================
+# EXECUÇÃO
+# ============================================
+
+def medir_cenario(ctx: Contexto, cenario: Cenario, repeticoes: int) -> Dict[str, Any]:
+    """Executa um cenário várias vezes e resume tempo, memória e itens Qt"""
+    tempos = []
+    requisicoes = []
+    itens: Dict[str, int] = {}
+    pico_antes = memoria_pico_kb()
+
+    for _ in range(repeticoes):
+        db.cache.limpar()
+        ctx.tempo_ajustado = None
+        inicio = time.perf_counter()
+        with rastreador.acao(cenario.nome) as contagem:
+            janela = cenario.executar(ctx)
+        tempo = time.perf_counter() - inicio
+        if cenario.acao:
+            contagem = rastreador.ultimas_acoes(cenario.acao)[-1]
+        requisicoes.append(contagem.requisicoes)
+        # Cenários que só medem a recarga descontam a abertura do dialog
+        tempos.append((ctx.tempo_ajustado if ctx.tempo_ajustado is not None else tempo) * 1000)
+        itens = contar_itens_qt(janela)
+
+        if janela is not ctx.tela:
+            janela.close()
+            janela.deleteLater()
+        QApplication.processEvents()
+    gc.collect()
+
+    pico_depois = memoria_pico_kb()
+    orcamento = Config.ORCAMENTO_REQUISICOES.get(cenario.acao)
+    return {
+        "repeticoes": repeticoes,
+        "tempo_ms": {
+            "min": round(min(tempos), 3),
+            "p50": round(percentil(tempos, 50), 3),
+            "p95": round(percentil(tempos, 95), 3),
+            "max": round(max(tempos), 3),
+        },
+        "requisicoes": max(requisicoes),
+        "orcamento_requisicoes": orcamento,
+        "dentro_do_orcamento": orcamento is None or max(requisicoes) <= orcamento,
+        "memoria_pico_kb": pico_depois,
+        "memoria_pico_aumento_kb": (
+            pico_depois - pico_antes if pico_depois is not None and pico_antes is not None else None
+        ),
+        **itens,
+    }
+
+
+def executar(tamanhos: List[str], backend: str = "memoria", repeticoes: int = 5,
+             semente: int = 42, cenarios: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Mede as telas para cada tamanho de base (um banco novo por tamanho)
+
+    Args:
+        tamanhos: Chaves de TAMANHOS ("1k", "10k", "100k") ou números de alunos
+        backend: "memoria" (padrão) ou "sqlite" (em memória)
+        repeticoes: Execuções de cada cenário
+        semente: Semente dos dados e da escolha de alunos
+        cenarios: Nomes dos cenários a medir (todos, se omitido)
+
+    Returns:
+        dict: Relatório serializável em JSON
+    """
+    if backend not in ("sqlite", "memoria"):
+        raise ValueError("As medições usam somente os backends locais (sqlite ou memoria)")
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    Config.BACKEND = backend
+    Config.SQLITE_ARQUIVO = ":memory:"
+    Config.TEMPO_REAL = ""
+
+    relatorio = {
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "backend": backend,
+        "semente": semente,
+        "repeticoes": repeticoes,
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "qt_plataforma": app.platformName(),
+        "tamanhos": {},
+    }
+
+    for tamanho in tamanhos:
+        total_alunos = TAMANHOS.get(tamanho) or int(tamanho)
+        # A interface usa a instância global db
+        sucesso, mensagem = db.conectar()
+        if not sucesso:
+            raise RuntimeError(mensagem)
+        dados = gerar_dados(db.client, total_alunos, semente)
+        print(f"[{tamanho}] dados gerados: {dados.como_dict()}", file=sys.stderr)
+
+        ctx = Contexto(dados, random.Random(semente))
+        # Como no uso real: a tela de seleção do instrutor lê os instrutores
+        # da unidade (e os nomes exibidos nas listas) antes da tela principal
+        db.listar_instrutores(ctx.unidade_id)
+        resultados = {}
+        for cenario in CENARIOS:
+            if cenarios and cenario.nome not in cenarios:
+                continue
+            resultados[cenario.nome] = medir_cenario(ctx, cenario, repeticoes)
+            resultado = resultados[cenario.nome]
+            print(f"[{tamanho}] {cenario.nome}: p50 {resultado['tempo_ms']['p50']} ms, "
+                  f"p95 {resultado['tempo_ms']['p95']} ms, {resultado['requisicoes']} requisição(ões)"
+                  + ("" if resultado["dentro_do_orcamento"] else " - ACIMA DO ORÇAMENTO"),
+                  file=sys.stderr)
+
+        if ctx.tela is not None:
+            ctx.tela.close()
+            ctx.tela.deleteLater()
+            QApplication.processEvents()
+
+        relatorio["tamanhos"][tamanho] = {"dados": dados.como_dict(), "telas": resultados}
+        db.backend.encerrar()
+
+    return relatorio
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Mede a abertura e a atualização das telas sem janela")
+    parser.add_argument("--tamanhos", default="1k,10k", help="Ex.: 1k,10k,100k ou números de alunos")
+    parser.add_argument("--backend", default="memoria", choices=["memoria", "sqlite"])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--cenarios", help="Nomes separados por vírgula (padrão: todos)")
+    parser.add_argument("--saida", help="Arquivo JSON do relatório (padrão: saída padrão)")
+    args = parser.parse_args(argv)
+
+    relatorio = executar(
+        args.tamanhos.split(","), args.backend, args.repeticoes, args.semente,
+        args.cenarios.split(",") if args.cenarios else None
+    )
+
+    texto = json.dumps(relatorio, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(texto)
+    else:
+        print(texto)
+
+    # Uma tela acima do orçamento de requisições falha a medição (código de saída 1)
+    excedidos = [
+        f"{tamanho}/{nome}"
+        for tamanho, medicao in relatorio["tamanhos"].items()
+        for nome, resultado in medicao["telas"].items()
+        if not resultado["dentro_do_orcamento"]
+    ]
+    if excedidos:
+        print(f"Acima do orçamento de requisições: {', '.join(excedidos)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,389 @@
+"""
+Verificação dos Planos de Consulta
+Cria o schema.sql em um Postgres local, preenche com dados
+sintéticos e confere com EXPLAIN que cada consulta do DatabaseManager é
+atendida por um índice (Index Scan ou Index Only Scan, sem Sort)
+
+Uso:
+    python -m benchmarks.planos_consultas --dsn postgresql://postgres@localhost/postgres
+
+Requer o pacote psycopg (pip install "psycopg[binary]"), que o aplicativo
+não usa. Tudo é criado em um schema próprio (verificacao_planos), removido
+ao final (--manter preserva para inspeção).
+
+As consultas são o SQL equivalente ao que o PostgREST gera para cada
+chamada (filtros, ordenação e limite da paginação por keyset); os recursos
+embutidos (ex.: instrutores(nome)) são junções pela chave primária e não
+mudam o acesso à tabela principal. Cada plano é obtido com enable_seqscan
+desligado, o que mostra se existe um índice que atende a consulta
+independente do volume de dados; o plano natural também é exibido, com o
+tempo de execução (EXPLAIN ANALYZE). Consultas com meta de tempo (ex.: a
+busca de alunos, 100 ms) falham acima dela: use --alunos 200000 para medir
+com 100 mil alunos por unidade.
+"""
+
+from typing import Optional, List, Dict, Any, NamedTuple, Tuple
+from datetime import datetime, timedelta
+import argparse
+import json
+import os
+import sys
+
+
+RAIZ_PROJETO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCHEMA_VERIFICACAO = "verificacao_planos"
+
+# Tipos de nó que leem um intervalo do índice
+NOS_INDICE = ("Index Scan", "Index Only Scan", "Index Scan Backward", "Bitmap Index Scan")
+
+
+class Verificacao(NamedTuple):
+    """Uma consulta do DatabaseManager e o índice que deve atendê-la"""
+
+    nome: str
+    sql: str
+    indice: str
+    # Consultas com ORDER BY não podem ter um nó Sort no plano
+    ordenada: bool = True
+    # Tempo máximo de execução (ms) no plano natural, se houver meta
+    limite_ms: Optional[float] = None
+
+
+VERIFICACOES = [
+    Verificacao(
+        "tabela_instrutores",
+        "SELECT id, nome, ativo, unidade_id FROM instrutores "
+        "WHERE unidade_id = %(unidade)s ORDER BY nome",
+        "idx_instrutores_unidade_nome",
+    ),
+    Verificacao(
+        "listar_alunos[ativos]",
+        "SELECT id, nome, situacao_academica, instrutor_id, acoes_pendentes FROM alunos "
+        "WHERE unidade_id = %(unidade)s AND arquivado = FALSE ORDER BY nome, id LIMIT 500",
+        "idx_alunos_ativos",
+    ),
+    Verificacao(
+        "listar_alunos[ativos, página seguinte]",
+        "SELECT id, nome, situacao_academica, instrutor_id, acoes_pendentes FROM alunos "
+        "WHERE unidade_id = %(unidade)s AND arquivado = FALSE "
+        "AND (nome > %(cursor_nome)s OR (nome = %(cursor_nome)s AND id > %(cursor_id)s)) "
+        "ORDER BY nome, id LIMIT 500",
+        "idx_alunos_ativos",
+    ),
+    Verificacao(
+        "listar_alunos[contagem]",
+        "SELECT count(*) FROM alunos WHERE unidade_id = %(unidade)s AND arquivado = FALSE",
+        "idx_alunos_ativos",
+        ordenada=False,
+    ),
+    Verificacao(
+        "listar_alunos[com arquivados]",
+        "SELECT id, nome, arquivado FROM alunos "
+        "WHERE unidade_id = %(unidade)s ORDER BY nome, id LIMIT 500",
+        "idx_alunos_unidade_nome",
+    ),
+    Verificacao(
+        "listar_alunos[apenas arquivados]",
+        "SELECT id, nome, arquivado FROM alunos "
+        "WHERE unidade_id = %(unidade)s AND arquivado = TRUE ORDER BY nome, id LIMIT 500",
+        "idx_alunos_arquivados",
+    ),
+    Verificacao(
+        "sincronizar_alunos[delta]",
+        "SELECT id, nome, acoes_pendentes, atualizado_em FROM alunos "
+        "WHERE unidade_id = %(unidade)s AND arquivado = FALSE AND atualizado_em >= %(marca)s "
+        "ORDER BY atualizado_em, id LIMIT 500",
+        "idx_alunos_unidade_atualizado",
+    ),
+    Verificacao(
+        "listar_exclusoes",
+        "SELECT registro_id, excluido_em FROM registros_excluidos "
+        "WHERE tabela = 'alunos' AND unidade_id = %(unidade)s AND excluido_em >= %(marca)s "
+        "ORDER BY excluido_em, id LIMIT 1000",
+        "idx_registros_excluidos_busca",
+    ),
+    Verificacao(
+        "listar_acoes",
+        "SELECT id, acao_proposta, status, data_proposta FROM acoes "
+        "WHERE aluno_id = %(aluno)s ORDER BY data_proposta DESC, id DESC LIMIT 500",
+        "idx_acoes_aluno_data",
+    ),
+    Verificacao(
+        "reconciliar_acoes_pendentes[aluno]",
+        "SELECT count(*) FROM acoes WHERE aluno_id = %(aluno)s AND status = 'Pendente'",
+        "idx_acoes_pendentes",
+        ordenada=False,
+    ),
+    Verificacao(
+        "sincronizar_replica[acoes]",
+        "SELECT * FROM acoes WHERE atualizado_em >= %(marca)s "
+        "ORDER BY atualizado_em, id LIMIT 1000",
+        "idx_acoes_atualizado",
+    ),
+    Verificacao(
+        "listar_logs",
+        "SELECT id, atividade, data_hora, instrutor_id FROM logs "
+        "WHERE unidade_id = %(unidade)s ORDER BY data_hora DESC, id DESC LIMIT 100",
+        "idx_logs_unidade_data",
+    ),
+    Verificacao(
+        "listar_logs[página seguinte]",
+        "SELECT id, atividade, data_hora, instrutor_id FROM logs "
+        "WHERE unidade_id = %(unidade)s AND (data_hora < %(cursor_data)s "
+        "OR (data_hora = %(cursor_data)s AND id < %(cursor_log)s)) "
+        "ORDER BY data_hora DESC, id DESC LIMIT 100",
+        "idx_logs_unidade_data",
+    ),
+    Verificacao(
+        "listar_resumos_logs",
+        "SELECT id, dia, instrutor_nome, quantidade FROM logs_resumo_diario "
+        "WHERE unidade_id = %(unidade)s ORDER BY dia DESC, id DESC LIMIT 100",
+        "idx_logs_resumo_unidade_dia",
+    ),
+    Verificacao(
+        # Corpo da função buscar_alunos (schema.sql): os candidatos vêm do
+        # índice de trigramas e só eles são ordenados pela relevância
+        "buscar_alunos",
+        "SELECT a.id FROM alunos a "
+        "WHERE a.unidade_id = %(unidade)s AND a.arquivado = FALSE "
+        "AND (texto_busca_aluno(a.nome, a.curso_matriculado, a.observacoes) LIKE %(padrao_busca)s "
+        "OR %(termo_busca)s <%% texto_busca_aluno(a.nome, a.curso_matriculado, a.observacoes)) "
+        "ORDER BY word_similarity(%(termo_busca)s, texto_busca_aluno(a.nome, a.curso_matriculado, a.observacoes)) DESC, "
+        "a.nome, a.id LIMIT 50",
+        "idx_alunos_busca",
+        ordenada=False,
+        limite_ms=100,
+    ),
+    Verificacao(
+        "sincronizar_replica[logs]",
+        "SELECT * FROM logs WHERE unidade_id = %(unidade)s AND id > %(ultimo_log)s "
+        "ORDER BY id LIMIT 1000",
+        "idx_logs_unidade_id",
+    ),
+]
+
+# Dados sintéticos gerados no próprio banco (os triggers de acoes ficam
+# desligados durante a carga e o contador é preenchido pela reconciliação)
+CARGA_SQL = """
+INSERT INTO instrutores (nome, unidade_id, ativo)
+SELECT 'Instrutor ' || g, u.id, g %% 10 <> 0
+FROM unidades u, generate_series(1, %(instrutores)s) g;
+
+WITH inst AS (
+    SELECT unidade_id, array_agg(id ORDER BY id) AS ids FROM instrutores GROUP BY unidade_id
+)
+INSERT INTO alunos (nome, data_inicio, curso_matriculado, tipo_plano, situacao_academica,
+                    instrutor_id, unidade_id, arquivado, atualizado_em)
+SELECT 'Aluno ' || md5(inst.unidade_id || '-' || g), current_date - g %% 1000,
+       'Curso ' || g %% 8, (ARRAY['Convencional', 'Acelerado', 'Flex'])[1 + g %% 3],
+       (ARRAY['Regular', 'Atrasado', 'Adiantado', 'Formado(a)'])[1 + g %% 4],
+       inst.ids[1 + g %% array_length(inst.ids, 1)], inst.unidade_id, g %% 10 = 0,
+       now() - (g %% 365) * interval '1 day'
+FROM inst, generate_series(1, %(alunos)s) g;
+
+ALTER TABLE acoes DISABLE TRIGGER USER;
+INSERT INTO acoes (aluno_id, acao_proposta, status, data_proposta, atualizado_em)
+SELECT a.id, 'Ação ' || k,
+       CASE WHEN (a.id + k) %% 5 < 2 THEN 'Pendente' ELSE 'Concluída' END,
+       current_date - (a.id * 7 + k) %% 365, now() - ((a.id + k) %% 365) * interval '1 day'
+FROM alunos a, generate_series(1, 3) k;
+ALTER TABLE acoes ENABLE TRIGGER USER;
+SELECT reconciliar_acoes_pendentes();
+
+SELECT criar_particoes_logs(current_date - 366);
+INSERT INTO logs (atividade, unidade_id, data_hora)
+SELECT 'Atividade ' || g %% 6, u.id, now() - (g %% 525600) * interval '1 minute'
+FROM unidades u, generate_series(1, %(logs)s) g;
+"""
+
+
+def _ler_sql(caminho: str) -> str:
+    """Lê um script SQL sem os comandos que só existem no Supabase"""
+    with open(caminho, encoding="utf-8") as arquivo:
+        return "".join(
+            linha for linha in arquivo if "supabase_realtime" not in linha
+        )
+
+
+def _nos(plano: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Todos os nós de um plano (EXPLAIN FORMAT JSON)"""
+    nos = [plano]
+    for filho in plano.get("Plans", []):
+        nos.extend(_nos(filho))
+    return nos
+
+
+def _resumir(nos: List[Dict[str, Any]]) -> str:
+    return ", ".join(
+        f"{no['Node Type']}" + (f" ({no['Index Name']})" if no.get("Index Name") else "")
+        for no in nos if "Scan" in no["Node Type"] or no["Node Type"] == "Sort"
+    )
+
+
+def avaliar(verificacao: Verificacao, nos: List[Dict[str, Any]],
+            indices: Optional[set] = None) -> Optional[str]:
+    """
+    Confere um plano
+
+    Args:
+        indices: Nomes aceitos para o índice esperado (em uma tabela
+            particionada, os índices de cada partição)
+
+    Returns:
+        str: Motivo da falha, ou None se o plano usa o índice esperado
+    """
+    if any(no["Node Type"] == "Seq Scan" for no in nos):
+        return "leitura sequencial da tabela"
+    if verificacao.ordenada and any(no["Node Type"] in ("Sort", "Incremental Sort") for no in nos):
+        return "ordenação fora do índice"
+    if not any(no["Node Type"] in NOS_INDICE and no.get("Index Name") in (indices or {verificacao.indice}) for no in nos):
+        return f"não usa {verificacao.indice}"
+    return None
+
+
+def _indices_equivalentes(cursor, indice: str) -> set:
+    """O índice e, se ele for de uma tabela particionada, os índices das partições"""
+    cursor.execute(
+        "WITH RECURSIVE filhos AS ("
+        " SELECT %(indice)s::regclass AS oid"
+        " UNION ALL SELECT h.inhrelid FROM pg_inherits h JOIN filhos f ON h.inhparent = f.oid"
+        ") SELECT c.relname FROM filhos JOIN pg_class c ON c.oid = filhos.oid",
+        {"indice": indice}
+    )
+    return {linha[0] for linha in cursor.fetchall()}
+
+
+def _explicar(cursor, sql: str, parametros: Dict[str, Any],
+              executar: bool = False) -> Tuple[List[Dict[str, Any]], Optional[float]]:
+    """
+    Plano de uma consulta
+
+    Returns:
+        tuple: (nós do plano, tempo de execução em ms se executar=True)
+    """
+    opcoes = "ANALYZE, FORMAT JSON" if executar else "FORMAT JSON"
+    cursor.execute(f"EXPLAIN ({opcoes}) " + sql, parametros)
+    resultado = cursor.fetchone()[0]
+    if isinstance(resultado, str):
+        resultado = json.loads(resultado)
+    return _nos(resultado[0]["Plan"]), resultado[0].get("Execution Time")
+
+
+def preparar(conexao, alunos: int):
+    """Cria o schema de verificação, aplica schema.sql e carrega os dados"""
+    with conexao.cursor() as cursor:
+        cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA_VERIFICACAO} CASCADE")
+        cursor.execute(f"CREATE SCHEMA {SCHEMA_VERIFICACAO}")
+        cursor.execute(f"SET search_path TO {SCHEMA_VERIFICACAO}, public")
+
+        # schema.sql já tem o estado final (as migrações são para bancos antigos)
+        cursor.execute(_ler_sql(os.path.join(RAIZ_PROJETO, "schema.sql")))
+
+        por_unidade = max(1, alunos // 2)
+        cursor.execute(CARGA_SQL, {
+            "instrutores": max(2, por_unidade // 50),
+            "alunos": por_unidade,
+            "logs": por_unidade * 5,
+        })
+        for tabela in ("instrutores", "alunos", "acoes", "logs", "logs_resumo_diario", "registros_excluidos"):
+            # VACUUM preenche o mapa de visibilidade (Index Only Scan)
+            cursor.execute(f"VACUUM ANALYZE {tabela}")
+
+
+def parametros_das_consultas(cursor) -> Dict[str, Any]:
+    """Valores reais para os filtros (unidade maior, aluno com ações, cursores no meio da lista)"""
+    cursor.execute("SELECT unidade_id FROM alunos GROUP BY unidade_id ORDER BY count(*) DESC LIMIT 1")
+    unidade = cursor.fetchone()[0]
+    cursor.execute(
+        "SELECT nome, id FROM alunos WHERE unidade_id = %(unidade)s AND arquivado = FALSE "
+        "ORDER BY nome, id OFFSET 1000 LIMIT 1", {"unidade": unidade}
+    )
+    cursor_nome, cursor_id = cursor.fetchone() or ("", 0)
+    cursor.execute("SELECT aluno_id FROM acoes GROUP BY aluno_id ORDER BY count(*) DESC LIMIT 1")
+    aluno = cursor.fetchone()[0]
+    cursor.execute(
+        "SELECT data_hora, id FROM logs WHERE unidade_id = %(unidade)s "
+        "ORDER BY data_hora DESC, id DESC OFFSET 1000 LIMIT 1", {"unidade": unidade}
+    )
+    cursor_data, cursor_log = cursor.fetchone() or (datetime.now(), 0)
+    cursor.execute("SELECT coalesce(max(id), 0) FROM logs")
+    ultimo_log = max(0, cursor.fetchone()[0] - 100)
+    # Trecho de um nome existente, com um erro de digitação na última letra
+    termo_busca = cursor_nome[6:11] + "z"
+    return {
+        "termo_busca": termo_busca, "padrao_busca": f"%{termo_busca}%",
+        "unidade": unidade, "cursor_nome": cursor_nome, "cursor_id": cursor_id,
+        "aluno": aluno, "cursor_data": cursor_data, "cursor_log": cursor_log,
+        "ultimo_log": ultimo_log, "marca": datetime.now() - timedelta(days=1),
+    }
+
+
+def verificar(conexao) -> List[Dict[str, Any]]:
+    """Executa as verificações e devolve um resultado por consulta"""
+    resultados = []
+    with conexao.cursor() as cursor:
+        cursor.execute(f"SET search_path TO {SCHEMA_VERIFICACAO}, public")
+        parametros = parametros_das_consultas(cursor)
+        for verificacao in VERIFICACOES:
+            cursor.execute("SET enable_seqscan = on")
+            natural, tempo_ms = _explicar(cursor, verificacao.sql, parametros, executar=True)
+            cursor.execute("SET enable_seqscan = off")
+            forcado, _ = _explicar(cursor, verificacao.sql, parametros)
+            falha = avaliar(verificacao, forcado, _indices_equivalentes(cursor, verificacao.indice))
+            if falha is None and verificacao.limite_ms and tempo_ms > verificacao.limite_ms:
+                falha = f"{tempo_ms:.1f} ms (meta {verificacao.limite_ms:.0f} ms)"
+            resultados.append({
+                "consulta": verificacao.nome,
+                "indice": verificacao.indice,
+                "falha": falha,
+                "plano": _resumir(forcado),
+                "plano_natural": _resumir(natural),
+                "tempo_ms": tempo_ms,
+            })
+        cursor.execute("RESET enable_seqscan")
+    return resultados
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Confere com EXPLAIN os índices das consultas do DatabaseManager")
+    parser.add_argument("--dsn", default=os.getenv("PG_DSN", "postgresql://postgres@localhost:5432/postgres"),
+                        help="Conexão com um Postgres local (padrão: $PG_DSN)")
+    parser.add_argument("--alunos", type=int, default=20_000, help="Alunos sintéticos (divididos entre as unidades)")
+    parser.add_argument("--manter", action="store_true", help=f"Não remove o schema {SCHEMA_VERIFICACAO}")
+    parser.add_argument("--saida", help="Arquivo JSON com os planos")
+    args = parser.parse_args(argv)
+
+    try:
+        import psycopg
+    except ImportError:
+        print('Instale o psycopg para a verificação: pip install "psycopg[binary]"', file=sys.stderr)
+        return 2
+
+    # ClientCursor interpola os parâmetros: EXPLAIN não aceita parâmetros do protocolo estendido
+    with psycopg.connect(args.dsn, autocommit=True, cursor_factory=psycopg.ClientCursor) as conexao:
+        try:
+            preparar(conexao, args.alunos)
+            resultados = verificar(conexao)
+        finally:
+            if not args.manter:
+                conexao.execute(f"DROP SCHEMA IF EXISTS {SCHEMA_VERIFICACAO} CASCADE")
+
+    for resultado in resultados:
+        situacao = "FALHA" if resultado["falha"] else "OK"
+        print(f"{situacao:5} {resultado['consulta']} ({resultado['tempo_ms']:.2f} ms): {resultado['plano']}")
+        if resultado["falha"]:
+            print(f"      {resultado['falha']} (esperado {resultado['indice']})")
+        if resultado["plano_natural"] != resultado["plano"]:
+            print(f"      plano natural: {resultado['plano_natural']}")
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(resultados, arquivo, indent=2, ensure_ascii=False, default=str)
+
+    falhas = sum(1 for r in resultados if r["falha"])
+    print(f"\n{len(resultados) - falhas}/{len(resultados)} consultas atendidas por índice")
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
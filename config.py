@@ -30,7 +30,113 @@ class Config:
     APP_NAME = "Sistema de Gestão de Alunos"
     APP_VERSION = "1.0.0"
     ORGANIZATION = "SistemaGestao"
+
+    # ============================================
+    # CONFIGURAÇÕES DE DESEMPENHO
+    # ============================================
+    # Número de threads usadas para consultas em segundo plano
+    MAX_THREADS_CONSULTA = int(os.getenv("MAX_THREADS_CONSULTA", "4"))
+    
+    # Paginação: registros por requisição nas listagens e limite
+    # max-rows configurado no PostgREST do projeto (padrão do Supabase: 1000)
+    TAMANHO_PAGINA = int(os.getenv("TAMANHO_PAGINA", "500"))
+    POSTGREST_MAX_LINHAS = int(os.getenv("POSTGREST_MAX_LINHAS", "1000"))
+    
+    # Busca de alunos na tela principal: espera (ms) após a última tecla
+    # antes de consultar, tamanho mínimo do termo e resultados exibidos
+    BUSCA_ATRASO_MS = int(os.getenv("BUSCA_ATRASO_MS", "250"))
+    BUSCA_MIN_CARACTERES = int(os.getenv("BUSCA_MIN_CARACTERES", "2"))
+    BUSCA_LIMITE = int(os.getenv("BUSCA_LIMITE", "50"))
+    
+    # Sincronização incremental: intervalo (segundos) reconsultado antes da
+    # marca d'água, para cobrir transações confirmadas fora de ordem
+    SYNC_MARGEM_SEGUNDOS = float(os.getenv("SYNC_MARGEM_SEGUNDOS", "5"))
+    
+    # Cache de leitura do DatabaseManager
+    # Tempo de vida (segundos) das consultas em cache, por tabela (0 desativa)
+    CACHE_TTL_SEGUNDOS = {
+        "unidades": 600,
+        "instrutores": 120,
+        "alunos": 30,
+        "acoes": 30,
+        "logs": 10,
+        # Resumos diários não mudam depois de gravados; reter_logs invalida os novos
+        "logs_resumo_diario": 3600,
+    }
+    # Número máximo de consultas mantidas em cache (LRU)
+    CACHE_MAX_ENTRADAS = int(os.getenv("CACHE_MAX_ENTRADAS", "256"))
+    
+    # Pré-carregamento: o cadastro e as ações do aluno selecionado (ou sob
+    # o mouse por PRE_CARREGAMENTO_ATRASO_MS) são lidos em segundo plano e
+    # guardados para abrir os dialogs sem esperar o banco
+    PRE_CARREGAMENTO_ATRASO_MS = int(os.getenv("PRE_CARREGAMENTO_ATRASO_MS", "150"))
+    PRE_CARREGAMENTO_MAX_ALUNOS = int(os.getenv("PRE_CARREGAMENTO_MAX_ALUNOS", "20"))
+    PRE_CARREGAMENTO_TTL_SEGUNDOS = float(os.getenv("PRE_CARREGAMENTO_TTL_SEGUNDOS", "300"))
+    
+    # Escritas otimistas (ver ui/escritas): edições aparecem na hora e são
+    # enviadas em segundo plano; ao fechar, a aplicação espera até este
+    # tempo (segundos) pelas que ainda não foram confirmadas
+    ESCRITAS_ESPERA_ENCERRAMENTO = float(os.getenv("ESCRITAS_ESPERA_ENCERRAMENTO", "10"))
     
+    # Diagnóstico: chamadas ao DatabaseManager mantidas para a tela de
+    # diagnóstico (as mais antigas são descartadas)
+    DIAGNOSTICO_MAX_REGISTROS = int(os.getenv("DIAGNOSTICO_MAX_REGISTROS", "2000"))
+    # Mede os bytes de cada resposta (serializa o resultado de toda
+    # requisição); ligado pelas medições, desligado no uso normal
+    RASTREIO_MEDIR_BYTES = os.getenv("RASTREIO_MEDIR_BYTES", "0") == "1"
+    
+    # Vigia de travamentos (ver ui/vigia_travamentos): com um limite maior
+    # que zero, pausas do event loop do Qt acima dele (ms) são gravadas em
+    # VIGIA_ARQUIVO com a pilha da thread principal. Pode ficar ligado em produção.
+    VIGIA_TRAVAMENTOS_MS = int(os.getenv("VIGIA_TRAVAMENTOS_MS", "0"))
+    VIGIA_ARQUIVO = os.getenv("VIGIA_ARQUIVO", "travamentos.log")
+    
+    # Banco de dados: "supabase" (padrão), "sqlite" (arquivo local, uso em
+    # um único computador) ou "memoria" (sem persistência, para testes e medições)
+    BACKEND = os.getenv("BACKEND", "supabase")
+    SQLITE_ARQUIVO = os.getenv("SQLITE_ARQUIVO", "gestao_alunos.db")
+    
+    # Réplica local (modo offline): mantém uma cópia SQLite dos dados das
+    # unidades usadas, atende as leituras a partir dela e guarda as escritas
+    # em um diário reenviado ao Supabase quando a conexão volta
+    REPLICA_LOCAL = os.getenv("REPLICA_LOCAL", "0") == "1"
+    REPLICA_ARQUIVO = os.getenv("REPLICA_ARQUIVO", "replica_local.db")
+    REPLICA_INTERVALO_SINCRONIZACAO = float(os.getenv("REPLICA_INTERVALO_SINCRONIZACAO", "30"))
+    # Logs mais antigos que isso não são baixados na primeira sincronização
+    REPLICA_DIAS_LOGS = int(os.getenv("REPLICA_DIAS_LOGS", "30"))
+    
+    # Alterações em tempo real nas tabelas alunos e acoes:
+    # "supabase" (Supabase Realtime), "local" (somente eventos do próprio
+    # processo, ex.: downloads da réplica) ou "" para desativar
+    TEMPO_REAL = os.getenv("TEMPO_REAL", "supabase")
+    
+    # Orçamento de requisições por ação do usuário (ver rastreio_requisicoes):
+    # limite conferido pela medição da interface (python -m benchmarks.interface)
+    ORCAMENTO_REQUISICOES = {
+        "abrir_tela_principal": 2,
+        "atualizar_lista": 2,
+        "abrir_aluno": 1,
+        "salvar_aluno": 1,
+        "abrir_acoes": 1,
+        "propor_acao": 2,
+        "concluir_acao": 2,
+        "abrir_logs": 1,
+        "buscar_alunos": 2,
+    }
+    
+    # Fila de logs: os registros são enviados em lote a cada intervalo
+    # (segundos) ou quando a fila atinge o tamanho do lote. Se o Supabase
+    # estiver inacessível, ficam guardados no arquivo de pendentes; os que o
+    # servidor recusar vão para o arquivo de rejeitados.
+    LOG_INTERVALO_ENVIO = float(os.getenv("LOG_INTERVALO_ENVIO", "5"))
+    LOG_TAMANHO_LOTE = int(os.getenv("LOG_TAMANHO_LOTE", "20"))
+    LOG_ARQUIVO_PENDENTES = os.getenv("LOG_ARQUIVO_PENDENTES", "logs_pendentes.jsonl")
+    LOG_ARQUIVO_REJEITADOS = os.getenv("LOG_ARQUIVO_REJEITADOS", "logs_rejeitados.jsonl")
+    
+    # Retenção: logs detalhados dos últimos meses (além do atual); os mais
+    # antigos viram resumos diários por instrutor (ver reter_logs no schema.sql)
+    LOGS_MESES_RETIDOS = int(os.getenv("LOGS_MESES_RETIDOS", "12"))
+
     # ============================================
     # VALIDAÇÕES
     # ============================================
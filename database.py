@@ -3,69 +3,655 @@ Gerenciador de Banco de Dados
 Classe responsável por todas as operações com o Supabase
 """
 
-from typing import Optional, List, Dict, Any
-from datetime import datetime, date
-from supabase import create_client, Client
+from typing import Optional, List, Dict, Any, Callable, Tuple, Iterator, NamedTuple
+from collections import Counter, OrderedDict
+from datetime import datetime, date, timedelta
+from supabase import Client
+from postgrest.exceptions import APIError
+from backends import Backend, criar_backend
 from config import Config
+from diagnostico import instrumentar, monitor
+from entidades import ArmazemEntidades
+from rastreio_requisicoes import ClienteRastreado, rastreador
+from replica_local import ReplicaLocal, REFERENCIAS
+from tempo_real import EventoAlteracao, FonteAlteracoes, FonteLocal, FonteSupabaseRealtime
+import functools
+import inspect
 import json
+import threading
+import time
 
 
+# ============================================
+# CACHE DE CONSULTAS
+# ============================================
+
+class CacheConsultas:
+    """
+    Cache LRU com tempo de vida por tabela para as consultas de leitura
+
+    As entradas são indexadas por (método, argumentos). Os valores são
+    compartilhados entre chamadas e devem ser tratados como somente leitura.
+    """
+    
+    def __init__(self, max_entradas: int, ttl_por_tabela: Dict[str, float]):
+        self.max_entradas = max_entradas
+        self.ttl_por_tabela = dict(ttl_por_tabela)
+        self._entradas: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.RLock()
+        # Incrementada a cada invalidação: uma consulta iniciada antes de
+        # uma escrita não pode guardar um resultado já desatualizado
+        self.geracao = 0
+        self.acertos = 0
+        self.falhas = 0
+        # Acertos e falhas por método (chave[0]), para a tela de diagnóstico
+        self.acertos_por_metodo: Counter = Counter()
+        self.falhas_por_metodo: Counter = Counter()
+        
+    def obter(self, chave: tuple) -> Tuple[bool, Any]:
+        """
+        Busca uma entrada válida no cache
+        
+        Returns:
+            tuple: (encontrado: bool, valor)
+        """
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None or entrada[0] < time.monotonic():
+                if entrada is not None:
+                    del self._entradas[chave]
+                self.falhas += 1
+                self.falhas_por_metodo[chave[0]] += 1
+                return False, None
+            
+            self._entradas.move_to_end(chave)
+            self.acertos += 1
+            self.acertos_por_metodo[chave[0]] += 1
+            return True, entrada[1]
+        
+    def guardar(self, chave: tuple, tabela: str, valor: Any, geracao: int):
+        """Guarda um valor respeitando o TTL da tabela e o limite de entradas"""
+        ttl = self.ttl_por_tabela.get(tabela, 0)
+        if ttl <= 0:
+            return
+        
+        with self._lock:
+            if geracao != self.geracao:
+                return
+            self._entradas[chave] = (time.monotonic() + ttl, valor)
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+        
+    def invalidar(self, metodo: str, filtro: Optional[Callable[[dict, Any], bool]] = None) -> int:
+        """
+        Remove as entradas de um método
+        
+        Args:
+            metodo: Nome do método do DatabaseManager
+            filtro: Função (argumentos, valor) -> bool; se omitida, remove todas
+            
+        Returns:
+            int: Quantidade de entradas removidas
+        """
+        with self._lock:
+            self.geracao += 1
+            chaves = [
+                chave for chave, (_, valor) in self._entradas.items()
+                if chave[0] == metodo and (filtro is None or filtro(dict(chave[1]), valor))
+            ]
+            for chave in chaves:
+                del self._entradas[chave]
+            return len(chaves)
+        
+    def valores(self, metodo: str) -> List[Tuple[dict, Any]]:
+        """Lista (argumentos, valor) das entradas de um método, inclusive expiradas"""
+        with self._lock:
+            return [
+                (dict(chave[1]), valor)
+                for chave, (_, valor) in self._entradas.items()
+                if chave[0] == metodo
+            ]
+        
+    def limpar(self):
+        """Remove todas as entradas"""
+        with self._lock:
+            self.geracao += 1
+            self._entradas.clear()
+        
+    def taxa_acertos(self) -> Dict[str, Tuple[int, int]]:
+        """Acertos e falhas por método: {metodo: (acertos, falhas)}"""
+        with self._lock:
+            metodos = set(self.acertos_por_metodo) | set(self.falhas_por_metodo)
+            return {
+                metodo: (self.acertos_por_metodo[metodo], self.falhas_por_metodo[metodo])
+                for metodo in metodos
+            }
+        
+    def zerar_taxa_acertos(self):
+        """Recomeça a contagem de acertos e falhas por método"""
+        with self._lock:
+            self.acertos_por_metodo.clear()
+            self.falhas_por_metodo.clear()
+
+
+def _cacheado(tabela: str):
+    """
+    Decorator de leitura com cache (read-through)
+    
+    O resultado só é guardado se a consulta não tiver falhado, para que
+    um erro de rede não fique em cache como uma lista vazia.
+    """
+    def decorador(metodo):
+        assinatura = inspect.signature(metodo)
+        
+        @functools.wraps(metodo)
+        def envoltorio(self, *args, **kwargs):
+            argumentos = assinatura.bind(self, *args, **kwargs)
+            argumentos.apply_defaults()
+            chave = (metodo.__name__, tuple(list(argumentos.arguments.items())[1:]))
+            
+            encontrado, valor = self.cache.obter(chave)
+            if encontrado:
+                return valor
+            
+            geracao = self.cache.geracao
+            self._estado_thread.falhou = False
+            valor = metodo(self, *args, **kwargs)
+            if not self._estado_thread.falhou:
+                self.cache.guardar(chave, tabela, valor, geracao)
+            return valor
+        
+        return envoltorio
+    return decorador
+
+
+def _contem_id(valor: Any, registro_id: int) -> bool:
+    """Verifica se o resultado de uma consulta contém o registro informado"""
+    if isinstance(valor, dict):
+        return valor.get('id') == registro_id
+    if isinstance(valor, list):
+        return any(item.get('id') == registro_id for item in valor)
+    return False
+
+
+def _resumo_observacoes(observacoes: Optional[str]) -> Optional[str]:
+    """Mesma regra da coluna calculada observacoes_resumo (schema.sql)"""
+    if observacoes and len(observacoes) > 50:
+        return observacoes[:47] + "..."
+    return observacoes
+
+
+def _valor_filtro(valor: Any) -> str:
+    """Formata um valor para uso em filtros lógicos do PostgREST (or/and)"""
+    if isinstance(valor, bool):
+        return "true" if valor else "false"
+    if isinstance(valor, (int, float)):
+        return str(valor)
+    texto = str(valor).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{texto}"'
+
+
+def _filtro_keyset(ordem: List[Tuple[str, bool]], cursor: tuple) -> str:
+    """
+    Monta o filtro de paginação por keyset (seek) para o PostgREST
+    
+    Para a ordem [(a, desc), (b, desc)] e o cursor (x, y), gera
+    "a.lt.x,and(a.eq.x,b.lt.y)": os registros estritamente depois do cursor.
+    
+    Args:
+        ordem: Colunas da ordenação com o indicador de ordem decrescente
+        cursor: Valores das colunas no último registro da página anterior
+    """
+    condicoes = []
+    for i, (coluna, desc) in enumerate(ordem):
+        operador = "lt" if desc else "gt"
+        iguais = [
+            f"{col}.eq.{_valor_filtro(val)}"
+            for (col, _), val in zip(ordem[:i], cursor[:i])
+        ]
+        condicao = f"{coluna}.{operador}.{_valor_filtro(cursor[i])}"
+        if iguais:
+            condicao = f"and({','.join(iguais + [condicao])})"
+        condicoes.append(condicao)
+    return ",".join(condicoes)
+
+
+# ============================================
+# PERFIS DE COLUNAS (PROJEÇÕES)
+# ============================================
+# Cada tela pede apenas as colunas que exibe. "detalhe" traz o registro
+# completo (formulário de edição) e "exportacao" o registro completo com
+# os nomes relacionados, para ferramentas em lote. As colunas da ordenação
+# (nome/data e id) estão em todos os perfis usados pelos iteradores.
+# Os perfis das telas não embutem instrutores(nome): as linhas trazem só
+# o instrutor_id e o nome vem do armazém de entidades (ver entidades.py).
+PERFIS_COLUNAS: Dict[str, Dict[str, str]] = {
+    "alunos": {
+        # observacoes_resumo é uma coluna calculada (schema.sql) com os
+        # primeiros 50 caracteres: a lista não baixa o texto completo
+        "lista": "id, nome, situacao_academica, observacoes_resumo, instrutor_id, "
+                 "unidade_id, arquivado, atualizado_em",
+        "arquivo": "id, nome, curso_matriculado, data_inicio, situacao_academica, "
+                   "observacoes_resumo, instrutor_id, unidade_id, arquivado, atualizado_em",
+        "detalhe": "*",
+        "exportacao": "*, instrutores(nome)",
+    },
+    "acoes": {
+        "lista": "id, aluno_id, acao_proposta, status, data_proposta, data_conclusao, "
+                 "instrutor_resp_id",
+        "detalhe": "*",
+        "exportacao": "*, instrutores(nome)",
+    },
+    "logs": {
+        "lista": "id, atividade, data_hora, instrutor_id, unidade_id",
+        "exportacao": "*, instrutores(nome)",
+    },
+    "logs_resumo_diario": {
+        "lista": "id, dia, unidade_id, instrutor_id, instrutor_nome, quantidade, "
+                 "primeira_atividade, ultima_atividade",
+        "exportacao": "*",
+    },
+    "instrutores": {
+        "lista": "id, nome, ativo, unidade_id",
+        "detalhe": "*",
+        "exportacao": "*",
+    },
+}
+
+
+def colunas_do_perfil(tabela: str, perfil: str) -> str:
+    """
+    Retorna a lista de colunas (select do PostgREST) de um perfil
+    
+    Raises:
+        ValueError: Se a tabela ou o perfil não existirem
+    """
+    try:
+        return PERFIS_COLUNAS[tabela][perfil]
+    except KeyError:
+        raise ValueError(f"Perfil de colunas desconhecido: {tabela}/{perfil}")
+
+
+class ErroConsulta(Exception):
+    """Leitura que falhou, levantada por DatabaseManager.consultar"""
+
+
+class Pagina(NamedTuple):
+    """Página retornada pelos iteradores de listagem (paginação por keyset)"""
+    
+    registros: List[Dict[str, Any]]
+    # Valores das colunas de ordenação no último registro; permite retomar a iteração
+    cursor: Optional[tuple]
+    # Total de registros da consulta (somente se solicitado com contar_total)
+    total: Optional[int]
+
+
+class Alteracoes(NamedTuple):
+    """Resultado de uma sincronização incremental"""
+    
+    # Registros novos ou modificados desde a última sincronização
+    alterados: List[Dict[str, Any]]
+    # IDs que saíram do conjunto (excluídos no servidor ou arquivados)
+    removidos: List[int]
+    # True quando foi feita uma carga completa (alterados contém tudo)
+    completa: bool
+
+
+class ArmazemAlunos:
+    """
+    Cópia local dos alunos de uma unidade mantida por sincronização incremental
+    
+    A marca d'água é o maior atualizado_em (relógio do servidor) já recebido;
+    a próxima sincronização busca somente o que mudou a partir dela.
+    """
+    
+    def __init__(self):
+        self.linhas: Dict[int, Dict[str, Any]] = {}
+        self.marca: Optional[str] = None
+        self.lock = threading.Lock()
+    
+    def avancar_marca(self, valor: Optional[str]):
+        """Avança a marca d'água (nunca retrocede)"""
+        if valor and (self.marca is None or valor > self.marca):
+            self.marca = valor
+    
+    def ordenadas(self) -> List[Dict[str, Any]]:
+        """Linhas na ordem da lista (nome, id)"""
+        return sorted(self.linhas.values(), key=lambda a: (a['nome'].casefold(), a['id']))
+
+
+@instrumentar(monitor)
 class DatabaseManager:
     """Gerenciador de operações com o banco de dados Supabase"""
     
     def __init__(self):
         """Inicializa a conexão com o Supabase"""
         self.client: Optional[Client] = None
+        self.backend: Optional[Backend] = None
         self.conectado = False
+        # Requisições por ação do usuário (ver rastreio_requisicoes)
+        self.rastreador = rastreador
+        # Duração e erros de cada chamada (ver diagnostico)
+        self.monitor = monitor
+        self.cache = CacheConsultas(Config.CACHE_MAX_ENTRADAS, Config.CACHE_TTL_SEGUNDOS)
+        # Cadastro e ações dos alunos selecionados na tela principal, lidos
+        # antes de o dialog abrir (ver pre_carregar_aluno)
+        ttl_pre_carregamento = Config.PRE_CARREGAMENTO_TTL_SEGUNDOS
+        self.pre_carregados = CacheConsultas(
+            2 * Config.PRE_CARREGAMENTO_MAX_ALUNOS,
+            {"alunos": ttl_pre_carregamento, "acoes": ttl_pre_carregamento}
+        )
+        # Registros lidos, um dicionário por (tabela, id) compartilhado pelas telas
+        self.entidades = ArmazemEntidades()
+        self._estado_thread = threading.local()
+        self._armazens: Dict[Tuple[int, bool], ArmazemAlunos] = {}
+        self._lock_armazens = threading.Lock()
+        # Modo réplica: client lê/escreve no SQLite local e remoto é o Supabase
+        self.remoto: Optional[Client] = None
+        self.replica: Optional[ReplicaLocal] = None
+        self._lock_replica = threading.Lock()
+        # Alterações em tempo real (ver assinar_alteracoes)
+        self.fonte_alteracoes: Optional[FonteAlteracoes] = None
+        self._ouvintes: List[Callable[[EventoAlteracao], None]] = []
+        self._lock_ouvintes = threading.Lock()
         
     def conectar(self) -> tuple[bool, str]:
         """
-        Estabelece conexão com o Supabase
+        Estabelece conexão com o banco configurado em Config.BACKEND
         
         Returns:
             tuple: (sucesso: bool, mensagem: str)
         """
         try:
-            valido, mensagem = Config.validar_credenciais()
+            backend = criar_backend(Config.BACKEND)
+            valido, mensagem = backend.validar()
             if not valido:
                 return False, mensagem
             
-            self.client = create_client(Config.SUPABASE_URL, Config.SUPABASE_KEY)
+            if self.backend is not None and self.backend is not backend:
+                self.backend.encerrar()
+            self.backend = backend
+            self.client = ClienteRastreado(backend.criar_cliente(), self.rastreador)
+            self.cache.limpar()
+            self.pre_carregados.limpar()
+            self.entidades.limpar()
+            with self._lock_armazens:
+                self._armazens.clear()
+            
+            # A réplica só faz sentido para um banco compartilhado pela rede
+            if Config.REPLICA_LOCAL and backend.remoto:
+                self._conectar_replica()
+            
+            # No Supabase a retenção é agendada no servidor (reter_logs no
+            # pg_cron); os bancos locais e a réplica a aplicam ao conectar
+            if not backend.remoto or Config.REPLICA_LOCAL:
+                sucesso, mensagem = self.reter_logs()
+                if not sucesso:
+                    print(mensagem)
+            
             self.conectado = True
             return True, "Conectado com sucesso"
         except Exception as e:
             self.conectado = False
             return False, f"Erro ao conectar: {str(e)}"
     
+    def _conectar_replica(self):
+        """Passa a atender as consultas pela réplica local (modo offline)"""
+        self.remoto = self.client
+        if self.replica is None:
+            self.replica = ReplicaLocal(Config.REPLICA_ARQUIVO)
+        self.client = self.replica.cliente_consultas()
+        self.replica.ao_alterar = self._ao_alterar_replica
+        self.replica.ao_trocar_id = lambda tabela, id_local, id_remoto: self.entidades.trocar_id(
+            tabela, id_local, id_remoto, REFERENCIAS.get(tabela, [])
+        )
+        
+        # Na primeira execução, a seleção de unidade e instrutor depende do download
+        if self.replica.obter_marca("instrutores") is None:
+            sucesso, mensagem = self.sincronizar_replica()
+            if not sucesso:
+                print(mensagem)
+        self.replica.iniciar(self.sincronizar_replica, Config.REPLICA_INTERVALO_SINCRONIZACAO)
+    
+    def _erro_consulta(self, contexto: str, erro: Exception):
+        """Registra o erro de uma consulta de leitura (o resultado não vai para o cache)"""
+        self._estado_thread.falhou = True
+        # Sem o contexto: quem trata o ErroConsulta já diz o que estava carregando
+        self._estado_thread.erro = str(erro)
+        print(f"{contexto}: {erro}")
+    
+    def consultar(self, leitura: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Executa uma leitura e levanta ErroConsulta se ela falhou
+        
+        As leituras devolvem [] ou None quando falham, o que serve às
+        chamadas diretas; as tarefas em segundo plano passam por aqui para
+        que o erro chegue ao ao_falhar do executor em vez de parecer uma
+        lista vazia.
+        
+        Args:
+            leitura: Método de leitura (ex.: db.listar_acoes)
+            *args, **kwargs: Argumentos repassados à leitura
+            
+        Raises:
+            ErroConsulta: Com a mensagem registrada por _erro_consulta
+        """
+        self._estado_thread.falhou = False
+        valor = leitura(*args, **kwargs)
+        if self._estado_thread.falhou:
+            raise ErroConsulta(self._estado_thread.erro)
+        return valor
+    
+    def _iterar_keyset(self, construir_query: Callable[[bool], Any],
+                       ordem: List[Tuple[str, bool]], tamanho_pagina: int,
+                       contar_total: bool = False,
+                       cursor: Optional[tuple] = None) -> Iterator[Pagina]:
+        """
+        Percorre uma consulta em páginas usando paginação por keyset
+        
+        Cada página começa estritamente após o cursor da anterior, então o
+        custo de cada requisição não cresce com a posição na lista e nenhum
+        registro é perdido pelo limite max-rows do PostgREST.
+        
+        Args:
+            construir_query: Função (contar) -> query com select e filtros aplicados
+            ordem: Colunas da ordenação [(coluna, desc)]; a última deve ser única (id)
+            tamanho_pagina: Registros por requisição (limitado a Config.POSTGREST_MAX_LINHAS)
+            contar_total: Solicita o total (count="exact") na primeira página
+            cursor: Cursor de uma iteração anterior, para retomar dali
+        
+        Raises:
+            Exception: Erros da requisição são propagados ao chamador
+        """
+        tamanho_pagina = max(1, min(tamanho_pagina, Config.POSTGREST_MAX_LINHAS))
+        total = None
+        primeira = True
+        
+        while True:
+            query = construir_query(contar_total and primeira)
+            if cursor is not None:
+                query = query.or_(_filtro_keyset(ordem, cursor))
+            for coluna, desc in ordem:
+                query = query.order(coluna, desc=desc)
+            
+            response = query.limit(tamanho_pagina).execute()
+            registros = response.data
+            if primeira and contar_total:
+                total = response.count
+            if registros:
+                cursor = tuple(registros[-1][coluna] for coluna, _ in ordem)
+            
+            yield Pagina(registros, cursor, total)
+            
+            if len(registros) < tamanho_pagina:
+                return
+            primeira = False
+    
+    # ============================================
+    # INVALIDAÇÃO DO CACHE
+    # ============================================
+    
+    def _invalidar_alunos_da_unidade(self, unidade_id: Optional[int]):
+        """Invalida as listas de alunos de uma unidade (de todas, se desconhecida)"""
+        filtro = None
+        if unidade_id is not None:
+            filtro = lambda args, _: args.get('unidade_id') == unidade_id
+        for metodo in ("listar_alunos", "listar_alunos_com_pendencias", "buscar_alunos"):
+            self.cache.invalidar(metodo, filtro)
+    
+    def _unidade_do_aluno(self, aluno_id: int) -> Optional[int]:
+        """Descobre a unidade de um aluno pelo armazém ou pelas consultas em cache"""
+        aluno = self.entidades.obter("alunos", aluno_id)
+        if aluno is not None and 'unidade_id' in aluno:
+            return aluno['unidade_id']
+        for metodo in ("obter_aluno", "listar_alunos", "listar_alunos_com_pendencias"):
+            for argumentos, valor in self.cache.valores(metodo):
+                if isinstance(valor, dict) and valor.get('id') == aluno_id:
+                    return valor.get('unidade_id')
+                if _contem_id(valor, aluno_id):
+                    return argumentos.get('unidade_id')
+        return None
+    
+    def _invalidar_aluno(self, aluno_id: int, unidade_id: Optional[int] = None):
+        """Invalida o cadastro de um aluno e as listas em que ele aparece"""
+        if unidade_id is None:
+            unidade_id = self._unidade_do_aluno(aluno_id)
+        do_aluno = lambda args, _: args['aluno_id'] == aluno_id
+        self.cache.invalidar("obter_aluno", do_aluno)
+        self.pre_carregados.invalidar("obter_aluno", do_aluno)
+        self._invalidar_alunos_da_unidade(unidade_id)
+    
+    def _invalidar_acoes_do_aluno(self, aluno_id: Optional[int]):
+        """Invalida as ações e a contagem de pendências de um aluno"""
+        if aluno_id is None:
+            self.cache.invalidar("listar_acoes")
+            self.cache.invalidar("contar_acoes_pendentes")
+            self.cache.invalidar("listar_alunos_com_pendencias")
+            self.cache.invalidar("buscar_alunos")
+            self.pre_carregados.invalidar("listar_acoes")
+            return
+        
+        do_aluno = lambda args, _: args['aluno_id'] == aluno_id
+        self.cache.invalidar("listar_acoes", do_aluno)
+        self.pre_carregados.invalidar("listar_acoes", do_aluno)
+        self.cache.invalidar("contar_acoes_pendentes", do_aluno)
+        for metodo in ("listar_alunos_com_pendencias", "buscar_alunos"):
+            self.cache.invalidar(metodo, lambda _, valor: _contem_id(valor, aluno_id))
+    
+    # ============================================
+    # ARMAZÉM DE ENTIDADES
+    # ============================================
+    
+    def _ao_alterar_replica(self, tabela: str, tipo: str, registro: Dict[str, Any],
+                            anterior: Dict[str, Any]):
+        """Leva ao armazém de entidades e aos ouvintes um registro baixado para a réplica"""
+        if tipo == "DELETE":
+            self.entidades.remover(tabela, [anterior.get('id')])
+        elif self.entidades.obter(tabela, registro.get('id')) is not None:
+            # Só os registros já em memória: os demais chegam na próxima leitura
+            self._mesclar(tabela, [dict(registro)])
+        self._publicar(EventoAlteracao(tabela, tipo, registro, anterior))
+
+    def _mesclar(self, tabela: str, registros: List[Dict[str, Any]],
+                 inseridos: bool = False) -> List[Dict[str, Any]]:
+        """
+        Passa as linhas lidas pelo armazém de entidades e devolve as canônicas
+        
+        Linhas com as observações completas (perfil "detalhe") recebem o
+        resumo da lista, para que a linha exibida não fique com o antigo.
+        
+        Args:
+            inseridos: Linhas criadas por uma escrita local (os ouvintes
+                do armazém são avisados mesmo sendo novas)
+        """
+        if tabela == "alunos":
+            for registro in registros:
+                if 'observacoes' in registro and 'observacoes_resumo' not in registro:
+                    registro['observacoes_resumo'] = _resumo_observacoes(registro['observacoes'])
+                # Os backends locais guardam o jsonb como texto
+                if isinstance(registro.get('dia_horario'), str):
+                    try:
+                        registro['dia_horario'] = json.loads(registro['dia_horario'])
+                    except ValueError:
+                        pass
+        if inseridos:
+            return self.entidades.inserir(tabela, registros)
+        return self.entidades.mesclar(tabela, registros)
+    
+    def _resolver_instrutores(self, registros: List[Dict[str, Any]], coluna: str,
+                              unidade_id: Optional[int] = None):
+        """
+        Garante no armazém os instrutores referenciados pelas linhas
+        
+        A tabela de instrutores da unidade é lida uma vez (e já foi lida
+        pela tela de seleção do instrutor); só IDs de fora dela são
+        buscados, em uma requisição. Uma falha aqui não derruba a
+        listagem: a coluna do instrutor fica em branco.
+        """
+        ids = {registro.get(coluna) for registro in registros}
+        if not self.entidades.ids_ausentes("instrutores", ids):
+            return
+        
+        falhou = getattr(self._estado_thread, 'falhou', False)
+        if unidade_id is not None:
+            self.tabela_instrutores(unidade_id)
+        self._estado_thread.falhou = falhou
+        
+        faltando = self.entidades.ids_ausentes("instrutores", ids)
+        if not faltando:
+            return
+        try:
+            response = self.client.table("instrutores").select(
+                colunas_do_perfil("instrutores", "lista")
+            ).in_("id", faltando).execute()
+            self.entidades.mesclar("instrutores", response.data)
+        except Exception as e:
+            print(f"Erro ao buscar instrutores: {e}")
+    
     # ============================================
     # OPERAÇÕES COM UNIDADES
     # ============================================
     
+    @_cacheado("unidades")
     def listar_unidades(self) -> List[Dict[str, Any]]:
         """Lista todas as unidades"""
         try:
             response = self.client.table("unidades").select("*").execute()
             return response.data
         except Exception as e:
-            print(f"Erro ao listar unidades: {e}")
+            self._erro_consulta("Erro ao listar unidades", e)
             return []
     
     # ============================================
     # OPERAÇÕES COM INSTRUTORES
     # ============================================
     
-    def listar_instrutores(self, unidade_id: int, apenas_ativos: bool = True) -> List[Dict[str, Any]]:
-        """Lista instrutores de uma unidade"""
+    @_cacheado("instrutores")
+    def tabela_instrutores(self, unidade_id: int, perfil: str = "lista") -> List[Dict[str, Any]]:
+        """
+        Todos os instrutores de uma unidade (ativos e inativos), por nome
+        
+        Uma única leitura atende as telas de instrutores e os nomes exibidos
+        nas listas de alunos, ações e logs.
+        """
         try:
-            query = self.client.table("instrutores").select("*").eq("unidade_id", unidade_id)
-            if apenas_ativos:
-                query = query.eq("ativo", True)
-            response = query.order("nome").execute()
-            return response.data
+            response = self.client.table("instrutores").select(
+                colunas_do_perfil("instrutores", perfil)
+            ).eq("unidade_id", unidade_id).order("nome").execute()
+            return self._mesclar("instrutores", response.data)
         except Exception as e:
-            print(f"Erro ao listar instrutores: {e}")
+            self._erro_consulta("Erro ao listar instrutores", e)
             return []
     
+    def listar_instrutores(self, unidade_id: int, apenas_ativos: bool = True,
+                           perfil: str = "lista") -> List[Dict[str, Any]]:
+        """Lista instrutores de uma unidade (filtrados da tabela_instrutores)"""
+        return [
+            instrutor for instrutor in self.tabela_instrutores(unidade_id, perfil)
+            if instrutor.get('ativo') or not apenas_ativos
+        ]
+    
     def adicionar_instrutor(self, nome: str, unidade_id: int) -> tuple[bool, str]:
         """Adiciona um novo instrutor"""
         try:
@@ -74,7 +660,9 @@ class DatabaseManager:
                 "unidade_id": unidade_id,
                 "ativo": True
             }
-            self.client.table("instrutores").insert(data).execute()
+            response = self.client.table("instrutores").insert(data).execute()
+            self.entidades.inserir("instrutores", response.data)
+            self.cache.invalidar("tabela_instrutores", lambda args, _: args['unidade_id'] == unidade_id)
             return True, "Instrutor adicionado com sucesso"
         except Exception as e:
             return False, f"Erro ao adicionar instrutor: {str(e)}"
@@ -83,113 +671,858 @@ class DatabaseManager:
         """Marca um instrutor como inativo"""
         try:
             self.client.table("instrutores").update({"ativo": False}).eq("id", instrutor_id).execute()
+            # Os dicionários em cache são os do armazém: todos passam a vê-lo inativo
+            self.entidades.alterar("instrutores", instrutor_id, {"ativo": False})
             return True, "Instrutor excluído com sucesso"
         except Exception as e:
             return False, f"Erro ao excluir instrutor: {str(e)}"
     
-    def obter_instrutor(self, instrutor_id: int) -> Optional[Dict[str, Any]]:
+    @_cacheado("instrutores")
+    def obter_instrutor(self, instrutor_id: int, perfil: str = "detalhe") -> Optional[Dict[str, Any]]:
         """Obtém dados de um instrutor específico"""
         try:
-            response = self.client.table("instrutores").select("*").eq("id", instrutor_id).execute()
-            return response.data[0] if response.data else None
+            response = self.client.table("instrutores").select(
+                colunas_do_perfil("instrutores", perfil)
+            ).eq("id", instrutor_id).execute()
+            return self._mesclar("instrutores", response.data)[0] if response.data else None
         except Exception as e:
-            print(f"Erro ao obter instrutor: {e}")
+            self._erro_consulta("Erro ao obter instrutor", e)
             return None
     
     # ============================================
     # OPERAÇÕES COM ALUNOS
     # ============================================
     
-    def listar_alunos(self, unidade_id: int, incluir_arquivados: bool = False) -> List[Dict[str, Any]]:
-        """Lista alunos de uma unidade"""
+    def _consulta_alunos(self, unidade_id: int, incluir_arquivados: bool,
+                         colunas: str, contar: bool = False,
+                         apenas_arquivados: bool = False):
+        """Monta a consulta base de alunos de uma unidade"""
+        query = self.client.table("alunos").select(
+            colunas, count="exact" if contar else None
+        ).eq("unidade_id", unidade_id)
+        
+        if apenas_arquivados:
+            # Atendida pelo índice parcial idx_alunos_arquivados
+            query = query.eq("arquivado", True)
+        elif not incluir_arquivados:
+            query = query.eq("arquivado", False)
+        return query
+    
+    def iterar_alunos(self, unidade_id: int, incluir_arquivados: bool = False,
+                      tamanho_pagina: int = Config.TAMANHO_PAGINA,
+                      contar_total: bool = False,
+                      apenas_arquivados: bool = False,
+                      perfil: str = "lista") -> Iterator[Pagina]:
+        """
+        Percorre os alunos de uma unidade em páginas ordenadas por (nome, id)
+        
+        Args:
+            apenas_arquivados: Filtra no servidor somente os alunos arquivados
+            perfil: Perfil de colunas (ver PERFIS_COLUNAS)
+        
+        Returns:
+            Iterator[Pagina]: Páginas com memória limitada ao tamanho da página
+        """
+        return self._iterar_keyset(
+            lambda contar: self._consulta_alunos(
+                unidade_id, incluir_arquivados, colunas_do_perfil("alunos", perfil), contar,
+                apenas_arquivados
+            ),
+            [("nome", False), ("id", False)],
+            tamanho_pagina,
+            contar_total
+        )
+    
+    def iterar_alunos_com_pendencias(self, unidade_id: int, incluir_arquivados: bool = False,
+                                     tamanho_pagina: int = Config.TAMANHO_PAGINA,
+                                     contar_total: bool = False,
+                                     perfil: str = "lista",
+                                     alterados_desde: Optional[str] = None) -> Iterator[Pagina]:
+        """
+        Percorre os alunos de uma unidade com a contagem de ações pendentes
+        
+        A contagem é a coluna alunos.acoes_pendentes, mantida pelos triggers
+        de acoes (schema.sql): a página é uma leitura simples da tabela, sem
+        contar as ações de cada aluno. Cada aluno traz 'acoes_pendentes' (int).
+        
+        Args:
+            alterados_desde: Se informado, traz somente os alunos com
+                atualizado_em >= esse instante, ordenados por (atualizado_em, id)
+        """
+        colunas = f"{colunas_do_perfil('alunos', perfil)}, acoes_pendentes"
+        ordem = [("nome", False), ("id", False)]
+        if alterados_desde is not None:
+            ordem = [("atualizado_em", False), ("id", False)]
+        
+        def construir_query(contar: bool):
+            query = self._consulta_alunos(unidade_id, incluir_arquivados, colunas, contar)
+            if alterados_desde is not None:
+                query = query.gte("atualizado_em", alterados_desde)
+            return query
+        
+        yield from self._iterar_keyset(construir_query, ordem, tamanho_pagina, contar_total)
+    
+    @_cacheado("alunos")
+    def listar_alunos(self, unidade_id: int, incluir_arquivados: bool = False,
+                      apenas_arquivados: bool = False,
+                      perfil: str = "lista") -> List[Dict[str, Any]]:
+        """
+        Lista alunos de uma unidade
+        
+        Args:
+            unidade_id: ID da unidade
+            incluir_arquivados: Inclui os arquivados junto com os ativos
+            apenas_arquivados: Retorna somente os arquivados (filtrado no servidor)
+            perfil: Perfil de colunas (ver PERFIS_COLUNAS)
+        """
         try:
-            query = self.client.table("alunos").select(
-                "*, instrutores(nome)"
-            ).eq("unidade_id", unidade_id)
+            alunos = []
+            for pagina in self.iterar_alunos(
+                unidade_id, incluir_arquivados,
+                apenas_arquivados=apenas_arquivados, perfil=perfil
+            ):
+                alunos.extend(pagina.registros)
+            alunos = self._mesclar("alunos", alunos)
+            self._resolver_instrutores(alunos, 'instrutor_id', unidade_id)
+            return alunos
+        except Exception as e:
+            self._erro_consulta("Erro ao listar alunos", e)
+            return []
+
+    @_cacheado("alunos")
+    def listar_alunos_com_pendencias(self, unidade_id: int, incluir_arquivados: bool = False,
+                                     perfil: str = "lista") -> List[Dict[str, Any]]:
+        """
+        Lista alunos de uma unidade já com a contagem de ações pendentes
+
+        Returns:
+            list: Alunos com a chave extra 'acoes_pendentes' (int)
+        """
+        try:
+            alunos = []
+            for pagina in self.iterar_alunos_com_pendencias(
+                unidade_id, incluir_arquivados, perfil=perfil
+            ):
+                alunos.extend(pagina.registros)
+            alunos = self._mesclar("alunos", alunos)
+            self._resolver_instrutores(alunos, 'instrutor_id', unidade_id)
+            return alunos
+        except Exception as e:
+            self._erro_consulta("Erro ao listar alunos", e)
+            return []
+
+    @_cacheado("alunos")
+    def buscar_alunos(self, unidade_id: int, termo: str, incluir_arquivados: bool = False,
+                      limite: int = Config.BUSCA_LIMITE,
+                      deslocamento: int = 0) -> List[Dict[str, Any]]:
+        """
+        Busca alunos por nome, curso ou observações, tolerando acentos e
+        erros de digitação (função buscar_alunos do schema.sql, atendida
+        pelo índice de trigramas idx_alunos_busca)
+        
+        Args:
+            unidade_id: ID da unidade
+            termo: Texto digitado (termos curtos demais não são buscados)
+            incluir_arquivados: Inclui os arquivados junto com os ativos
+            limite: Quantidade máxima de alunos
+            deslocamento: Alunos pulados, para as páginas seguintes
             
-            if not incluir_arquivados:
-                query = query.eq("arquivado", False)
+        Returns:
+            list: Alunos mais relevantes primeiro, com 'acoes_pendentes'
+        """
+        termo = termo.strip()
+        if len(termo) < Config.BUSCA_MIN_CARACTERES:
+            return []
+        try:
+            ranking = self.client.rpc("buscar_alunos", {
+                "p_unidade_id": unidade_id,
+                "p_termo": termo,
+                "p_incluir_arquivados": incluir_arquivados,
+                "p_limite": limite,
+                "p_deslocamento": deslocamento,
+            }).execute().data
+            if not ranking:
+                return []
             
-            response = query.order("nome").execute()
-            return response.data
+            posicoes = {item['aluno_id']: posicao for posicao, item in enumerate(ranking)}
+            response = self.client.table("alunos").select(
+                f"{colunas_do_perfil('alunos', 'lista')}, acoes_pendentes"
+            ).in_("id", list(posicoes)).execute()
+            
+            alunos = sorted(response.data, key=lambda aluno: posicoes[aluno['id']])
+            alunos = self._mesclar("alunos", alunos)
+            self._resolver_instrutores(alunos, 'instrutor_id', unidade_id)
+            return alunos
         except Exception as e:
-            print(f"Erro ao listar alunos: {e}")
+            self._erro_consulta("Erro ao buscar alunos", e)
             return []
+
+    @staticmethod
+    def _preparar_dados_aluno(dados: Dict[str, Any]) -> Dict[str, Any]:
+        """Converte os valores do formulário para o formato gravado no banco"""
+        # Converter data_inicio para string no formato ISO
+        if isinstance(dados.get('data_inicio'), date):
+            dados['data_inicio'] = dados['data_inicio'].isoformat()
+        
+        # Garantir que dia_horario seja JSON
+        if 'dia_horario' in dados and isinstance(dados['dia_horario'], dict):
+            dados['dia_horario'] = json.dumps(dados['dia_horario'])
+        return dados
     
     def adicionar_aluno(self, dados: Dict[str, Any]) -> tuple[bool, str]:
         """Adiciona um novo aluno"""
         try:
-            # Converter data_inicio para string no formato ISO
-            if isinstance(dados.get('data_inicio'), date):
-                dados['data_inicio'] = dados['data_inicio'].isoformat()
-            
-            # Garantir que dia_horario seja JSON
-            if 'dia_horario' in dados and isinstance(dados['dia_horario'], dict):
-                dados['dia_horario'] = json.dumps(dados['dia_horario'])
-            
-            self.client.table("alunos").insert(dados).execute()
+            self._preparar_dados_aluno(dados)
+            response = self.client.table("alunos").insert(dados).execute()
+            self._mesclar("alunos", response.data, inseridos=True)
+            self._invalidar_alunos_da_unidade(dados.get('unidade_id'))
             return True, "Aluno adicionado com sucesso"
         except Exception as e:
             return False, f"Erro ao adicionar aluno: {str(e)}"
     
-    def atualizar_aluno(self, aluno_id: int, dados: Dict[str, Any]) -> tuple[bool, str]:
-        """Atualiza dados de um aluno"""
+    def atualizar_aluno(self, aluno_id: int, dados: Dict[str, Any],
+                        unidade_anterior: Optional[int] = None) -> tuple[bool, str]:
+        """
+        Atualiza dados de um aluno
+        
+        Args:
+            aluno_id: ID do aluno
+            dados: Valores do formulário
+            unidade_anterior: Unidade do aluno antes da edição; obrigatória
+                quando o efeito já foi aplicado por prever_escrita, pois o
+                armazém passa a trazer a unidade nova
+        """
         try:
-            # Converter data_inicio para string no formato ISO
-            if isinstance(dados.get('data_inicio'), date):
-                dados['data_inicio'] = dados['data_inicio'].isoformat()
-            
-            # Garantir que dia_horario seja JSON
-            if 'dia_horario' in dados and isinstance(dados['dia_horario'], dict):
-                dados['dia_horario'] = json.dumps(dados['dia_horario'])
-            
-            self.client.table("alunos").update(dados).eq("id", aluno_id).execute()
+            if unidade_anterior is None:
+                unidade_anterior = self._unidade_do_aluno(aluno_id)
+            efeito = self._efeito_atualizar_aluno(aluno_id, dados)
+            self.client.table("alunos").update(
+                self._preparar_dados_aluno(dict(dados))
+            ).eq("id", aluno_id).execute()
+            self._aplicar_efeito(efeito)
+            self._invalidar_aluno(aluno_id, unidade_anterior)
+            nova_unidade = dados.get('unidade_id')
+            if nova_unidade is not None and nova_unidade != unidade_anterior:
+                self._invalidar_alunos_da_unidade(nova_unidade)
             return True, "Aluno atualizado com sucesso"
         except Exception as e:
             return False, f"Erro ao atualizar aluno: {str(e)}"
     
-    def obter_aluno(self, aluno_id: int) -> Optional[Dict[str, Any]]:
-        """Obtém dados de um aluno específico"""
+    @_cacheado("alunos")
+    def obter_aluno(self, aluno_id: int, perfil: str = "detalhe") -> Optional[Dict[str, Any]]:
+        """Obtém o registro completo de um aluno (usado pelo formulário de edição)"""
         try:
-            response = self.client.table("alunos").select("*").eq("id", aluno_id).execute()
-            return response.data[0] if response.data else None
+            response = self.client.table("alunos").select(
+                colunas_do_perfil("alunos", perfil)
+            ).eq("id", aluno_id).execute()
+            return self._mesclar("alunos", response.data)[0] if response.data else None
         except Exception as e:
-            print(f"Erro ao obter aluno: {e}")
+            self._erro_consulta("Erro ao obter aluno", e)
             return None
     
     def arquivar_aluno(self, aluno_id: int, arquivar: bool = True) -> tuple[bool, str]:
         """Arquiva ou desarquiva um aluno"""
         try:
             self.client.table("alunos").update({"arquivado": arquivar}).eq("id", aluno_id).execute()
+            self._aplicar_efeito(self._efeito_arquivar_aluno(aluno_id, arquivar))
+            self._invalidar_aluno(aluno_id)
             acao = "arquivado" if arquivar else "desarquivado"
             return True, f"Aluno {acao} com sucesso"
         except Exception as e:
             return False, f"Erro ao arquivar aluno: {str(e)}"
     
+    @_cacheado("acoes")
     def contar_acoes_pendentes(self, aluno_id: int) -> int:
-        """Conta quantas ações pendentes um aluno tem"""
+        """Conta quantas ações pendentes um aluno tem (contador mantido pelo banco)"""
         try:
-            response = self.client.table("acoes").select(
-                "id", count="exact"
-            ).eq("aluno_id", aluno_id).eq("status", "Pendente").execute()
-            return response.count if response.count else 0
+            response = self.client.table("alunos").select(
+                "acoes_pendentes"
+            ).eq("id", aluno_id).execute()
+            return response.data[0]['acoes_pendentes'] if response.data else 0
         except Exception as e:
-            print(f"Erro ao contar ações pendentes: {e}")
+            self._erro_consulta("Erro ao contar ações pendentes", e)
             return 0
     
+    def reconciliar_acoes_pendentes(self, unidade_id: Optional[int] = None) -> tuple[bool, str]:
+        """
+        Recalcula os contadores alunos.acoes_pendentes que divergirem das ações
+        
+        Corrige desvios deixados por cargas sem triggers ou edições manuais.
+        Os alunos corrigidos têm o atualizado_em avançado, então as listas
+        abertas recebem o valor certo na próxima sincronização.
+        
+        Args:
+            unidade_id: Restringe a uma unidade (todas se omitido)
+            
+        Returns:
+            tuple: (sucesso: bool, mensagem: str)
+        """
+        try:
+            parametros = {"p_unidade_id": unidade_id}
+            corrigidos = self.client.rpc("reconciliar_acoes_pendentes", parametros).execute().data
+            if self.remoto is not None:
+                # Modo réplica: a réplica tem os próprios contadores
+                corrigidos += self.remoto.rpc("reconciliar_acoes_pendentes", parametros).execute().data
+            if corrigidos:
+                self.cache.invalidar("contar_acoes_pendentes")
+                self.cache.invalidar("listar_alunos_com_pendencias")
+            return True, f"{corrigidos} contador(es) de ações pendentes corrigido(s)"
+        except Exception as e:
+            return False, f"Erro ao reconciliar ações pendentes: {str(e)}"
+    
+    # ============================================
+    # ATUALIZAÇÕES OTIMISTAS
+    # ============================================
+    
+    def prever_escrita(self, metodo: str, *args) -> Callable[[], None]:
+        """
+        Aplica no armazém de entidades o efeito de uma escrita antes de
+        enviá-la, para a tela exibir o resultado sem esperar o banco
+        
+        A escrita, quando confirmada, aplica o mesmo efeito (sem repeti-lo:
+        a ação já concluída não desconta a pendência de novo).
+        
+        Args:
+            metodo: "atualizar_aluno", "arquivar_aluno" ou "concluir_acao"
+            *args: Os mesmos argumentos que serão passados à escrita; o
+                efeito recebe só os primeiros, que declara (argumentos usados
+                apenas pela escrita, como unidade_anterior, ficam de fora)
+            
+        Returns:
+            Callable: Desfaz o efeito se a escrita falhar
+        """
+        calcular_efeito = getattr(self, f"_efeito_{metodo}")
+        args = args[:len(inspect.signature(calcular_efeito).parameters)]
+        desfazer = [
+            self.entidades.alterar_provisorio(tabela, registro_id, campos)
+            for tabela, registro_id, campos in calcular_efeito(*args)
+        ]
+        
+        def desfazer_tudo():
+            for desfazer_um in reversed(desfazer):
+                if desfazer_um is not None:
+                    desfazer_um()
+        return desfazer_tudo
+    
+    def _aplicar_efeito(self, efeito: List[Tuple[str, int, Dict[str, Any]]]):
+        """Aplica ao armazém o efeito de uma escrita confirmada"""
+        for tabela, registro_id, campos in efeito:
+            self.entidades.alterar(tabela, registro_id, campos)
+    
+    def _efeito_atualizar_aluno(self, aluno_id: int, dados: Dict[str, Any]) -> List[Tuple[str, int, Dict[str, Any]]]:
+        # Valores como as leituras os devolvem: data em ISO e dia_horario como dict (jsonb)
+        campos = dict(dados)
+        if isinstance(campos.get('data_inicio'), date):
+            campos['data_inicio'] = campos['data_inicio'].isoformat()
+        if isinstance(campos.get('dia_horario'), dict):
+            campos['dia_horario'] = dict(campos['dia_horario'])
+        if 'observacoes' in campos:
+            campos['observacoes_resumo'] = _resumo_observacoes(campos['observacoes'])
+        return [("alunos", aluno_id, campos)]
+    
+    def _efeito_arquivar_aluno(self, aluno_id: int, arquivar: bool = True) -> List[Tuple[str, int, Dict[str, Any]]]:
+        return [("alunos", aluno_id, {"arquivado": arquivar})]
+    
+    def _efeito_concluir_acao(self, acao_id: int) -> List[Tuple[str, int, Dict[str, Any]]]:
+        data = {
+            "status": "Concluída",
+            "data_conclusao": datetime.now().date().isoformat()
+        }
+        efeito = [("acoes", acao_id, data)]
+        acao = self.entidades.obter("acoes", acao_id)
+        if acao is not None and acao.get('status') == "Pendente":
+            # Mesmo ajuste que o trigger de acoes faz no banco
+            aluno = self.entidades.obter("alunos", acao.get('aluno_id'))
+            if aluno is not None and aluno.get('acoes_pendentes'):
+                efeito.append(("alunos", aluno['id'], {"acoes_pendentes": aluno['acoes_pendentes'] - 1}))
+        return efeito
+    
+    # ============================================
+    # PRÉ-CARREGAMENTO
+    # ============================================
+    
+    def pre_carregar_aluno(self, aluno_id: int):
+        """
+        Lê o cadastro e as ações de um aluno antes de o usuário abrir os
+        dialogs (executado em segundo plano ao selecionar a linha)
+        
+        Os resultados ficam em pre_carregados por mais tempo que no cache
+        de consultas: os dialogs os exibem na hora e conferem em seguida
+        (ver aluno_pre_carregado e acoes_pre_carregadas). Partes ainda
+        guardadas não são lidas de novo.
+        """
+        for metodo, tabela, ler in (
+            ("obter_aluno", "alunos", self.obter_aluno),
+            ("listar_acoes", "acoes", self.listar_acoes),
+        ):
+            chave = (metodo, (("aluno_id", aluno_id),))
+            encontrado, _ = self.pre_carregados.obter(chave)
+            if encontrado:
+                continue
+            
+            geracao = self.pre_carregados.geracao
+            self._estado_thread.falhou = False
+            valor = ler(aluno_id)
+            if valor is not None and not self._estado_thread.falhou:
+                self.pre_carregados.guardar(chave, tabela, valor, geracao)
+    
+    def aluno_pre_carregado(self, aluno_id: int) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Cadastro do aluno lido por pre_carregar_aluno (pode estar desatualizado)
+        
+        Returns:
+            tuple: (encontrado: bool, aluno)
+        """
+        return self.pre_carregados.obter(("obter_aluno", (("aluno_id", aluno_id),)))
+    
+    def acoes_pre_carregadas(self, aluno_id: int) -> Tuple[bool, List[Dict[str, Any]]]:
+        """
+        Ações do aluno lidas por pre_carregar_aluno (podem estar desatualizadas)
+        
+        Returns:
+            tuple: (encontrado: bool, acoes)
+        """
+        return self.pre_carregados.obter(("listar_acoes", (("aluno_id", aluno_id),)))
+    
+    # ============================================
+    # SINCRONIZAÇÃO INCREMENTAL
+    # ============================================
+    
+    def sincronizar_alunos(self, unidade_id: int, incluir_arquivados: bool = False,
+                           completa: bool = False) -> Alteracoes:
+        """
+        Sincroniza a cópia local dos alunos de uma unidade
+        
+        A primeira chamada (ou completa=True) carrega a lista inteira. As
+        seguintes buscam apenas os alunos com atualizado_em a partir da marca
+        d'água da unidade e as exclusões registradas em registros_excluidos,
+        e as mesclam na cópia local. Mudanças nas ações também aparecem, pois
+        os triggers de acoes atualizam o atualizado_em do aluno.
+        
+        Args:
+            unidade_id: ID da unidade
+            incluir_arquivados: Mantém os arquivados na cópia local; se False,
+                um aluno arquivado é informado como removido
+            completa: Descarta a cópia local e recarrega tudo
+            
+        Returns:
+            Alteracoes: Linhas alteradas e IDs removidos desde a última chamada
+            
+        Raises:
+            Exception: Erros de rede são propagados e a cópia local fica intacta
+        """
+        with self._lock_armazens:
+            armazem = self._armazens.setdefault((unidade_id, incluir_arquivados), ArmazemAlunos())
+        
+        with armazem.lock:
+            if completa or armazem.marca is None:
+                alteracoes = self._carregar_armazem(armazem, unidade_id, incluir_arquivados)
+            else:
+                alteracoes = self._atualizar_armazem(armazem, unidade_id, incluir_arquivados)
+        self._retirar_de_outras_unidades(alteracoes.alterados, unidade_id)
+        return alteracoes
+    
+    def alunos_sincronizados(self, unidade_id: int, incluir_arquivados: bool = False) -> List[Dict[str, Any]]:
+        """Retorna a cópia local atual dos alunos, na ordem da lista"""
+        with self._lock_armazens:
+            armazem = self._armazens.get((unidade_id, incluir_arquivados))
+        if armazem is None:
+            return []
+        with armazem.lock:
+            return armazem.ordenadas()
+    
+    def _carregar_armazem(self, armazem: ArmazemAlunos, unidade_id: int,
+                          incluir_arquivados: bool) -> Alteracoes:
+        """Carga completa da cópia local"""
+        alunos = []
+        for pagina in self.iterar_alunos_com_pendencias(unidade_id, incluir_arquivados):
+            alunos.extend(pagina.registros)
+        alunos = self.entidades.mesclar("alunos", alunos)
+        self._resolver_instrutores(alunos, 'instrutor_id', unidade_id)
+        
+        armazem.linhas = {aluno['id']: aluno for aluno in alunos}
+        # Sem alunos, a próxima sincronização busca tudo o que for criado
+        armazem.marca = "1970-01-01T00:00:00"
+        for aluno in alunos:
+            armazem.avancar_marca(aluno.get('atualizado_em'))
+        # Mesma ordem usada nas alterações incrementais (nome sem caixa, id)
+        return Alteracoes(armazem.ordenadas(), [], True)
+    
+    def _atualizar_armazem(self, armazem: ArmazemAlunos, unidade_id: int,
+                           incluir_arquivados: bool) -> Alteracoes:
+        """Busca e mescla as alterações desde a marca d'água"""
+        desde = self._recuar_marca(armazem.marca)
+        
+        # Arquivados entram na consulta para detectar a transição de arquivamento
+        alterados_servidor = []
+        for pagina in self.iterar_alunos_com_pendencias(
+            unidade_id, incluir_arquivados=True, alterados_desde=desde
+        ):
+            alterados_servidor.extend(pagina.registros)
+        excluidos = self.listar_exclusoes("alunos", unidade_id, desde)
+        alterados_servidor, mudaram = self.entidades.mesclar_com_alteracoes("alunos", alterados_servidor)
+        self._resolver_instrutores(alterados_servidor, 'instrutor_id', unidade_id)
+        
+        alterados, removidos = [], []
+        for aluno in alterados_servidor:
+            armazem.avancar_marca(aluno.get('atualizado_em'))
+            if aluno.get('arquivado') and not incluir_arquivados:
+                if armazem.linhas.pop(aluno['id'], None) is not None:
+                    removidos.append(aluno['id'])
+                continue
+            # A margem de segurança repete registros já recebidos: ignorar os iguais
+            if aluno['id'] in mudaram or armazem.linhas.get(aluno['id']) is not aluno:
+                armazem.linhas[aluno['id']] = aluno
+                alterados.append(aluno)
+        
+        for exclusao in excluidos:
+            armazem.avancar_marca(exclusao.get('excluido_em'))
+            if armazem.linhas.pop(exclusao['registro_id'], None) is not None:
+                removidos.append(exclusao['registro_id'])
+        
+        return Alteracoes(alterados, removidos, False)
+    
+    def _retirar_de_outras_unidades(self, alunos: List[Dict[str, Any]], unidade_id: int):
+        """
+        Remove das cópias locais das outras unidades os alunos recebidos
+        nesta (mudaram de unidade)
+        
+        A sincronização da unidade antiga filtra pela unidade e não veria o
+        aluno sair; a tela dela já o retirou ao ser avisada pelo armazém de
+        entidades. Chamado sem segurar o lock de nenhuma cópia.
+        """
+        ids = [aluno['id'] for aluno in alunos if aluno.get('unidade_id') == unidade_id]
+        if not ids:
+            return
+        with self._lock_armazens:
+            outros = [armazem for (unidade, _), armazem in self._armazens.items() if unidade != unidade_id]
+        for armazem in outros:
+            with armazem.lock:
+                for aluno_id in ids:
+                    armazem.linhas.pop(aluno_id, None)
+    
+    @staticmethod
+    def _recuar_marca(marca: str) -> str:
+        """
+        Aplica a margem de segurança à marca d'água
+        
+        Transações que terminam fora de ordem podem gravar um atualizado_em
+        menor que a marca já vista; a margem reconsulta esse intervalo.
+        """
+        try:
+            instante = datetime.fromisoformat(marca)
+        except ValueError:
+            return marca
+        return (instante - timedelta(seconds=Config.SYNC_MARGEM_SEGUNDOS)).isoformat()
+    
+    def listar_exclusoes(self, tabela: str, unidade_id: int, desde: str) -> List[Dict[str, Any]]:
+        """
+        Lista as exclusões registradas pelos triggers desde um instante
+        
+        Raises:
+            Exception: Erros da requisição são propagados ao chamador
+        """
+        exclusoes = []
+        for pagina in self._iterar_keyset(
+            lambda contar: self.client.table("registros_excluidos").select(
+                "id, registro_id, excluido_em"
+            ).eq("tabela", tabela).eq("unidade_id", unidade_id).gte("excluido_em", desde),
+            [("excluido_em", False), ("id", False)],
+            Config.TAMANHO_PAGINA
+        ):
+            exclusoes.extend(pagina.registros)
+        return exclusoes
+    
+    # ============================================
+    # ALTERAÇÕES EM TEMPO REAL
+    # ============================================
+    
+    def assinar_alteracoes(self, ao_receber: Callable[[EventoAlteracao], None]) -> Callable[[], None]:
+        """
+        Recebe as inserções, alterações e exclusões em alunos e acoes
+        
+        A fonte dos eventos é escolhida por Config.TEMPO_REAL e iniciada na
+        primeira assinatura. No modo réplica, os eventos do Supabase apenas
+        antecipam a sincronização, e os registros baixados é que são
+        publicados (a réplica já os contém quando a tela os consulta).
+        
+        Args:
+            ao_receber: Chamada a cada evento, em uma thread qualquer
+            
+        Returns:
+            Callable: Função que cancela a assinatura
+        """
+        with self._lock_ouvintes:
+            self._ouvintes.append(ao_receber)
+            if self.fonte_alteracoes is None:
+                self.fonte_alteracoes = self._criar_fonte_alteracoes()
+                if self.fonte_alteracoes is not None:
+                    self.fonte_alteracoes.iniciar(self._ao_receber_evento)
+        
+        def cancelar():
+            with self._lock_ouvintes:
+                if ao_receber in self._ouvintes:
+                    self._ouvintes.remove(ao_receber)
+        return cancelar
+    
+    def _criar_fonte_alteracoes(self) -> Optional[FonteAlteracoes]:
+        """Cria a fonte de eventos configurada em Config.TEMPO_REAL"""
+        if Config.TEMPO_REAL == "supabase" and self.backend is not None and self.backend.remoto:
+            return FonteSupabaseRealtime(Config.SUPABASE_URL, Config.SUPABASE_KEY, ["alunos", "acoes"])
+        if Config.TEMPO_REAL == "local":
+            return FonteLocal()
+        return None
+    
+    def _ao_receber_evento(self, evento: EventoAlteracao):
+        """Evento recebido da fonte configurada"""
+        if self.replica is not None and not isinstance(self.fonte_alteracoes, FonteLocal):
+            self.replica.solicitar_sincronizacao()
+            return
+        self._publicar(evento)
+    
+    def _publicar(self, evento: EventoAlteracao):
+        """Invalida o cache afetado por um evento e o repassa aos ouvintes"""
+        if evento.tabela == "alunos":
+            self._invalidar_aluno(evento.registro_id, evento.valor('unidade_id'))
+        elif evento.tabela == "acoes":
+            self._invalidar_acoes_do_aluno(evento.valor('aluno_id'))
+        
+        with self._lock_ouvintes:
+            ouvintes = list(self._ouvintes)
+        for ouvinte in ouvintes:
+            try:
+                ouvinte(evento)
+            except Exception as e:
+                print(f"Erro ao entregar alteração: {e}")
+    
+    def atualizar_alunos_sincronizados(self, unidade_id: int, incluir_arquivados: bool,
+                                       aluno_ids: List[int]) -> Alteracoes:
+        """
+        Rebusca alguns alunos da cópia local (ex.: após eventos em tempo real)
+        
+        Os alunos são buscados em uma única requisição (por lote de 100 IDs);
+        os que não existem mais, mudaram de unidade ou foram arquivados
+        (com os arquivados ocultos) são informados como removidos.
+        
+        Raises:
+            Exception: Erros de rede são propagados e a cópia local fica intacta
+        """
+        with self._lock_armazens:
+            armazem = self._armazens.get((unidade_id, incluir_arquivados))
+        if armazem is None or armazem.marca is None:
+            return self.sincronizar_alunos(unidade_id, incluir_arquivados)
+        
+        ids = list(dict.fromkeys(aluno_ids))
+        colunas = f"{colunas_do_perfil('alunos', 'lista')}, acoes_pendentes"
+        recebidos = {}
+        for inicio in range(0, len(ids), 100):
+            response = self.client.table("alunos").select(colunas).in_(
+                "id", ids[inicio:inicio + 100]
+            ).execute()
+            for aluno in response.data:
+                recebidos[aluno['id']] = aluno
+        canonicos, mudaram = self.entidades.mesclar_com_alteracoes("alunos", list(recebidos.values()))
+        recebidos = {aluno['id']: aluno for aluno in canonicos}
+        self._resolver_instrutores(canonicos, 'instrutor_id', unidade_id)
+        
+        alterados, removidos = [], []
+        with armazem.lock:
+            for aluno_id in ids:
+                aluno = recebidos.get(aluno_id)
+                visivel = (aluno is not None and aluno.get('unidade_id') == unidade_id
+                           and (incluir_arquivados or not aluno.get('arquivado')))
+                if not visivel:
+                    if armazem.linhas.pop(aluno_id, None) is not None:
+                        removidos.append(aluno_id)
+                elif aluno_id in mudaram or armazem.linhas.get(aluno_id) is not aluno:
+                    armazem.linhas[aluno_id] = aluno
+                    alterados.append(aluno)
+        self._retirar_de_outras_unidades(alterados, unidade_id)
+        return Alteracoes(alterados, removidos, False)
+    
+    # ============================================
+    # RÉPLICA LOCAL (MODO OFFLINE)
+    # ============================================
+    
+    def acompanhar_unidade(self, unidade_id: int):
+        """
+        Inclui uma unidade na réplica local (sem efeito fora do modo réplica)
+        
+        Na primeira vez, os dados da unidade são baixados imediatamente;
+        depois, a sincronização periódica os mantém atualizados.
+        """
+        if self.replica is None:
+            return
+        
+        if unidade_id not in self.replica.unidades_acompanhadas():
+            self.replica.acompanhar_unidade(unidade_id)
+            sucesso, mensagem = self.sincronizar_replica()
+            if not sucesso:
+                print(mensagem)
+    
+    def escritas_pendentes(self) -> int:
+        """Escritas feitas na réplica que ainda não chegaram ao Supabase"""
+        if self.replica is None:
+            return 0
+        return self.replica.diario.pendentes()
+    
+    def sincronizar_replica(self) -> tuple[bool, str]:
+        """
+        Reenvia o diário de escritas e baixa as alterações do Supabase
+        
+        As alterações só são baixadas com o diário vazio, para que uma
+        escrita local ainda não enviada não seja sobrescrita.
+        
+        Returns:
+            tuple: (sucesso: bool, mensagem: str)
+        """
+        if self.replica is None:
+            return False, "Réplica local desativada"
+        
+        with self._lock_replica:
+            try:
+                pendentes = self.replica.diario.pendentes()
+                enviado = self.replica.enviar_diario(self.remoto)
+                alterados = pendentes - self.replica.diario.pendentes()
+                if not enviado:
+                    if alterados:
+                        self.cache.limpar()
+                        self.pre_carregados.limpar()
+                    return False, "Sem conexão com o Supabase: alterações guardadas no diário local"
+                
+                alterados += self._baixar_replica()
+                if alterados:
+                    # IDs provisórios e dados baixados invalidam as consultas em cache;
+                    # o armazém de entidades já recebeu cada troca e registro baixado
+                    self.cache.limpar()
+                    self.pre_carregados.limpar()
+                return True, f"Réplica sincronizada ({alterados} alteração(ões))"
+            except Exception as e:
+                return False, f"Erro ao sincronizar a réplica: {str(e)}"
+    
+    def _baixar_replica(self) -> int:
+        """Baixa para a réplica as alterações feitas no Supabase"""
+        remoto = self.remoto
+        gravados = self.replica.gravar_remotos(
+            "unidades", remoto.table("unidades").select("*").execute().data
+        )
+        gravados += self._baixar_alteracoes(
+            "instrutores", "instrutores",
+            lambda: remoto.table("instrutores").select("*")
+        )
+        
+        for unidade_id in self.replica.unidades_acompanhadas():
+            gravados += self._baixar_alteracoes(
+                "alunos", f"alunos:{unidade_id}",
+                lambda: remoto.table("alunos").select("*").eq("unidade_id", unidade_id)
+            )
+            gravados += self._baixar_exclusoes(unidade_id)
+            # Ações não têm unidade_id: o filtro usa o aluno embutido
+            gravados += self._baixar_alteracoes(
+                "acoes", f"acoes:{unidade_id}",
+                lambda: remoto.table("acoes").select(
+                    "*, alunos!inner(unidade_id)"
+                ).eq("alunos.unidade_id", unidade_id)
+            )
+            gravados += self._baixar_logs(unidade_id)
+        return gravados
+    
+    def _baixar_alteracoes(self, tabela: str, chave_marca: str,
+                           construir_query: Callable[[], Any]) -> int:
+        """Baixa os registros com atualizado_em a partir da marca d'água"""
+        marca = self.replica.obter_marca(chave_marca)
+        
+        def consulta(contar: bool):
+            query = construir_query()
+            if marca is not None:
+                query = query.gte("atualizado_em", self._recuar_marca(marca))
+            return query
+        
+        gravados, nova_marca = 0, marca
+        for pagina in self._iterar_keyset(
+            consulta, [("atualizado_em", False), ("id", False)], Config.POSTGREST_MAX_LINHAS
+        ):
+            gravados += self.replica.gravar_remotos(tabela, pagina.registros)
+            for registro in pagina.registros:
+                if nova_marca is None or (registro.get('atualizado_em') or '') > nova_marca:
+                    nova_marca = registro.get('atualizado_em')
+        # Sem registros, a marca fica no início para não perder o que for criado
+        self.replica.definir_marca(chave_marca, nova_marca or "1970-01-01T00:00:00")
+        return gravados
+    
+    def _baixar_exclusoes(self, unidade_id: int) -> int:
+        """Remove da réplica os alunos excluídos no Supabase"""
+        chave_marca = f"exclusoes:{unidade_id}"
+        marca = self.replica.obter_marca(chave_marca) or "1970-01-01T00:00:00"
+        
+        removidos, nova_marca = 0, marca
+        for pagina in self._iterar_keyset(
+            lambda contar: self.remoto.table("registros_excluidos").select(
+                "id, registro_id, excluido_em"
+            ).eq("tabela", "alunos").eq("unidade_id", unidade_id).gte(
+                "excluido_em", self._recuar_marca(marca)
+            ),
+            [("excluido_em", False), ("id", False)],
+            Config.POSTGREST_MAX_LINHAS
+        ):
+            removidos += self.replica.remover_remotos(
+                "alunos", [e['registro_id'] for e in pagina.registros]
+            )
+            for exclusao in pagina.registros:
+                nova_marca = max(nova_marca, exclusao['excluido_em'])
+        self.replica.definir_marca(chave_marca, nova_marca)
+        return removidos
+    
+    def _baixar_logs(self, unidade_id: int) -> int:
+        """Baixa os logs novos de uma unidade (os logs só recebem inserções)"""
+        chave_marca = f"logs:{unidade_id}"
+        ultimo_id = self.replica.obter_marca(chave_marca)
+        
+        def consulta(contar: bool):
+            query = self.remoto.table("logs").select("*").eq("unidade_id", unidade_id)
+            if ultimo_id is not None:
+                return query.gt("id", int(ultimo_id))
+            inicio = datetime.now() - timedelta(days=Config.REPLICA_DIAS_LOGS)
+            return query.gte("data_hora", inicio.isoformat())
+        
+        gravados, novo_ultimo = 0, int(ultimo_id or 0)
+        for pagina in self._iterar_keyset(consulta, [("id", False)], Config.POSTGREST_MAX_LINHAS):
+            gravados += self.replica.gravar_remotos("logs", pagina.registros)
+            for registro in pagina.registros:
+                novo_ultimo = max(novo_ultimo, registro['id'])
+        if novo_ultimo:
+            self.replica.definir_marca(chave_marca, novo_ultimo)
+        return gravados
+    
     # ============================================
     # OPERAÇÕES COM AÇÕES
     # ============================================
     
-    def listar_acoes(self, aluno_id: int) -> List[Dict[str, Any]]:
+    def iterar_acoes(self, aluno_id: int, tamanho_pagina: int = Config.TAMANHO_PAGINA,
+                     contar_total: bool = False, perfil: str = "lista") -> Iterator[Pagina]:
+        """Percorre as ações de um aluno em páginas, das mais recentes para as mais antigas"""
+        return self._iterar_keyset(
+            lambda contar: self.client.table("acoes").select(
+                colunas_do_perfil("acoes", perfil), count="exact" if contar else None
+            ).eq("aluno_id", aluno_id),
+            [("data_proposta", True), ("id", True)],
+            tamanho_pagina,
+            contar_total
+        )
+    
+    @_cacheado("acoes")
+    def listar_acoes(self, aluno_id: int, perfil: str = "lista") -> List[Dict[str, Any]]:
         """Lista todas as ações de um aluno"""
         try:
-            response = self.client.table("acoes").select(
-                "*, instrutores(nome)"
-            ).eq("aluno_id", aluno_id).order("data_proposta", desc=True).execute()
-            return response.data
+            acoes = []
+            for pagina in self.iterar_acoes(aluno_id, perfil=perfil):
+                acoes.extend(pagina.registros)
+            acoes = self._mesclar("acoes", acoes)
+            aluno = self.entidades.obter("alunos", aluno_id)
+            self._resolver_instrutores(acoes, 'instrutor_resp_id', aluno and aluno.get('unidade_id'))
+            return acoes
         except Exception as e:
-            print(f"Erro ao listar ações: {e}")
+            self._erro_consulta("Erro ao listar ações", e)
             return []
     
     def adicionar_acao(self, aluno_id: int, acao_proposta: str, instrutor_resp_id: int) -> tuple[bool, str]:
@@ -202,19 +1535,36 @@ class DatabaseManager:
                 "instrutor_resp_id": instrutor_resp_id,
                 "data_proposta": datetime.now().date().isoformat()
             }
-            self.client.table("acoes").insert(data).execute()
+            response = self.client.table("acoes").insert(data).execute()
+            self._mesclar("acoes", response.data, inseridos=True)
+            aluno = self.entidades.obter("alunos", aluno_id)
+            if aluno is not None and 'acoes_pendentes' in aluno:
+                # Mesmo ajuste que o trigger de acoes faz no banco
+                self.entidades.alterar("alunos", aluno_id, {"acoes_pendentes": aluno['acoes_pendentes'] + 1})
+            self._invalidar_acoes_do_aluno(aluno_id)
             return True, "Ação proposta com sucesso"
         except Exception as e:
             return False, f"Erro ao adicionar ação: {str(e)}"
     
+    def _aluno_da_acao(self, acao_id: int) -> Optional[int]:
+        """Descobre o aluno de uma ação pelo armazém ou pelas listas de ações em cache"""
+        acao = self.entidades.obter("acoes", acao_id)
+        if acao is not None and 'aluno_id' in acao:
+            return acao['aluno_id']
+        for argumentos, valor in self.cache.valores("listar_acoes"):
+            if _contem_id(valor, acao_id):
+                return argumentos['aluno_id']
+        return None
+    
     def concluir_acao(self, acao_id: int) -> tuple[bool, str]:
         """Marca uma ação como concluída"""
         try:
-            data = {
-                "status": "Concluída",
-                "data_conclusao": datetime.now().date().isoformat()
-            }
+            # Lido antes da escrita: o contador só cai se a ação estava pendente
+            efeito = self._efeito_concluir_acao(acao_id)
+            _, _, data = efeito[0]
             self.client.table("acoes").update(data).eq("id", acao_id).execute()
+            self._aplicar_efeito(efeito)
+            self._invalidar_acoes_do_aluno(self._aluno_da_acao(acao_id))
             return True, "Ação marcada como concluída"
         except Exception as e:
             return False, f"Erro ao concluir ação: {str(e)}"
@@ -233,23 +1583,137 @@ class DatabaseManager:
                 "data_hora": datetime.now().isoformat()
             }
             self.client.table("logs").insert(data).execute()
+            self.cache.invalidar("listar_logs", lambda args, _: args['unidade_id'] == unidade_id)
             return True
         except Exception as e:
             print(f"Erro ao adicionar log: {e}")
             return False
     
-    def listar_logs(self, unidade_id: int, limite: int = 100) -> List[Dict[str, Any]]:
-        """Lista logs de uma unidade"""
+    def adicionar_logs(self, registros: List[Dict[str, Any]]) -> bool:
+        """
+        Adiciona vários registros de log em uma única requisição
+        
+        Args:
+            registros: Dicts com instrutor_id, atividade, unidade_id e data_hora
+            
+        Returns:
+            bool: True se todos os registros foram gravados; False em erro
+                de conexão (vale tentar de novo)
+            
+        Raises:
+            APIError: Se o servidor recusar o lote (reenviar não adianta)
+        """
+        if not registros:
+            return True
+        
         try:
-            response = self.client.table("logs").select(
-                "*, instrutores(nome)"
-            ).eq("unidade_id", unidade_id).order(
-                "data_hora", desc=True
-            ).limit(limite).execute()
-            return response.data
+            self.client.table("logs").insert(registros).execute()
+            unidades = {r.get('unidade_id') for r in registros}
+            self.cache.invalidar("listar_logs", lambda args, _: args['unidade_id'] in unidades)
+            return True
+        except APIError:
+            raise
+        except Exception as e:
+            print(f"Erro ao adicionar logs: {e}")
+            return False
+    
+    def iterar_logs(self, unidade_id: int, tamanho_pagina: int = Config.TAMANHO_PAGINA,
+                    contar_total: bool = False,
+                    antes_de: Optional[Tuple[str, int]] = None,
+                    perfil: str = "lista") -> Iterator[Pagina]:
+        """Percorre os logs de uma unidade em páginas, do mais recente para o mais antigo"""
+        return self._iterar_keyset(
+            lambda contar: self.client.table("logs").select(
+                colunas_do_perfil("logs", perfil), count="exact" if contar else None
+            ).eq("unidade_id", unidade_id),
+            [("data_hora", True), ("id", True)],
+            tamanho_pagina,
+            contar_total,
+            antes_de
+        )
+    
+    @_cacheado("logs")
+    def listar_logs(self, unidade_id: int, limite: int = 100,
+                    antes_de: Optional[Tuple[str, int]] = None,
+                    perfil: str = "lista") -> List[Dict[str, Any]]:
+        """
+        Lista logs de uma unidade, do mais recente para o mais antigo
+        
+        Args:
+            unidade_id: ID da unidade
+            limite: Quantidade máxima de registros
+            antes_de: Cursor (data_hora, id) do último registro da página
+                anterior; a página seguinte começa logo após ele
+        """
+        try:
+            pagina = next(self.iterar_logs(unidade_id, limite, antes_de=antes_de, perfil=perfil))
+            # Logs não entram no armazém (não mudam depois de gravados); só o nome do instrutor
+            self._resolver_instrutores(pagina.registros, 'instrutor_id', unidade_id)
+            return pagina.registros
+        except Exception as e:
+            self._erro_consulta("Erro ao listar logs", e)
+            return []
+    
+    def iterar_resumos_logs(self, unidade_id: int, tamanho_pagina: int = Config.TAMANHO_PAGINA,
+                            antes_de: Optional[Tuple[str, int]] = None) -> Iterator[Pagina]:
+        """Percorre os resumos diários de logs de uma unidade, do dia mais recente para o mais antigo"""
+        # Modo réplica: só o Supabase tem os resumos anteriores à réplica
+        cliente = self.remoto if self.remoto is not None else self.client
+        return self._iterar_keyset(
+            lambda contar: cliente.table("logs_resumo_diario").select(
+                colunas_do_perfil("logs_resumo_diario", "lista")
+            ).eq("unidade_id", unidade_id),
+            [("dia", True), ("id", True)],
+            tamanho_pagina,
+            cursor=antes_de
+        )
+    
+    @_cacheado("logs_resumo_diario")
+    def listar_resumos_logs(self, unidade_id: int, limite: int = 100,
+                            antes_de: Optional[Tuple[str, int]] = None) -> List[Dict[str, Any]]:
+        """
+        Lista os resumos diários (atividades por dia e instrutor) dos logs
+        já removidos pela retenção, do dia mais recente para o mais antigo
+        
+        Args:
+            unidade_id: ID da unidade
+            limite: Quantidade máxima de resumos
+            antes_de: Cursor (dia, id) do último resumo da página anterior
+        """
+        try:
+            pagina = next(self.iterar_resumos_logs(unidade_id, limite, antes_de=antes_de))
+            return pagina.registros
         except Exception as e:
-            print(f"Erro ao listar logs: {e}")
+            self._erro_consulta("Erro ao listar resumos de logs", e)
             return []
+    
+    def reter_logs(self, meses_retidos: Optional[int] = None) -> tuple[bool, str]:
+        """
+        Resume por dia e instrutor os logs anteriores ao período retido e
+        remove os detalhados (função reter_logs do schema.sql)
+        
+        No modo réplica, atua sobre a cópia local; a retenção do Supabase
+        é agendada no próprio servidor.
+        
+        Args:
+            meses_retidos: Meses de logs detalhados além do mês atual
+                (padrão: Config.LOGS_MESES_RETIDOS)
+            
+        Returns:
+            tuple: (sucesso: bool, mensagem: str)
+        """
+        if meses_retidos is None:
+            meses_retidos = Config.LOGS_MESES_RETIDOS
+        try:
+            resumidos = self.client.rpc(
+                "reter_logs", {"p_meses_retidos": meses_retidos}
+            ).execute().data
+            if resumidos:
+                self.cache.invalidar("listar_logs")
+                self.cache.invalidar("listar_resumos_logs")
+            return True, f"{resumidos} log(s) antigo(s) resumido(s)"
+        except Exception as e:
+            return False, f"Erro ao aplicar a retenção de logs: {str(e)}"
 
 
 # Instância global do gerenciador de banco de dados
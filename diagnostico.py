@@ -0,0 +1,213 @@
+"""
+Diagnóstico das Consultas
+Registra a duração, as linhas, o tamanho da resposta e os erros de cada
+chamada ao DatabaseManager em um buffer circular, com histogramas por
+método, para investigar lentidão sem depurador
+"""
+
+from typing import Optional, List, Dict, Any, Tuple, NamedTuple
+from collections import deque
+from config import Config
+from rastreio_requisicoes import RastreadorRequisicoes, rastreador
+import bisect
+import functools
+import threading
+import time
+
+
+# Limites superiores (ms) das faixas dos histogramas; a última faixa é aberta
+FAIXAS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+def percentil(valores: List[float], p: float) -> float:
+    """Percentil por posição mais próxima (valores não precisam estar ordenados)"""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    posicao = max(0, min(len(ordenados) - 1, round(p / 100 * len(ordenados) + 0.5) - 1))
+    return ordenados[posicao]
+
+
+class RegistroChamada(NamedTuple):
+    """Uma chamada a um método do DatabaseManager"""
+
+    metodo: str
+    # Instante do início (time.time)
+    inicio: float
+    duracao_ms: float
+    # Requisições feitas ao banco (0 quando atendida pelo cache)
+    requisicoes: int
+    # Registros devolvidos ao chamador
+    linhas: int
+    # Tamanho das respostas recebidas do banco
+    bytes: int
+    erro: Optional[str]
+
+
+class Histograma:
+    """Contagem de chamadas por faixa de duração (desde o início do aplicativo)"""
+
+    def __init__(self):
+        self.contagens = [0] * (len(FAIXAS_MS) + 1)
+        self.total = 0
+        self.erros = 0
+
+    def adicionar(self, duracao_ms: float, erro: bool):
+        self.contagens[bisect.bisect_left(FAIXAS_MS, duracao_ms)] += 1
+        self.total += 1
+        self.erros += int(erro)
+
+    def faixas(self) -> List[Tuple[str, int]]:
+        """Faixas com chamadas, ex.: [("≤10 ms", 4), (">5000 ms", 1)]"""
+        rotulos = [f"≤{limite} ms" for limite in FAIXAS_MS] + [f">{FAIXAS_MS[-1]} ms"]
+        return [(rotulo, n) for rotulo, n in zip(rotulos, self.contagens) if n]
+
+
+class MonitorConsultas:
+    """
+    Buffer circular das últimas chamadas e histogramas por método
+
+    Os percentis usam as chamadas ainda no buffer; os histogramas acumulam
+    todas as chamadas desde o início.
+    """
+
+    def __init__(self, rastreador: RastreadorRequisicoes, max_registros: int = 1000):
+        self.rastreador = rastreador
+        self.registros: "deque[RegistroChamada]" = deque(maxlen=max_registros)
+        self.histogramas: Dict[str, Histograma] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, registro: RegistroChamada):
+        with self._lock:
+            self.registros.append(registro)
+            histograma = self.histogramas.get(registro.metodo)
+            if histograma is None:
+                histograma = self.histogramas[registro.metodo] = Histograma()
+            histograma.adicionar(registro.duracao_ms, registro.erro is not None)
+
+    def limpar(self):
+        with self._lock:
+            self.registros.clear()
+            self.histogramas.clear()
+
+    def medir(self, metodo):
+        """Decorator que registra cada chamada do método"""
+        nome = metodo.__name__
+
+        @functools.wraps(metodo)
+        def envoltorio(gerenciador, *args, **kwargs):
+            estado = gerenciador._estado_thread
+            erro_anterior = getattr(estado, 'erro', None)
+            estado.erro = None
+            erro = None
+            resultado = None
+            inicio = time.time()
+            inicio_relogio = time.perf_counter()
+            with self.rastreador.acao(f"db.{nome}", historico=False) as contagem:
+                try:
+                    resultado = metodo(gerenciador, *args, **kwargs)
+                except Exception as e:
+                    erro = str(e) or type(e).__name__
+                    raise
+                finally:
+                    duracao_ms = (time.perf_counter() - inicio_relogio) * 1000
+                    # Leituras registram o erro em _erro_consulta; escritas devolvem (False, mensagem)
+                    if erro is None:
+                        erro = estado.erro
+                    if erro is None and isinstance(resultado, tuple) and len(resultado) == 2 \
+                            and resultado[0] is False:
+                        erro = str(resultado[1])
+                    estado.erro = erro_anterior if erro is None else erro
+                    self.registrar(RegistroChamada(
+                        nome, inicio, duracao_ms, contagem.requisicoes,
+                        _contar_linhas(resultado), contagem.bytes, erro
+                    ))
+            return resultado
+        return envoltorio
+
+    # ============================================
+    # CONSULTAS AO DIAGNÓSTICO
+    # ============================================
+
+    def mais_lentas(self, quantidade: int = 20) -> List[RegistroChamada]:
+        """Chamadas mais lentas ainda no buffer"""
+        with self._lock:
+            registros = list(self.registros)
+        return sorted(registros, key=lambda r: r.duracao_ms, reverse=True)[:quantidade]
+
+    def erros_recentes(self, quantidade: int = 50) -> List[RegistroChamada]:
+        """Chamadas com erro, da mais recente para a mais antiga"""
+        with self._lock:
+            registros = [r for r in self.registros if r.erro is not None]
+        return registros[::-1][:quantidade]
+
+    def resumo_por_metodo(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Estatísticas por método
+
+        Returns:
+            dict: metodo -> chamadas, erros, p50_ms, p95_ms, max_ms,
+                requisicoes, linhas e bytes médios e faixas do histograma
+        """
+        with self._lock:
+            registros = list(self.registros)
+            histogramas = {metodo: h for metodo, h in self.histogramas.items()}
+
+        por_metodo: Dict[str, List[RegistroChamada]] = {}
+        for registro in registros:
+            por_metodo.setdefault(registro.metodo, []).append(registro)
+
+        resumo = {}
+        for metodo, histograma in histogramas.items():
+            chamadas = por_metodo.get(metodo, [])
+            duracoes = [r.duracao_ms for r in chamadas]
+            quantidade = len(chamadas) or 1
+            resumo[metodo] = {
+                "chamadas": histograma.total,
+                "erros": histograma.erros,
+                "p50_ms": percentil(duracoes, 50),
+                "p95_ms": percentil(duracoes, 95),
+                "max_ms": max(duracoes, default=0.0),
+                "requisicoes": sum(r.requisicoes for r in chamadas) / quantidade,
+                "linhas": sum(r.linhas for r in chamadas) / quantidade,
+                "bytes": sum(r.bytes for r in chamadas) / quantidade,
+                "faixas": histograma.faixas(),
+            }
+        return resumo
+
+
+def _contar_linhas(resultado: Any) -> int:
+    """Registros no resultado de um método do DatabaseManager"""
+    if isinstance(resultado, list):
+        return len(resultado)
+    if isinstance(resultado, dict):
+        return 1
+    alterados = getattr(resultado, 'alterados', None)
+    if isinstance(alterados, list):
+        return len(alterados)
+    return 0
+
+
+def instrumentar(monitor: MonitorConsultas):
+    """
+    Decorator de classe: mede todos os métodos públicos do DatabaseManager
+
+    Os iteradores (iterar_*) ficam de fora: devolvem geradores, e as
+    listagens que os consomem já são medidas. consultar também: só repassa
+    a chamada a uma leitura, que é medida.
+    """
+    def decorador(classe):
+        for nome, atributo in list(vars(classe).items()):
+            if nome.startswith("_") or nome.startswith("iterar_") or not callable(atributo):
+                continue
+            if nome == "consultar":
+                continue
+            if isinstance(atributo, (staticmethod, classmethod, type)):
+                continue
+            setattr(classe, nome, monitor.medir(atributo))
+        return classe
+    return decorador
+
+
+# Instância global do monitor
+monitor = MonitorConsultas(rastreador, Config.DIAGNOSTICO_MAX_REGISTROS)
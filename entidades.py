@@ -0,0 +1,209 @@
+"""
+Armazém de Entidades
+Mapa de identidade compartilhado pelas telas: cada registro lido do banco
+existe uma única vez em memória, indexado por tabela e id
+"""
+
+from typing import Optional, List, Dict, Any, Callable, Iterable, Set, Tuple
+import threading
+
+
+# Distingue coluna ausente de coluna com valor None
+_AUSENTE = object()
+
+
+class ArmazemEntidades:
+    """
+    Registros normalizados (sem recursos embutidos), um dicionário por
+    (tabela, id)
+
+    As leituras do DatabaseManager passam as linhas recebidas por
+    mesclar(), que devolve os dicionários canônicos: listas das telas,
+    cache de consultas e cópias locais guardam referências a eles, então
+    uma leitura ou escrita posterior do mesmo registro aparece em todos
+    sem copiar nada. Fora daqui, os dicionários são somente leitura.
+
+    Os ouvintes (assinar) são avisados, em qualquer thread, quando um
+    registro já conhecido muda ou quando uma escrita local o altera.
+    """
+
+    def __init__(self):
+        self._tabelas: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        self._lock = threading.RLock()
+        self._ouvintes: List[Callable[[str, List[int]], None]] = []
+
+    def mesclar_um(self, tabela: str, registro: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """
+        Incorpora uma linha recebida do banco
+
+        Colunas ausentes na linha (de outro perfil de colunas) são mantidas
+        e colunas ainda não vistas são acrescentadas.
+
+        Returns:
+            tuple: (registro canônico, alterado: bool) - alterado é True se
+                o registro é novo ou alguma coluna já conhecida mudou
+        """
+        with self._lock:
+            registros = self._tabelas.setdefault(tabela, {})
+            existente = registros.get(registro['id'])
+            if existente is None:
+                registros[registro['id']] = registro
+                return registro, True
+            alterado = any(
+                coluna in existente and existente[coluna] != valor
+                for coluna, valor in registro.items()
+            )
+            if alterado or not registro.keys() <= existente.keys():
+                # update() de um dict é atômico: a interface nunca vê o registro pela metade
+                existente.update(registro)
+            return existente, alterado
+
+    def mesclar(self, tabela: str, registros: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Incorpora várias linhas e devolve os registros canônicos, na mesma ordem"""
+        return self.mesclar_com_alteracoes(tabela, registros)[0]
+
+    def mesclar_com_alteracoes(self, tabela: str,
+                               registros: Iterable[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Set[int]]:
+        """
+        Como mesclar(), informando também o que mudou
+        
+        Returns:
+            tuple: (registros canônicos, IDs dos registros novos ou alterados)
+        """
+        canonicos, novos, alterados = [], set(), []
+        with self._lock:
+            for registro in registros:
+                conhecido = registro['id'] in self._tabelas.get(tabela, {})
+                canonico, alterado = self.mesclar_um(tabela, registro)
+                canonicos.append(canonico)
+                if alterado and conhecido:
+                    alterados.append(canonico['id'])
+                elif alterado:
+                    novos.add(canonico['id'])
+        self._avisar(tabela, alterados)
+        return canonicos, novos.union(alterados)
+
+    def alterar(self, tabela: str, registro_id: int, campos: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Aplica uma escrita confirmada pelo banco a um registro conhecido
+
+        Returns:
+            dict: Registro canônico atualizado (None se não estiver em memória)
+        """
+        with self._lock:
+            existente = self._tabelas.get(tabela, {}).get(registro_id)
+            if existente is not None:
+                existente.update(campos)
+        if existente is not None:
+            self._avisar(tabela, [registro_id])
+        return existente
+
+    def alterar_provisorio(self, tabela: str, registro_id: int,
+                           campos: Dict[str, Any]) -> Optional[Callable[[], None]]:
+        """
+        Aplica uma escrita antes de o banco confirmá-la (atualização otimista)
+
+        Returns:
+            Callable: Desfaz a alteração se a escrita falhar; colunas que uma
+                leitura posterior já trouxe do banco são mantidas (None se o
+                registro não estiver em memória)
+        """
+        with self._lock:
+            existente = self._tabelas.get(tabela, {}).get(registro_id)
+            if existente is None:
+                return None
+            anteriores = {coluna: existente.get(coluna, _AUSENTE) for coluna in campos}
+            existente.update(campos)
+        self._avisar(tabela, [registro_id])
+
+        def desfazer():
+            with self._lock:
+                for coluna, valor in anteriores.items():
+                    if existente.get(coluna, _AUSENTE) != campos[coluna]:
+                        continue
+                    if valor is _AUSENTE:
+                        existente.pop(coluna, None)
+                    else:
+                        existente[coluna] = valor
+            self._avisar(tabela, [registro_id])
+        return desfazer
+
+    def inserir(self, tabela: str, registros: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Incorpora linhas criadas por uma escrita local e avisa os ouvintes"""
+        canonicos = [self.mesclar_um(tabela, registro)[0] for registro in registros]
+        self._avisar(tabela, [registro['id'] for registro in canonicos])
+        return canonicos
+
+    def obter(self, tabela: str, registro_id: Optional[int]) -> Optional[Dict[str, Any]]:
+        """Registro canônico em memória (None se ainda não foi lido)"""
+        with self._lock:
+            return self._tabelas.get(tabela, {}).get(registro_id)
+
+    def ids_ausentes(self, tabela: str, ids: Iterable[Optional[int]]) -> List[int]:
+        """IDs (não nulos) que ainda não estão em memória"""
+        with self._lock:
+            conhecidos = self._tabelas.get(tabela, {})
+            return sorted({i for i in ids if i is not None and i not in conhecidos})
+
+    def nome_instrutor(self, instrutor_id: Optional[int]) -> str:
+        """Nome do instrutor resolvido localmente ("" se desconhecido)"""
+        instrutor = self.obter("instrutores", instrutor_id)
+        return instrutor.get('nome', '') if instrutor else ""
+
+    def remover(self, tabela: str, ids: Iterable[int]):
+        """Esquece registros excluídos no banco (as listas são avisadas pela sincronização)"""
+        with self._lock:
+            registros = self._tabelas.get(tabela, {})
+            for registro_id in ids:
+                registros.pop(registro_id, None)
+
+    def trocar_id(self, tabela: str, id_antigo: int, id_novo: int,
+                  referencias: Iterable[Tuple[str, str]] = ()):
+        """
+        Aplica a troca de um ID provisório pelo definitivo
+
+        O registro com o ID antigo é esquecido (a próxima leitura traz o
+        definitivo) e as colunas de referencias que apontavam para ele
+        passam a apontar para o novo.
+
+        Args:
+            referencias: Pares (tabela, coluna) que referenciam o ID
+        """
+        with self._lock:
+            self._tabelas.get(tabela, {}).pop(id_antigo, None)
+            for tabela_ref, coluna in referencias:
+                for registro in self._tabelas.get(tabela_ref, {}).values():
+                    if registro.get(coluna) == id_antigo:
+                        registro[coluna] = id_novo
+
+    def limpar(self):
+        """Esquece todos os registros (ex.: ao trocar de banco)"""
+        with self._lock:
+            self._tabelas.clear()
+
+    def assinar(self, ao_alterar: Callable[[str, List[int]], None]) -> Callable[[], None]:
+        """
+        Recebe (tabela, ids) a cada alteração de registros em memória
+
+        Returns:
+            Callable: Função que cancela a assinatura
+        """
+        with self._lock:
+            self._ouvintes.append(ao_alterar)
+
+        def cancelar():
+            with self._lock:
+                if ao_alterar in self._ouvintes:
+                    self._ouvintes.remove(ao_alterar)
+        return cancelar
+
+    def _avisar(self, tabela: str, ids: List[int]):
+        if not ids:
+            return
+        with self._lock:
+            ouvintes = list(self._ouvintes)
+        for ouvinte in ouvintes:
+            try:
+                ouvinte(tabela, ids)
+            except Exception as e:
+                print(f"Erro ao avisar alteração de entidades: {e}")
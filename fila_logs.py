@@ -0,0 +1,197 @@
+"""
+Fila de Logs
+Acumula os registros de atividade e os envia ao banco em lote,
+sem bloquear a ação do usuário que gerou o log
+"""
+
+from typing import Optional, List, Dict, Any
+from datetime import datetime
+from config import Config
+from database import db, DatabaseManager
+from postgrest.exceptions import APIError
+import atexit
+import json
+import os
+import threading
+
+
+class FilaLogs:
+    """
+    Fila de registros de log com envio em lote
+
+    Os registros são enviados em uma única inserção quando a fila atinge
+    o tamanho do lote, a cada intervalo de tempo ou no encerramento da
+    aplicação. Se o envio falhar, os registros são gravados em um arquivo
+    local e reenviados no próximo envio bem-sucedido. Registros recusados
+    pelo servidor (ex.: instrutor excluído) vão para o arquivo de
+    rejeitados, para não bloquear os demais a cada tentativa.
+    """
+
+    # Maior quantidade de registros enviada em uma única requisição
+    MAX_POR_REQUISICAO = 500
+
+    def __init__(self, gerenciador: DatabaseManager,
+                 intervalo: float = Config.LOG_INTERVALO_ENVIO,
+                 tamanho_lote: int = Config.LOG_TAMANHO_LOTE,
+                 arquivo_pendentes: str = Config.LOG_ARQUIVO_PENDENTES,
+                 arquivo_rejeitados: str = Config.LOG_ARQUIVO_REJEITADOS):
+        self.gerenciador = gerenciador
+        self.intervalo = intervalo
+        self.tamanho_lote = tamanho_lote
+        self.arquivo_pendentes = arquivo_pendentes
+        self.arquivo_rejeitados = arquivo_rejeitados
+        self._fila: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._lock_envio = threading.Lock()
+        self._evento = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._encerrada = False
+
+    def registrar(self, instrutor_id: Optional[int], atividade: str, unidade_id: int):
+        """
+        Enfileira um registro de log (retorna imediatamente)
+
+        Args:
+            instrutor_id: ID do instrutor (None para ações do sistema)
+            atividade: Descrição da atividade
+            unidade_id: ID da unidade
+        """
+        registro = {
+            "instrutor_id": instrutor_id,
+            "atividade": atividade,
+            "unidade_id": unidade_id,
+            "data_hora": datetime.now().isoformat()
+        }
+
+        with self._lock:
+            self._fila.append(registro)
+            lote_completo = len(self._fila) >= self.tamanho_lote
+
+        self._iniciar()
+        if lote_completo:
+            self._evento.set()
+
+    def descarregar(self) -> bool:
+        """
+        Envia imediatamente os registros pendentes (fila e arquivo local)
+
+        Returns:
+            bool: True se não restou nenhum registro pendente
+        """
+        with self._lock_envio:
+            with self._lock:
+                lote, self._fila = self._fila, []
+
+            pendentes = self._ler_arquivo_pendentes()
+            registros = pendentes + lote
+            if not registros:
+                return True
+
+            for inicio in range(0, len(registros), self.MAX_POR_REQUISICAO):
+                parte = registros[inicio:inicio + self.MAX_POR_REQUISICAO]
+                enviados = self._enviar(parte)
+                if enviados < len(parte):
+                    self._gravar_arquivo_pendentes(registros[inicio + enviados:])
+                    return False
+
+            if pendentes:
+                self._gravar_arquivo_pendentes([])
+            return True
+
+    def _enviar(self, registros: List[Dict[str, Any]]) -> int:
+        """
+        Envia um lote, separando os registros recusados pelo servidor
+
+        Um registro inválido faz o servidor recusar o lote inteiro; nesse
+        caso os registros são reenviados um a um e só os recusados vão
+        para o arquivo de rejeitados.
+
+        Returns:
+            int: Quantidade de registros resolvidos (gravados ou rejeitados),
+                a partir do início; o restante parou em um erro de conexão
+        """
+        try:
+            return len(registros) if self.gerenciador.adicionar_logs(registros) else 0
+        except APIError as e:
+            if len(registros) == 1:
+                print(f"Log recusado pelo servidor: {e}")
+                self._rejeitar(registros[0], str(e))
+                return 1
+
+        for posicao, registro in enumerate(registros):
+            if not self._enviar([registro]):
+                return posicao
+        return len(registros)
+
+    def encerrar(self):
+        """Interrompe o envio periódico e descarrega o que restou na fila"""
+        self._encerrada = True
+        self._evento.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=self.intervalo + 5)
+        self.descarregar()
+
+    def _iniciar(self):
+        """Inicia a thread de envio periódico na primeira utilização"""
+        if self._thread is not None or self._encerrada:
+            return
+
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._executar, name="FilaLogs", daemon=True)
+            self._thread.start()
+        atexit.register(self.encerrar)
+
+    def _executar(self):
+        """Laço da thread de envio: aguarda o intervalo ou um lote completo"""
+        while not self._encerrada:
+            self._evento.wait(self.intervalo)
+            self._evento.clear()
+            if not self._encerrada:
+                self.descarregar()
+
+    def _ler_arquivo_pendentes(self) -> List[Dict[str, Any]]:
+        """Lê os registros que não puderam ser enviados anteriormente"""
+        if not os.path.exists(self.arquivo_pendentes):
+            return []
+
+        registros = []
+        try:
+            with open(self.arquivo_pendentes, "r", encoding="utf-8") as f:
+                for linha in f:
+                    linha = linha.strip()
+                    if linha:
+                        registros.append(json.loads(linha))
+        except Exception as e:
+            print(f"Erro ao ler logs pendentes: {e}")
+        return registros
+
+    def _gravar_arquivo_pendentes(self, registros: List[Dict[str, Any]]):
+        """Substitui o arquivo de pendentes (remove o arquivo se a lista estiver vazia)"""
+        try:
+            if not registros:
+                if os.path.exists(self.arquivo_pendentes):
+                    os.remove(self.arquivo_pendentes)
+                return
+
+            temporario = f"{self.arquivo_pendentes}.tmp"
+            with open(temporario, "w", encoding="utf-8") as f:
+                for registro in registros:
+                    f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            os.replace(temporario, self.arquivo_pendentes)
+        except Exception as e:
+            print(f"Erro ao gravar logs pendentes: {e}")
+
+    def _rejeitar(self, registro: Dict[str, Any], erro: str):
+        """Acrescenta um registro recusado pelo servidor ao arquivo de rejeitados"""
+        rejeitado = dict(registro, erro=erro, rejeitado_em=datetime.now().isoformat())
+        try:
+            with open(self.arquivo_rejeitados, "a", encoding="utf-8") as f:
+                f.write(json.dumps(rejeitado, ensure_ascii=False) + "\n")
+        except Exception as e:
+            print(f"Erro ao gravar log rejeitado: {e}")
+
+
+# Instância global da fila de logs
+fila_logs = FilaLogs(db)
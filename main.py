@@ -8,10 +8,14 @@ from PySide6.QtWidgets import QApplication, QMessageBox, QInputDialog, QDialog,
 from PySide6.QtCore import QSettings
 from config import Config
 from database import db
+from fila_logs import fila_logs
+from ui.escritas import escritas
+from ui.executor import executor
 from ui.styles import ESTILO_PRINCIPAL, aplicar_classe_botao
 from ui.tela_unidade import TelaUnidade
 from ui.tela_instrutor import TelaInstrutor
 from ui.tela_principal import TelaPrincipal
+from ui.vigia_travamentos import iniciar_vigia
 
 
 class DialogConfigurarSupabase(QDialog):
@@ -115,6 +119,16 @@ class AplicacaoGestaoAlunos:
         # Aplicar estilo
         self.app.setStyleSheet(ESTILO_PRINCIPAL)
         
+        # Concluir as escritas em segundo plano e enviar os logs ainda na
+        # fila antes de encerrar (as escritas confirmadas enfileiram logs)
+        self.app.aboutToQuit.connect(escritas.encerrar)
+        self.app.aboutToQuit.connect(fila_logs.encerrar)
+        
+        # Relatório de travamentos da interface (desativado por padrão)
+        self.vigia = iniciar_vigia(self.app)
+        if self.vigia:
+            self.app.aboutToQuit.connect(self.vigia.parar)
+        
         # Janelas
         self.tela_unidade = None
         self.tela_instrutor = None
@@ -126,12 +140,16 @@ class AplicacaoGestaoAlunos:
         self.instrutor_id = None
         self.instrutor_nome = None
         
+        # Download da unidade para a réplica (feito enquanto o instrutor é escolhido)
+        self.unidade_baixada = False
+        self.aguardando_unidade = False
+        
     def iniciar(self):
         """Inicia a aplicação"""
-        # Verificar e configurar credenciais do Supabase
+        # Verificar e configurar credenciais do Supabase (somente no backend supabase)
         valido, mensagem = Config.validar_credenciais()
         
-        if not valido:
+        if not valido and Config.BACKEND == "supabase":
             dialog = DialogConfigurarSupabase()
             if dialog.exec() != QDialog.Accepted:
                 QMessageBox.critical(
@@ -143,6 +161,9 @@ class AplicacaoGestaoAlunos:
         
         # Conectar ao banco de dados
         sucesso, mensagem = db.conectar()
+        if not sucesso and Config.BACKEND != "supabase":
+            QMessageBox.critical(None, "Erro de Conexão", f"Não foi possível abrir o banco de dados:\n\n{mensagem}")
+            return 1
         if not sucesso:
             QMessageBox.critical(
                 None,
@@ -177,6 +198,15 @@ class AplicacaoGestaoAlunos:
         self.unidade_id = unidade_id
         self.unidade_nome = unidade_nome
         
+        # No modo réplica, baixa os dados da unidade na primeira utilização,
+        # em segundo plano enquanto o instrutor é escolhido
+        self.unidade_baixada = False
+        executor.executar(
+            db.acompanhar_unidade, unidade_id,
+            ao_concluir=self.ao_baixar_unidade,
+            ao_falhar=self.ao_falhar_download_unidade
+        )
+        
         # Fechar tela de unidade
         if self.tela_unidade:
             self.tela_unidade.close()
@@ -196,17 +226,38 @@ class AplicacaoGestaoAlunos:
         self.instrutor_nome = instrutor_nome
         
         # Registrar log de login
-        db.adicionar_log(
+        fila_logs.registrar(
             instrutor_id=self.instrutor_id,
             atividade=f"Login no sistema",
             unidade_id=self.unidade_id
         )
         
-        # Fechar tela de instrutor
+        # A tela principal lê a réplica: aguardar o download da unidade
+        if self.unidade_baixada:
+            self.abrir_tela_principal()
+        else:
+            self.aguardando_unidade = True
+            self.tela_instrutor.setEnabled(False)
+            self.tela_instrutor.setWindowTitle(
+                f"{self.tela_instrutor.windowTitle()} - Baixando dados da unidade..."
+            )
+        
+    def ao_baixar_unidade(self, _resultado=None):
+        """Callback quando os dados da unidade estão na réplica"""
+        self.unidade_baixada = True
+        if self.aguardando_unidade:
+            self.aguardando_unidade = False
+            self.abrir_tela_principal()
+        
+    def ao_falhar_download_unidade(self, mensagem: str):
+        """Sem o download, a sincronização periódica completa a réplica depois"""
+        print(f"Erro ao baixar os dados da unidade: {mensagem}")
+        self.ao_baixar_unidade()
+        
+    def abrir_tela_principal(self):
+        """Fecha a tela de instrutor e mostra a tela principal"""
         if self.tela_instrutor:
             self.tela_instrutor.close()
-        
-        # Mostrar tela principal
         self.mostrar_tela_principal()
         
     def mostrar_tela_principal(self):
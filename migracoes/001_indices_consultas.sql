@@ -0,0 +1,59 @@
+-- ============================================
+-- MIGRAÇÃO 001 - ÍNDICES DAS CONSULTAS DO APLICATIVO
+-- ============================================
+-- Para bancos criados com uma versão anterior do schema.sql (que já
+-- contém estes índices). Execute no SQL Editor do Supabase.
+--
+-- Cada índice segue o formato de uma consulta do DatabaseManager: as
+-- colunas de igualdade primeiro e depois as da ordenação, com o id no
+-- final (desempate da paginação por keyset). Assim o banco lê as linhas
+-- já na ordem pedida e para no limite da página, sem ordenar a unidade
+-- inteira. Os índices de uma coluna que viraram prefixo de um composto
+-- são removidos: só custavam escrita.
+--
+-- Em uma base grande com uso durante a migração, prefira executar cada
+-- CREATE INDEX como CREATE INDEX CONCURRENTLY, um por vez (fora de uma
+-- transação), para não bloquear as escritas.
+--
+-- Verificação: python -m benchmarks.planos_consultas --dsn <postgres local>
+
+-- Instrutores da unidade, ordenados por nome (listar_instrutores)
+CREATE INDEX IF NOT EXISTS idx_instrutores_unidade_nome ON instrutores(unidade_id, nome, id);
+DROP INDEX IF EXISTS idx_instrutores_unidade;
+DROP INDEX IF EXISTS idx_instrutores_ativo;
+
+-- Lista da tela principal: alunos ativos da unidade por (nome, id).
+-- Parcial: não inclui os arquivados, que só crescem com o tempo
+CREATE INDEX IF NOT EXISTS idx_alunos_ativos ON alunos(unidade_id, nome, id)
+    WHERE arquivado = FALSE;
+
+-- Lista com os arquivados junto (incluir_arquivados=True)
+CREATE INDEX IF NOT EXISTS idx_alunos_unidade_nome ON alunos(unidade_id, nome, id);
+DROP INDEX IF EXISTS idx_alunos_unidade;
+DROP INDEX IF EXISTS idx_alunos_arquivado;
+
+-- Ações de um aluno, das mais recentes para as mais antigas (listar_acoes)
+CREATE INDEX IF NOT EXISTS idx_acoes_aluno_data ON acoes(aluno_id, data_proposta DESC, id DESC);
+DROP INDEX IF EXISTS idx_acoes_aluno;
+
+-- Ações pendentes de um aluno (contador acoes_pendentes e sua reconciliação).
+-- Parcial: as concluídas, a maioria com o tempo, ficam de fora
+CREATE INDEX IF NOT EXISTS idx_acoes_pendentes ON acoes(aluno_id)
+    WHERE status = 'Pendente';
+DROP INDEX IF EXISTS idx_acoes_status;
+
+-- Download incremental das ações para a réplica local (atualizado_em, id)
+CREATE INDEX IF NOT EXISTS idx_acoes_atualizado ON acoes(atualizado_em, id);
+
+-- Logs da unidade, do mais recente para o mais antigo (listar_logs)
+CREATE INDEX IF NOT EXISTS idx_logs_unidade_data ON logs(unidade_id, data_hora DESC, id DESC);
+DROP INDEX IF EXISTS idx_logs_unidade;
+
+-- Logs novos de uma unidade para a réplica local (id > último baixado)
+CREATE INDEX IF NOT EXISTS idx_logs_unidade_id ON logs(unidade_id, id);
+
+-- Estatísticas atualizadas para o planejador considerar os índices novos
+ANALYZE instrutores;
+ANALYZE alunos;
+ANALYZE acoes;
+ANALYZE logs;
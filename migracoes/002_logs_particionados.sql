@@ -0,0 +1,162 @@
+-- ============================================
+-- MIGRAÇÃO 002 - LOGS PARTICIONADOS POR MÊS E RESUMO DIÁRIO
+-- ============================================
+-- Para bancos criados com uma versão anterior do schema.sql, em que logs
+-- é uma tabela comum. Execute no SQL Editor do Supabase fora do horário
+-- de uso: a tabela fica bloqueada enquanto os logs são copiados (os
+-- aplicativos guardam os logs na fila local e reenviam depois).
+--
+-- A tabela antiga é renomeada, a nova é criada particionada por mês com a
+-- mesma sequência de ids (a réplica local continua a partir do último id
+-- baixado), os logs são copiados e a tabela antiga é removida. Depois
+-- disso, reter_logs (seção 5.1 do schema.sql) pode ser agendada.
+
+BEGIN;
+
+-- 1. Tabela antiga fora do caminho (a view depende dela)
+DROP VIEW IF EXISTS view_logs_completos;
+ALTER TABLE logs RENAME TO logs_antigo;
+ALTER TABLE logs_antigo RENAME CONSTRAINT logs_pkey TO logs_antigo_pkey;
+DROP INDEX IF EXISTS idx_logs_data;
+DROP INDEX IF EXISTS idx_logs_instrutor;
+DROP INDEX IF EXISTS idx_logs_unidade_data;
+DROP INDEX IF EXISTS idx_logs_unidade_id;
+
+-- 2. Tabela particionada (como a seção 5 do schema.sql)
+CREATE TABLE logs (
+    id INTEGER NOT NULL DEFAULT nextval('logs_id_seq'),
+    instrutor_id INTEGER REFERENCES instrutores(id) ON DELETE SET NULL,
+    atividade TEXT NOT NULL,
+    data_hora TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    unidade_id INTEGER REFERENCES unidades(id) ON DELETE CASCADE,
+    PRIMARY KEY (id, data_hora)
+) PARTITION BY RANGE (data_hora);
+ALTER SEQUENCE logs_id_seq OWNED BY logs.id;
+
+CREATE TABLE logs_padrao PARTITION OF logs DEFAULT;
+
+CREATE INDEX idx_logs_data ON logs(data_hora DESC);
+CREATE INDEX idx_logs_instrutor ON logs(instrutor_id);
+CREATE INDEX idx_logs_unidade_data ON logs(unidade_id, data_hora DESC, id DESC);
+CREATE INDEX idx_logs_unidade_id ON logs(unidade_id, id);
+
+CREATE OR REPLACE FUNCTION criar_particoes_logs(
+    p_inicio DATE DEFAULT CURRENT_DATE,
+    p_meses_a_frente INTEGER DEFAULT 3
+)
+RETURNS INTEGER AS $$
+DECLARE
+    mes DATE := date_trunc('month', p_inicio)::DATE;
+    ultimo DATE := (date_trunc('month', CURRENT_DATE) + make_interval(months => p_meses_a_frente))::DATE;
+    proximo DATE;
+    particao TEXT;
+    criadas INTEGER := 0;
+BEGIN
+    WHILE mes <= ultimo LOOP
+        proximo := (mes + INTERVAL '1 month')::DATE;
+        particao := 'logs_' || to_char(mes, 'YYYY_MM');
+        IF to_regclass(particao) IS NULL THEN
+            EXECUTE format('CREATE TABLE %I (LIKE logs INCLUDING DEFAULTS)', particao);
+            EXECUTE format(
+                'WITH movidos AS (DELETE FROM logs_padrao WHERE data_hora >= %L AND data_hora < %L RETURNING *) '
+                'INSERT INTO %I SELECT * FROM movidos',
+                mes, proximo, particao
+            );
+            EXECUTE format(
+                'ALTER TABLE logs ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                particao, mes, proximo
+            );
+            criadas := criadas + 1;
+        END IF;
+        mes := proximo;
+    END LOOP;
+    RETURN criadas;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 3. Partições desde o log mais antigo e cópia dos dados
+SELECT criar_particoes_logs(COALESCE((SELECT MIN(data_hora) FROM logs_antigo)::DATE, CURRENT_DATE));
+
+INSERT INTO logs (id, instrutor_id, atividade, data_hora, unidade_id)
+SELECT id, instrutor_id, atividade, COALESCE(data_hora, CURRENT_TIMESTAMP), unidade_id
+FROM logs_antigo;
+
+DROP TABLE logs_antigo;
+
+-- 4. View recriada sobre a tabela nova
+CREATE OR REPLACE VIEW view_logs_completos AS
+SELECT
+    l.id,
+    i.nome AS instrutor_nome,
+    l.atividade,
+    l.data_hora,
+    u.nome AS unidade_nome
+FROM logs l
+LEFT JOIN instrutores i ON l.instrutor_id = i.id
+LEFT JOIN unidades u ON l.unidade_id = u.id
+ORDER BY l.data_hora DESC;
+
+-- 5. Resumo diário e retenção (como a seção 5.1 do schema.sql)
+CREATE TABLE IF NOT EXISTS logs_resumo_diario (
+    id SERIAL PRIMARY KEY,
+    dia DATE NOT NULL,
+    unidade_id INTEGER REFERENCES unidades(id) ON DELETE CASCADE,
+    instrutor_id INTEGER,
+    instrutor_nome VARCHAR(255),
+    quantidade INTEGER NOT NULL,
+    primeira_atividade TIMESTAMP,
+    ultima_atividade TIMESTAMP,
+    UNIQUE NULLS NOT DISTINCT (dia, unidade_id, instrutor_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_logs_resumo_unidade_dia
+    ON logs_resumo_diario(unidade_id, dia DESC, id DESC);
+
+CREATE OR REPLACE FUNCTION reter_logs(p_meses_retidos INTEGER DEFAULT 12)
+RETURNS INTEGER AS $$
+DECLARE
+    limite DATE := (date_trunc('month', CURRENT_DATE) - make_interval(months => p_meses_retidos))::DATE;
+    particao RECORD;
+    resumidos INTEGER;
+BEGIN
+    SELECT COUNT(*) INTO resumidos FROM logs WHERE data_hora < limite;
+
+    INSERT INTO logs_resumo_diario (
+        dia, unidade_id, instrutor_id, instrutor_nome, quantidade,
+        primeira_atividade, ultima_atividade
+    )
+    SELECT l.data_hora::DATE, l.unidade_id, l.instrutor_id, MAX(i.nome), COUNT(*),
+           MIN(l.data_hora), MAX(l.data_hora)
+    FROM logs l
+    LEFT JOIN instrutores i ON i.id = l.instrutor_id
+    WHERE l.data_hora < limite
+    GROUP BY l.data_hora::DATE, l.unidade_id, l.instrutor_id
+    ON CONFLICT (dia, unidade_id, instrutor_id) DO UPDATE SET
+        instrutor_nome = COALESCE(EXCLUDED.instrutor_nome, logs_resumo_diario.instrutor_nome),
+        quantidade = logs_resumo_diario.quantidade + EXCLUDED.quantidade,
+        primeira_atividade = LEAST(logs_resumo_diario.primeira_atividade, EXCLUDED.primeira_atividade),
+        ultima_atividade = GREATEST(logs_resumo_diario.ultima_atividade, EXCLUDED.ultima_atividade);
+
+    FOR particao IN
+        SELECT c.relname
+        FROM pg_inherits h
+        JOIN pg_class c ON c.oid = h.inhrelid
+        WHERE h.inhparent = 'logs'::regclass
+          AND c.relname ~ '^logs_[0-9]{4}_[0-9]{2}$'
+          AND to_date(substring(c.relname FROM 6), 'YYYY_MM') < limite
+    LOOP
+        EXECUTE format('DROP TABLE %I', particao.relname);
+    END LOOP;
+    DELETE FROM logs_padrao WHERE data_hora < limite;
+
+    PERFORM criar_particoes_logs();
+    RETURN resumidos;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMIT;
+
+ANALYZE logs;
+
+-- Para executar todo dia 1º com a extensão pg_cron (opcional):
+-- SELECT cron.schedule('reter-logs', '0 4 1 * *', 'SELECT reter_logs(12)');
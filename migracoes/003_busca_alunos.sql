@@ -0,0 +1,72 @@
+-- ============================================
+-- MIGRAÇÃO 003 - BUSCA DE ALUNOS
+-- ============================================
+-- Para bancos criados com uma versão anterior do schema.sql. Execute no
+-- SQL Editor do Supabase. Cria o índice de trigramas sobre nome, curso e
+-- observações e a função buscar_alunos usada pelo campo de busca da tela
+-- principal (como a seção 3 do schema.sql).
+--
+-- Em uma base grande com uso durante a migração, prefira criar o índice
+-- com CREATE INDEX CONCURRENTLY (fora de uma transação) para não bloquear
+-- as escritas em alunos.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE OR REPLACE FUNCTION normalizar_busca(p_texto TEXT)
+RETURNS TEXT AS $$
+    SELECT translate(lower(coalesce(p_texto, '')),
+                     'áàâãäéèêëíìîïóòôõöúùûüçñ',
+                     'aaaaaeeeeiiiiooooouuuucn');
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+CREATE OR REPLACE FUNCTION texto_busca_aluno(p_nome TEXT, p_curso TEXT, p_observacoes TEXT)
+RETURNS TEXT AS $$
+    SELECT normalizar_busca(p_nome || ' ' || coalesce(p_curso, '') || ' ' || coalesce(p_observacoes, ''));
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+CREATE INDEX IF NOT EXISTS idx_alunos_busca
+    ON alunos USING GIN (texto_busca_aluno(nome, curso_matriculado, observacoes) gin_trgm_ops);
+
+-- Página de resultados de uma busca, da maior para a menor relevância.
+-- Trecho no início do nome vale mais que no meio do nome, que vale mais
+-- que em outro campo; a semelhança por trigramas desempata e classifica
+-- os resultados aproximados. Retorna só os ids: o aplicativo busca as
+-- colunas da lista em seguida (mesmo perfil da tela principal).
+CREATE OR REPLACE FUNCTION buscar_alunos(
+    p_unidade_id INTEGER,
+    p_termo TEXT,
+    p_incluir_arquivados BOOLEAN DEFAULT FALSE,
+    p_limite INTEGER DEFAULT 50,
+    p_deslocamento INTEGER DEFAULT 0
+)
+RETURNS TABLE (aluno_id INTEGER, relevancia REAL) AS $$
+DECLARE
+    termo TEXT := normalizar_busca(trim(p_termo));
+    -- Curingas digitados (% e _) são procurados literalmente
+    padrao TEXT := '%' || replace(replace(replace(termo, '\', '\\'), '%', '\%'), '_', '\_') || '%';
+BEGIN
+    IF termo = '' THEN
+        RETURN;
+    END IF;
+
+    RETURN QUERY
+    SELECT a.id,
+           (CASE
+                WHEN normalizar_busca(a.nome) LIKE ltrim(padrao, '%') THEN 2
+                WHEN normalizar_busca(a.nome) LIKE padrao THEN 1
+                ELSE 0
+            END
+            + word_similarity(termo, normalizar_busca(a.nome))
+            + word_similarity(termo, texto_busca_aluno(a.nome, a.curso_matriculado, a.observacoes))
+           )::REAL
+    FROM alunos a
+    WHERE a.unidade_id = p_unidade_id
+      AND (p_incluir_arquivados OR a.arquivado = FALSE)
+      AND (texto_busca_aluno(a.nome, a.curso_matriculado, a.observacoes) LIKE padrao
+           OR termo <% texto_busca_aluno(a.nome, a.curso_matriculado, a.observacoes))
+    ORDER BY 2 DESC, a.nome, a.id
+    LIMIT p_limite OFFSET p_deslocamento;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+ANALYZE alunos;
@@ -0,0 +1,23 @@
+-- ============================================
+-- MIGRAÇÃO 004 - REENVIO IDEMPOTENTE DA RÉPLICA LOCAL
+-- ============================================
+-- Para bancos criados com uma versão anterior do schema.sql. Execute no
+-- SQL Editor do Supabase antes de atualizar os computadores que usam a
+-- réplica local (REPLICA_LOCAL=1): o reenvio do diário passa a gravar a
+-- coluna id_cliente (como a seção 6.4 do schema.sql).
+--
+-- Inserções reenviadas pela réplica local (modo offline) levam um
+-- id_cliente gerado no computador que as fez. Se a resposta de uma
+-- inserção se perder, o reenvio encontra a chave já gravada e não duplica
+-- o registro (upsert com ignore_duplicates em replica_local.py). Registros
+-- inseridos fora da réplica ficam com id_cliente nulo.
+ALTER TABLE instrutores ADD COLUMN IF NOT EXISTS id_cliente UUID;
+ALTER TABLE alunos ADD COLUMN IF NOT EXISTS id_cliente UUID;
+ALTER TABLE acoes ADD COLUMN IF NOT EXISTS id_cliente UUID;
+ALTER TABLE logs ADD COLUMN IF NOT EXISTS id_cliente UUID;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_instrutores_id_cliente ON instrutores(id_cliente);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_alunos_id_cliente ON alunos(id_cliente);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_acoes_id_cliente ON acoes(id_cliente);
+-- Em uma tabela particionada, a restrição única inclui a chave de partição
+CREATE UNIQUE INDEX IF NOT EXISTS idx_logs_id_cliente ON logs(id_cliente, data_hora);
@@ -0,0 +1,20 @@
+-- ============================================
+-- MIGRAÇÃO 005 - RESUMO DAS OBSERVAÇÕES NA LISTA DE ALUNOS
+-- ============================================
+-- Para bancos criados com uma versão anterior do schema.sql. Execute no
+-- SQL Editor do Supabase antes de atualizar os aplicativos: as listas de
+-- alunos (tela principal e arquivados) pedem a coluna calculada
+-- observacoes_resumo em vez do texto completo (como a seção 3 do schema.sql).
+
+-- Coluna calculada com o início das observações (até 50 caracteres).
+-- O PostgREST expõe a função como a coluna "observacoes_resumo" de alunos.
+CREATE OR REPLACE FUNCTION observacoes_resumo(alunos)
+RETURNS TEXT AS $$
+    SELECT CASE
+        WHEN length($1.observacoes) > 50 THEN left($1.observacoes, 47) || '...'
+        ELSE $1.observacoes
+    END;
+$$ LANGUAGE sql STABLE;
+
+-- O PostgREST só enxerga a coluna nova depois de recarregar o schema
+NOTIFY pgrst, 'reload schema';
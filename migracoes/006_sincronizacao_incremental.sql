@@ -0,0 +1,64 @@
+-- ============================================
+-- MIGRAÇÃO 006 - SINCRONIZAÇÃO INCREMENTAL DA LISTA DE ALUNOS
+-- ============================================
+-- Para bancos criados com uma versão anterior do schema.sql. Execute no
+-- SQL Editor do Supabase antes de atualizar os aplicativos (como a seção
+-- 6.1 do schema.sql). A tela principal busca somente os alunos com
+-- atualizado_em a partir da última sincronização; sem esta migração ela
+-- não fica sabendo das exclusões nem das mudanças nas ações.
+--
+-- Pode ser executada de novo. A migração 008 substitui tocar_aluno_da_acao
+-- pela versão que também mantém o contador de ações pendentes: execute as
+-- migrações em ordem.
+
+-- Alterações desde uma marca d'água
+CREATE INDEX IF NOT EXISTS idx_alunos_unidade_atualizado ON alunos(unidade_id, atualizado_em, id);
+
+CREATE TABLE IF NOT EXISTS registros_excluidos (
+    id SERIAL PRIMARY KEY,
+    tabela VARCHAR(50) NOT NULL,
+    registro_id INTEGER NOT NULL,
+    unidade_id INTEGER,
+    excluido_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_registros_excluidos_busca
+    ON registros_excluidos(tabela, unidade_id, excluido_em, id);
+
+-- Registra a exclusão de um aluno
+CREATE OR REPLACE FUNCTION registrar_exclusao_aluno()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO registros_excluidos (tabela, registro_id, unidade_id)
+    VALUES ('alunos', OLD.id, OLD.unidade_id);
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_exclusao_alunos ON alunos;
+CREATE TRIGGER trigger_exclusao_alunos
+    AFTER DELETE ON alunos
+    FOR EACH ROW
+    EXECUTE FUNCTION registrar_exclusao_aluno();
+
+-- Atualiza o atualizado_em do aluno quando suas ações mudam
+CREATE OR REPLACE FUNCTION tocar_aluno_da_acao()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE alunos SET atualizado_em = CURRENT_TIMESTAMP WHERE id = NEW.aluno_id;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE alunos SET atualizado_em = CURRENT_TIMESTAMP WHERE id = OLD.aluno_id;
+    ELSE
+        UPDATE alunos SET atualizado_em = CURRENT_TIMESTAMP
+        WHERE id IN (OLD.aluno_id, NEW.aluno_id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_tocar_aluno_acoes ON acoes;
+CREATE TRIGGER trigger_tocar_aluno_acoes
+    AFTER INSERT OR UPDATE OR DELETE ON acoes
+    FOR EACH ROW
+    EXECUTE FUNCTION tocar_aluno_da_acao();
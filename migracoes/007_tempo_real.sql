@@ -0,0 +1,29 @@
+-- ============================================
+-- MIGRAÇÃO 007 - ALTERAÇÕES EM TEMPO REAL
+-- ============================================
+-- Para bancos criados com uma versão anterior do schema.sql. Execute no
+-- SQL Editor do Supabase (como a seção 6.2 do schema.sql). Com
+-- TEMPO_REAL=supabase (o padrão), a tela principal assina as alterações de
+-- alunos e acoes; sem as tabelas na publicação, nenhum evento chega.
+--
+-- Pode ser executada de novo: as tabelas já publicadas são mantidas.
+-- REPLICA IDENTITY FULL envia a linha anterior completa em UPDATE/DELETE
+-- (a tela principal precisa do aluno_id de uma ação excluída).
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_publication_tables
+        WHERE pubname = 'supabase_realtime' AND schemaname = 'public' AND tablename = 'alunos'
+    ) THEN
+        ALTER PUBLICATION supabase_realtime ADD TABLE alunos;
+    END IF;
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_publication_tables
+        WHERE pubname = 'supabase_realtime' AND schemaname = 'public' AND tablename = 'acoes'
+    ) THEN
+        ALTER PUBLICATION supabase_realtime ADD TABLE acoes;
+    END IF;
+END;
+$$;
+ALTER TABLE acoes REPLICA IDENTITY FULL;
@@ -0,0 +1,119 @@
+-- ============================================
+-- MIGRAÇÃO 008 - CONTADOR DE AÇÕES PENDENTES
+-- ============================================
+-- Para bancos criados com uma versão anterior do schema.sql. Execute no
+-- SQL Editor do Supabase antes de atualizar os aplicativos: a lista de
+-- alunos, a busca e a atualização em tempo real leem a coluna
+-- alunos.acoes_pendentes (como as seções 3 e 6.3 do schema.sql). Requer a
+-- migração 006 (tabela registros_excluidos e o trigger de acoes).
+--
+-- Pode ser executada de novo. O trigger passa a manter o contador e, no
+-- final, reconciliar_acoes_pendentes preenche os contadores existentes;
+-- tudo em uma transação, então nenhuma ação alterada durante a migração
+-- fica fora da contagem.
+
+BEGIN;
+
+ALTER TABLE alunos ADD COLUMN IF NOT EXISTS acoes_pendentes INTEGER NOT NULL DEFAULT 0;
+
+-- Ações pendentes de um aluno (contador e reconciliação)
+CREATE INDEX IF NOT EXISTS idx_acoes_pendentes ON acoes(aluno_id)
+    WHERE status = 'Pendente';
+
+-- Atualiza o atualizado_em do aluno quando suas ações mudam e mantém o
+-- contador acoes_pendentes (seção 6.3 do schema.sql) com uma única atualização por aluno
+CREATE OR REPLACE FUNCTION tocar_aluno_da_acao()
+RETURNS TRIGGER AS $$
+DECLARE
+    pendente_antes INTEGER := 0;
+    pendente_depois INTEGER := 0;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        pendente_antes := (OLD.status = 'Pendente')::INTEGER;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        pendente_depois := (NEW.status = 'Pendente')::INTEGER;
+    END IF;
+
+    IF TG_OP = 'UPDATE' AND OLD.aluno_id = NEW.aluno_id THEN
+        UPDATE alunos SET atualizado_em = CURRENT_TIMESTAMP,
+            acoes_pendentes = acoes_pendentes + pendente_depois - pendente_antes
+        WHERE id = NEW.aluno_id;
+        RETURN NULL;
+    END IF;
+
+    -- Exclusão, inserção ou ação transferida para outro aluno
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE alunos SET atualizado_em = CURRENT_TIMESTAMP,
+            acoes_pendentes = acoes_pendentes - pendente_antes
+        WHERE id = OLD.aluno_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE alunos SET atualizado_em = CURRENT_TIMESTAMP,
+            acoes_pendentes = acoes_pendentes + pendente_depois
+        WHERE id = NEW.aluno_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_tocar_aluno_acoes ON acoes;
+CREATE TRIGGER trigger_tocar_aluno_acoes
+    AFTER INSERT OR UPDATE OR DELETE ON acoes
+    FOR EACH ROW
+    EXECUTE FUNCTION tocar_aluno_da_acao();
+
+CREATE OR REPLACE FUNCTION reconciliar_acoes_pendentes(p_unidade_id INTEGER DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+    corrigidos INTEGER;
+BEGIN
+    WITH contagens AS (
+        SELECT a.id, COUNT(ac.id) AS pendentes
+        FROM alunos a
+        LEFT JOIN acoes ac ON ac.aluno_id = a.id AND ac.status = 'Pendente'
+        WHERE p_unidade_id IS NULL OR a.unidade_id = p_unidade_id
+        GROUP BY a.id
+    )
+    UPDATE alunos SET acoes_pendentes = contagens.pendentes
+    FROM contagens
+    WHERE alunos.id = contagens.id
+      AND alunos.acoes_pendentes <> contagens.pendentes;
+
+    GET DIAGNOSTICS corrigidos = ROW_COUNT;
+    RETURN corrigidos;
+END;
+$$ LANGUAGE plpgsql;
+
+-- View para alunos ativos com informações completas
+CREATE OR REPLACE VIEW view_alunos_ativos AS
+SELECT 
+    a.id,
+    a.nome,
+    a.data_inicio,
+    a.curso_matriculado,
+    a.tipo_plano,
+    a.modulo,
+    a.aulas,
+    a.dia_horario,
+    a.situacao_academica,
+    a.observacoes,
+    a.pagamento_parcelas,
+    i.nome AS instrutor_nome,
+    u.nome AS unidade_nome,
+    a.criado_em,
+    a.atualizado_em,
+    a.acoes_pendentes
+FROM alunos a
+LEFT JOIN instrutores i ON a.instrutor_id = i.id
+LEFT JOIN unidades u ON a.unidade_id = u.id
+WHERE a.arquivado = FALSE
+ORDER BY a.nome;
+
+-- Preenche os contadores dos alunos existentes
+SELECT reconciliar_acoes_pendentes();
+
+COMMIT;
+
+-- O PostgREST só enxerga a coluna nova depois de recarregar o schema
+NOTIFY pgrst, 'reload schema';
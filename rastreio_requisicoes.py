@@ -0,0 +1,222 @@
+"""
+Rastreio de Requisições
+Conta as requisições, linhas e bytes que cada ação do usuário (abrir a
+tela principal, salvar um aluno, concluir uma ação...) faz ao banco, para
+que regressões no número de idas ao servidor sejam percebidas
+"""
+
+from typing import Optional, List, Dict, Any
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from config import Config
+import functools
+import inspect
+import json
+import threading
+import time
+
+
+class OrcamentoExcedido(AssertionError):
+    """Uma ação fez mais requisições (ou trouxe mais linhas/bytes) que o permitido"""
+
+
+class ContagemAcao:
+    """
+    Requisições feitas durante uma ação do usuário
+
+    Continua recebendo as requisições das tarefas em segundo plano
+    iniciadas pela ação mesmo depois que o bloco da ação termina.
+    """
+
+    def __init__(self, nome: str, pai: Optional["ContagemAcao"] = None):
+        self.nome = nome
+        self.pai = pai
+        self.inicio = time.monotonic()
+        self.requisicoes = 0
+        self.linhas = 0
+        self.bytes = 0
+        # (tabela, operação) -> requisições
+        self.por_consulta: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def registrar(self, tabela: str, operacao: str, linhas: int, tamanho: int):
+        """Soma uma requisição nesta ação e nas ações que a contêm"""
+        acao = self
+        while acao is not None:
+            with acao._lock:
+                acao.requisicoes += 1
+                acao.linhas += linhas
+                acao.bytes += tamanho
+                acao.por_consulta[(tabela, operacao)] += 1
+            acao = acao.pai
+
+    def verificar(self, max_requisicoes: Optional[int] = None,
+                  max_linhas: Optional[int] = None, max_bytes: Optional[int] = None):
+        """
+        Confere a ação contra um orçamento
+
+        Sem argumentos, usa o orçamento de Config.ORCAMENTO_REQUISICOES
+        para o nome da ação.
+
+        Raises:
+            OrcamentoExcedido: Se algum limite foi ultrapassado
+        """
+        if max_requisicoes is None and max_linhas is None and max_bytes is None:
+            max_requisicoes = Config.ORCAMENTO_REQUISICOES.get(self.nome)
+
+        excessos = []
+        if max_requisicoes is not None and self.requisicoes > max_requisicoes:
+            excessos.append(f"{self.requisicoes} requisições (máximo {max_requisicoes})")
+        if max_linhas is not None and self.linhas > max_linhas:
+            excessos.append(f"{self.linhas} linhas (máximo {max_linhas})")
+        if max_bytes is not None and self.bytes > max_bytes:
+            excessos.append(f"{self.bytes} bytes (máximo {max_bytes})")
+        if excessos:
+            detalhes = ", ".join(f"{t}.{o} x{n}" for (t, o), n in self.por_consulta.most_common())
+            raise OrcamentoExcedido(f"Ação '{self.nome}': {'; '.join(excessos)} [{detalhes}]")
+
+    def como_dict(self) -> Dict[str, Any]:
+        return {
+            "acao": self.nome,
+            "requisicoes": self.requisicoes,
+            "linhas": self.linhas,
+            "bytes": self.bytes,
+            "por_consulta": {f"{t}.{o}": n for (t, o), n in self.por_consulta.items()},
+        }
+
+
+# Ação em andamento no contexto atual (copiado para as tarefas em segundo plano)
+_acao_atual: ContextVar[Optional[ContagemAcao]] = ContextVar("acao_atual", default=None)
+
+
+class RastreadorRequisicoes:
+    """Registra as requisições ao banco e as atribui à ação em andamento"""
+
+    def __init__(self, historico: int = 200, medir_bytes: bool = Config.RASTREIO_MEDIR_BYTES):
+        self.total = ContagemAcao("total")
+        # Serializar cada resposta para medir o tamanho custa caro em listas
+        # grandes; desligado, as contagens de bytes ficam em zero
+        self.medir_bytes = medir_bytes
+        # Ações mais recentes, para diagnóstico
+        self.historico: "deque[ContagemAcao]" = deque(maxlen=historico)
+
+    @contextmanager
+    def acao(self, nome: str, historico: bool = True):
+        """
+        Atribui a `nome` as requisições feitas dentro do bloco
+
+        Ações aninhadas também contam nas ações que as contêm. Com
+        historico=False a contagem não entra em ultimas_acoes (usado pelas
+        medições internas, que são muito mais numerosas que as ações).
+
+            with rastreador.acao("abrir_tela_principal") as acao:
+                ...
+            acao.verificar(max_requisicoes=2)
+        """
+        contagem = ContagemAcao(nome, _acao_atual.get())
+        if historico:
+            self.historico.append(contagem)
+        token = _acao_atual.set(contagem)
+        try:
+            yield contagem
+        finally:
+            _acao_atual.reset(token)
+
+    def medir_acao(self, nome: str):
+        """
+        Decorator de slots da interface: cada chamada é uma ação
+
+        Argumentos extras enviados pelo signal (ex.: checked de clicked)
+        são descartados quando o método não os aceita, como faz o Qt.
+        """
+        def decorador(metodo):
+            parametros = inspect.signature(metodo).parameters.values()
+            if any(p.kind == p.VAR_POSITIONAL for p in parametros):
+                max_argumentos = None
+            else:
+                max_argumentos = sum(
+                    p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD) for p in parametros
+                )
+
+            @functools.wraps(metodo)
+            def envoltorio(*args, **kwargs):
+                if max_argumentos is not None:
+                    args = args[:max_argumentos]
+                with self.acao(nome):
+                    return metodo(*args, **kwargs)
+            return envoltorio
+        return decorador
+
+    def registrar(self, tabela: str, operacao: str, resposta: Any):
+        """Registra a resposta de uma requisição na ação atual e no total"""
+        dados = getattr(resposta, 'data', None)
+        linhas = len(dados) if isinstance(dados, list) else int(dados is not None)
+        tamanho = 0
+        if self.medir_bytes:
+            # Tamanho aproximado do corpo JSON da resposta
+            tamanho = len(json.dumps(dados, default=str, ensure_ascii=False).encode("utf-8"))
+
+        self.total.registrar(tabela, operacao, linhas, tamanho)
+        acao = _acao_atual.get()
+        if acao is not None:
+            acao.registrar(tabela, operacao, linhas, tamanho)
+
+    def ultimas_acoes(self, nome: Optional[str] = None) -> List[ContagemAcao]:
+        """Ações mais recentes (da mais antiga para a mais nova), opcionalmente filtradas por nome"""
+        return [acao for acao in list(self.historico) if nome is None or acao.nome == nome]
+
+
+# ============================================
+# CLIENTE RASTREADO
+# ============================================
+
+class _ConsultaRastreada:
+    """Repassa as chamadas à consulta e registra a resposta de execute()"""
+
+    OPERACOES = ("select", "insert", "upsert", "update", "delete")
+
+    def __init__(self, consulta, tabela: str, rastreador: RastreadorRequisicoes):
+        self._consulta = consulta
+        self._tabela = tabela
+        self._operacao = "select"
+        self._rastreador = rastreador
+
+    def __getattr__(self, nome: str):
+        atributo = getattr(self._consulta, nome)
+        if not callable(atributo):
+            return atributo
+
+        def chamar(*args, **kwargs):
+            resultado = atributo(*args, **kwargs)
+            if nome == "execute":
+                self._rastreador.registrar(self._tabela, self._operacao, resultado)
+                return resultado
+            if nome in self.OPERACOES:
+                self._operacao = nome
+            self._consulta = resultado
+            return self
+        return chamar
+
+
+class ClienteRastreado:
+    """Cliente com a interface do Supabase que registra cada requisição"""
+
+    def __init__(self, cliente, rastreador: RastreadorRequisicoes):
+        self.cliente = cliente
+        self.rastreador = rastreador
+
+    def table(self, nome: str) -> _ConsultaRastreada:
+        return _ConsultaRastreada(self.cliente.table(nome), nome, self.rastreador)
+
+    def rpc(self, funcao: str, parametros: Optional[Dict[str, Any]] = None) -> _ConsultaRastreada:
+        consulta = _ConsultaRastreada(self.cliente.rpc(funcao, parametros or {}), funcao, self.rastreador)
+        consulta._operacao = "rpc"
+        return consulta
+
+    def __getattr__(self, nome: str):
+        return getattr(self.cliente, nome)
+
+
+# Instância global do rastreador
+rastreador = RastreadorRequisicoes()
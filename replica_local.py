@@ -0,0 +1,502 @@
+"""
+Réplica Local
+Cópia SQLite dos dados da unidade para funcionamento sem internet:
+as leituras são atendidas localmente e as escritas vão para um diário
+em disco, reenviado ao Supabase em ordem quando a conexão volta
+"""
+
+from typing import Optional, List, Dict, Any, Callable, Tuple
+from postgrest.exceptions import APIError
+from backends.sqlite import ClienteSQLite, ConsultaSQLite, RespostaConsulta, valor_sqlite
+import json
+import threading
+import uuid
+
+
+# Tabela do diário de escritas (no mesmo arquivo da réplica, então cada
+# escrita local e sua entrada no diário são confirmadas juntas)
+ESQUEMA_DIARIO = """
+CREATE TABLE IF NOT EXISTS diario_escritas (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    tabela TEXT NOT NULL,
+    operacao TEXT NOT NULL,
+    dados TEXT,
+    filtros TEXT NOT NULL DEFAULT '[]',
+    ids_locais TEXT NOT NULL DEFAULT '[]',
+    criado_em TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS diario_rejeitados (
+    seq INTEGER PRIMARY KEY,
+    tabela TEXT NOT NULL,
+    operacao TEXT NOT NULL,
+    dados TEXT,
+    filtros TEXT NOT NULL,
+    erro TEXT,
+    rejeitado_em TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS marcas_replica (
+    chave TEXT PRIMARY KEY,
+    valor TEXT
+);
+"""
+
+# Colunas que referenciam o id de cada tabela (para trocar IDs provisórios)
+REFERENCIAS = {
+    "instrutores": [("alunos", "instrutor_id"), ("acoes", "instrutor_resp_id"), ("logs", "instrutor_id")],
+    "alunos": [("acoes", "aluno_id")],
+    "acoes": [],
+    "logs": [],
+}
+
+# Colunas da restrição única de id_cliente, a chave que torna o reenvio de
+# uma inserção idempotente (migracoes/004_id_cliente.sql). Em logs, que é
+# particionada, a restrição precisa incluir a chave de partição.
+CONFLITO_ID_CLIENTE = {
+    "instrutores": "id_cliente",
+    "alunos": "id_cliente",
+    "acoes": "id_cliente",
+    "logs": "id_cliente,data_hora",
+}
+
+# Colunas calculadas pelos triggers da própria réplica a partir das ações
+# baixadas; o valor do Supabase contaria as mesmas ações duas vezes
+COLUNAS_LOCAIS = {
+    "alunos": {"acoes_pendentes"},
+}
+
+
+class ConsultaReplica(ConsultaSQLite):
+    """
+    Consulta na réplica: leituras no SQLite, escritas no SQLite e no diário
+
+    Os filtros chamados são guardados para serem repetidos no Supabase
+    durante o reenvio do diário.
+    """
+
+    def __init__(self, replica: "ReplicaLocal", tabela: str):
+        super().__init__(replica.cliente, tabela)
+        self.replica = replica
+        self.chamadas: List[Tuple[str, list]] = []
+
+    def eq(self, coluna, valor):
+        self.chamadas.append(("eq", [coluna, valor]))
+        return super().eq(coluna, valor)
+
+    def neq(self, coluna, valor):
+        self.chamadas.append(("neq", [coluna, valor]))
+        return super().neq(coluna, valor)
+
+    def in_(self, coluna, valores):
+        self.chamadas.append(("in_", [coluna, list(valores)]))
+        return super().in_(coluna, valores)
+
+    def execute(self) -> RespostaConsulta:
+        if self.operacao == "select":
+            return super().execute()
+        if self.operacao not in ("insert", "update", "delete"):
+            raise ValueError(f"Operação não suportada na réplica: {self.operacao}")
+        if len(self.chamadas) != len(self.filtros) or self.filtros_embutidos:
+            # Um filtro que não pode ser repetido no Supabase alteraria outros registros
+            raise ValueError("Escritas na réplica aceitam somente os filtros eq, neq e in_")
+
+        with self.cliente.transacao():
+            ids_locais = []
+            if self.operacao == "insert":
+                # IDs provisórios negativos: nunca colidem com os do servidor
+                registros = self.dados if isinstance(self.dados, list) else [self.dados]
+                proximo = self.replica.proximo_id_local(self.tabela)
+                self.dados = []
+                for registro in registros:
+                    self.dados.append({**registro, "id": proximo})
+                    ids_locais.append(proximo)
+                    proximo -= 1
+                # Só o Supabase tem a coluna id_cliente: ela vai apenas para o diário
+                registros_diario = [{**registro, "id_cliente": str(uuid.uuid4())} for registro in registros]
+            else:
+                registros_diario = self.dados
+
+            resposta = super().execute()
+            self.replica.diario.registrar(
+                self.tabela, self.operacao, registros_diario, self.chamadas, ids_locais
+            )
+        return resposta
+
+
+class ClienteReplica:
+    """Cliente com a interface do Supabase usado pelo DatabaseManager no modo réplica"""
+
+    def __init__(self, replica: "ReplicaLocal"):
+        self.replica = replica
+
+    def table(self, nome: str) -> ConsultaReplica:
+        return ConsultaReplica(self.replica, nome)
+
+    def rpc(self, funcao: str, parametros: Optional[Dict[str, Any]] = None):
+        # As funções locais só corrigem dados derivados: não vão para o diário
+        return self.replica.cliente.rpc(funcao, parametros)
+
+
+class DiarioEscritas:
+    """
+    Diário durável das escritas feitas na réplica
+
+    Cada entrada guarda a operação, os dados e os filtros; o reenvio segue
+    a ordem de gravação. Uma entrada só sai do diário depois que o Supabase
+    confirma a escrita, então uma queda no meio do reenvio pode repetir a
+    última entrada, nunca perdê-la. As inserções levam um id_cliente para
+    que a repetição não duplique o registro no servidor.
+    """
+
+    def __init__(self, cliente: ClienteSQLite):
+        self.cliente = cliente
+
+    def registrar(self, tabela: str, operacao: str, dados: Any,
+                  filtros: List[Tuple[str, list]], ids_locais: List[int]):
+        """Grava uma entrada (dentro da transação da escrita local)"""
+        self.cliente.conexao.execute(
+            "INSERT INTO diario_escritas (tabela, operacao, dados, filtros, ids_locais) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [tabela, operacao, json.dumps(dados, ensure_ascii=False),
+             json.dumps(filtros, ensure_ascii=False), json.dumps(ids_locais)]
+        )
+
+    def proxima(self) -> Optional[Dict[str, Any]]:
+        """Primeira entrada ainda não enviada"""
+        with self.cliente.lock:
+            linha = self.cliente.conexao.execute(
+                "SELECT seq, tabela, operacao, dados, filtros, ids_locais "
+                "FROM diario_escritas ORDER BY seq LIMIT 1"
+            ).fetchone()
+        if linha is None:
+            return None
+        seq, tabela, operacao, dados, filtros, ids_locais = linha
+        return {
+            "seq": seq,
+            "tabela": tabela,
+            "operacao": operacao,
+            "dados": json.loads(dados) if dados else None,
+            "filtros": json.loads(filtros),
+            "ids_locais": json.loads(ids_locais),
+        }
+
+    def pendentes(self) -> int:
+        """Quantidade de escritas que ainda não chegaram ao Supabase"""
+        with self.cliente.lock:
+            return self.cliente.conexao.execute("SELECT count(*) FROM diario_escritas").fetchone()[0]
+
+    def remover(self, seq: int):
+        self.cliente.conexao.execute("DELETE FROM diario_escritas WHERE seq = ?", [seq])
+
+    def rejeitar(self, entrada: Dict[str, Any], erro: str):
+        """Move uma entrada recusada pelo servidor para diario_rejeitados"""
+        with self.cliente.transacao():
+            self.cliente.conexao.execute(
+                "INSERT INTO diario_rejeitados (seq, tabela, operacao, dados, filtros, erro) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [entrada["seq"], entrada["tabela"], entrada["operacao"],
+                 json.dumps(entrada["dados"], ensure_ascii=False),
+                 json.dumps(entrada["filtros"], ensure_ascii=False), erro]
+            )
+            self.remover(entrada["seq"])
+
+    def trocar_id(self, tabela: str, id_local: int, id_remoto: int):
+        """Substitui um ID provisório nas entradas que ainda serão enviadas"""
+        colunas_por_tabela = {tabela: {"id"}}
+        for tabela_ref, coluna in REFERENCIAS.get(tabela, []):
+            colunas_por_tabela.setdefault(tabela_ref, set()).add(coluna)
+
+        linhas = self.cliente.conexao.execute(
+            "SELECT seq, tabela, dados, filtros FROM diario_escritas"
+        ).fetchall()
+        for seq, tabela_entrada, dados, filtros in linhas:
+            colunas = colunas_por_tabela.get(tabela_entrada)
+            if not colunas:
+                continue
+            dados, filtros = json.loads(dados) if dados else None, json.loads(filtros)
+
+            registros = dados if isinstance(dados, list) else [dados] if dados else []
+            for registro in registros:
+                for coluna in colunas & registro.keys():
+                    if registro[coluna] == id_local:
+                        registro[coluna] = id_remoto
+            for _, argumentos in filtros:
+                if argumentos[0] in colunas:
+                    if argumentos[1] == id_local:
+                        argumentos[1] = id_remoto
+                    elif isinstance(argumentos[1], list):
+                        argumentos[1] = [id_remoto if v == id_local else v for v in argumentos[1]]
+
+            self.cliente.conexao.execute(
+                "UPDATE diario_escritas SET dados = ?, filtros = ? WHERE seq = ?",
+                [json.dumps(dados, ensure_ascii=False), json.dumps(filtros, ensure_ascii=False), seq]
+            )
+
+
+class ReplicaLocal:
+    """
+    Réplica SQLite com diário de escritas e sincronização periódica
+
+    A sincronização (reenvio do diário e download das alterações) é feita
+    por uma função fornecida pelo DatabaseManager, executada em uma thread
+    a cada intervalo ou quando solicitada.
+    """
+
+    def __init__(self, caminho: str):
+        self.cliente = ClienteSQLite(caminho)
+        with self.cliente.lock:
+            self.cliente.conexao.executescript(ESQUEMA_DIARIO)
+        self.diario = DiarioEscritas(self.cliente)
+        self._evento = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._encerrada = False
+        # Chamada com (tabela, tipo, registro, anterior) para cada registro baixado
+        self.ao_alterar: Optional[Callable[[str, str, Dict[str, Any], Dict[str, Any]], None]] = None
+        # Chamada com (tabela, id_local, id_remoto) a cada ID provisório trocado
+        self.ao_trocar_id: Optional[Callable[[str, int, int], None]] = None
+
+    def cliente_consultas(self) -> ClienteReplica:
+        """Cliente de consultas usado no lugar do cliente Supabase"""
+        return ClienteReplica(self)
+
+    # ============================================
+    # IDS PROVISÓRIOS E DIÁRIO
+    # ============================================
+
+    def proximo_id_local(self, tabela: str) -> int:
+        """Próximo ID provisório (negativo) de uma tabela"""
+        menor = self.cliente.conexao.execute(
+            f'SELECT min(id) FROM "{tabela}"'
+        ).fetchone()[0]
+        return min(menor or 0, 0) - 1
+
+    def enviar_diario(self, remoto) -> bool:
+        """
+        Reenvia as escritas do diário ao Supabase, na ordem em que foram feitas
+
+        Uma escrita recusada pelo servidor (ex.: violação de restrição) é
+        movida para diario_rejeitados para não bloquear as seguintes; um
+        erro de rede interrompe o envio, retomado na próxima sincronização.
+
+        Returns:
+            bool: True se o diário ficou vazio
+        """
+        while True:
+            entrada = self.diario.proxima()
+            if entrada is None:
+                return True
+
+            try:
+                resposta = self._aplicar_remoto(remoto, entrada)
+            except APIError as e:
+                print(f"Escrita recusada pelo servidor (diário #{entrada['seq']}): {e}")
+                self.diario.rejeitar(entrada, str(e))
+                continue
+            except Exception as e:
+                print(f"Sem conexão para reenviar o diário: {e}")
+                return False
+
+            with self.cliente.transacao():
+                self.diario.remover(entrada["seq"])
+                for id_local, registro in zip(entrada["ids_locais"], resposta.data or []):
+                    # Sem ID: o registro já foi excluído no servidor
+                    if registro["id"] is not None:
+                        self.trocar_id(entrada["tabela"], id_local, registro["id"])
+
+    def _aplicar_remoto(self, remoto, entrada: Dict[str, Any]):
+        """Repete uma entrada do diário no cliente Supabase"""
+        tabela = remoto.table(entrada["tabela"])
+        if entrada["operacao"] == "insert":
+            if all("id_cliente" in registro for registro in entrada["dados"]):
+                return self._inserir_remoto(remoto, entrada)
+            # Entrada gravada antes da chave de idempotência
+            consulta = tabela.insert(entrada["dados"])
+        elif entrada["operacao"] == "update":
+            consulta = tabela.update(entrada["dados"])
+        else:
+            consulta = tabela.delete()
+        for metodo, argumentos in entrada["filtros"]:
+            consulta = getattr(consulta, metodo)(*argumentos)
+        return consulta.execute()
+
+    def _inserir_remoto(self, remoto, entrada: Dict[str, Any]) -> RespostaConsulta:
+        """
+        Insere os registros de uma entrada sem duplicar os que já chegaram
+
+        Se a inserção chegou ao servidor mas a resposta se perdeu, o reenvio
+        encontra o id_cliente já gravado: o registro é ignorado e o seu ID é
+        buscado, para que os IDs provisórios sejam trocados do mesmo jeito.
+
+        Returns:
+            RespostaConsulta: Registros com o ID do servidor, na ordem da entrada
+        """
+        tabela, registros = entrada["tabela"], entrada["dados"]
+        inseridos = remoto.table(tabela).upsert(
+            registros, on_conflict=CONFLITO_ID_CLIENTE[tabela], ignore_duplicates=True
+        ).execute().data or []
+        ids = {registro["id_cliente"]: registro["id"] for registro in inseridos}
+
+        faltantes = [registro["id_cliente"] for registro in registros if registro["id_cliente"] not in ids]
+        if faltantes:
+            existentes = remoto.table(tabela).select("id, id_cliente").in_(
+                "id_cliente", faltantes
+            ).execute().data
+            ids.update({registro["id_cliente"]: registro["id"] for registro in existentes})
+        return RespostaConsulta([{"id": ids.get(registro["id_cliente"])} for registro in registros])
+
+    def trocar_id(self, tabela: str, id_local: int, id_remoto: int):
+        """Troca um ID provisório pelo definitivo na réplica e no diário"""
+        conexao = self.cliente.conexao
+        conexao.execute(f'UPDATE "{tabela}" SET id = ? WHERE id = ?', [id_remoto, id_local])
+        for tabela_ref, coluna in REFERENCIAS.get(tabela, []):
+            conexao.execute(
+                f'UPDATE "{tabela_ref}" SET "{coluna}" = ? WHERE "{coluna}" = ?',
+                [id_remoto, id_local]
+            )
+        if tabela == "alunos":
+            # Para a sincronização incremental, o ID provisório deixa de existir
+            conexao.execute(
+                "INSERT INTO registros_excluidos (tabela, registro_id, unidade_id) "
+                "SELECT 'alunos', ?, unidade_id FROM alunos WHERE id = ?",
+                [id_local, id_remoto]
+            )
+        self.diario.trocar_id(tabela, id_local, id_remoto)
+        if self.ao_trocar_id:
+            self.ao_trocar_id(tabela, id_local, id_remoto)
+
+    def ids_pendentes(self, tabela: str) -> set:
+        """IDs de uma tabela com escritas ainda não enviadas (não podem ser sobrescritos)"""
+        ids = set()
+        with self.cliente.lock:
+            linhas = self.cliente.conexao.execute(
+                "SELECT filtros, ids_locais FROM diario_escritas WHERE tabela = ?", [tabela]
+            ).fetchall()
+        for filtros, ids_locais in linhas:
+            ids.update(json.loads(ids_locais))
+            for metodo, argumentos in json.loads(filtros):
+                if argumentos[0] == "id":
+                    ids.update(argumentos[1] if metodo == "in_" else [argumentos[1]])
+        return ids
+
+    # ============================================
+    # DADOS RECEBIDOS DO SUPABASE
+    # ============================================
+
+    def gravar_remotos(self, tabela: str, registros: List[Dict[str, Any]]) -> int:
+        """
+        Grava na réplica os registros baixados do Supabase
+
+        O atualizado_em local recebe o instante da gravação, para que a
+        sincronização incremental da tela principal (que lê a réplica)
+        perceba a mudança. Registros com escritas pendentes no diário são
+        ignorados até que o diário seja enviado. As colunas de
+        COLUNAS_LOCAIS não são copiadas.
+
+        Returns:
+            int: Quantidade de registros gravados
+        """
+        if not registros:
+            return 0
+
+        pendentes = self.ids_pendentes(tabela)
+        nomes = self.cliente.colunas_da_tabela(tabela)
+        colunas = set(nomes) - COLUNAS_LOCAIS.get(tabela, set())
+        gravados = []
+        with self.cliente.transacao():
+            agora = self.cliente.agora()
+            for registro in registros:
+                if registro["id"] in pendentes:
+                    continue
+                linha = {c: v for c, v in registro.items() if c in colunas}
+
+                # A margem da marca d'água repete registros: ignorar os que não mudaram
+                atual = self.cliente.conexao.execute(
+                    f'SELECT * FROM "{tabela}" WHERE id = ?', [registro["id"]]
+                ).fetchone()
+                if atual is not None and all(
+                    valor_sqlite(v) == atual[nomes.index(c)]
+                    for c, v in linha.items() if c != "atualizado_em"
+                ):
+                    continue
+
+                if "atualizado_em" in colunas:
+                    linha["atualizado_em"] = agora
+                self.cliente.table(tabela).upsert(linha).execute()
+                gravados.append(("INSERT" if atual is None else "UPDATE", linha))
+
+        if self.ao_alterar:
+            for tipo, linha in gravados:
+                self.ao_alterar(tabela, tipo, linha, {})
+        return len(gravados)
+
+    def remover_remotos(self, tabela: str, ids: List[int]) -> int:
+        """Remove da réplica os registros excluídos no Supabase"""
+        if not ids:
+            return 0
+        with self.cliente.transacao():
+            removidos = self.cliente.table(tabela).delete().in_("id", ids).execute().data
+
+        if self.ao_alterar:
+            for registro in removidos:
+                self.ao_alterar(tabela, "DELETE", {}, registro)
+        return len(removidos)
+
+    def obter_marca(self, chave: str) -> Optional[str]:
+        """Marca d'água de uma sincronização (ex.: 'alunos:1')"""
+        with self.cliente.lock:
+            linha = self.cliente.conexao.execute(
+                "SELECT valor FROM marcas_replica WHERE chave = ?", [chave]
+            ).fetchone()
+        return linha[0] if linha else None
+
+    def definir_marca(self, chave: str, valor: Optional[str]):
+        if valor is None:
+            return
+        with self.cliente.transacao():
+            self.cliente.conexao.execute(
+                "INSERT INTO marcas_replica (chave, valor) VALUES (?, ?) "
+                "ON CONFLICT(chave) DO UPDATE SET valor = excluded.valor",
+                [chave, str(valor)]
+            )
+
+    def unidades_acompanhadas(self) -> List[int]:
+        """Unidades cujos alunos, ações e logs são mantidos na réplica"""
+        valor = self.obter_marca("unidades_acompanhadas")
+        return json.loads(valor) if valor else []
+
+    def acompanhar_unidade(self, unidade_id: int):
+        unidades = self.unidades_acompanhadas()
+        if unidade_id not in unidades:
+            self.definir_marca("unidades_acompanhadas", json.dumps(unidades + [unidade_id]))
+
+    # ============================================
+    # SINCRONIZAÇÃO PERIÓDICA
+    # ============================================
+
+    def iniciar(self, sincronizar: Callable[[], Any], intervalo: float):
+        """Executa sincronizar() em segundo plano a cada intervalo (segundos)"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._executar, args=(sincronizar, intervalo),
+            name="ReplicaLocal", daemon=True
+        )
+        self._thread.start()
+
+    def solicitar_sincronizacao(self):
+        """Antecipa a próxima sincronização"""
+        self._evento.set()
+
+    def encerrar(self):
+        self._encerrada = True
+        self._evento.set()
+
+    def _executar(self, sincronizar: Callable[[], Any], intervalo: float):
+        while not self._encerrada:
+            try:
+                sincronizar()
+            except Exception as e:
+                print(f"Erro ao sincronizar a réplica local: {e}")
+            self._evento.wait(intervalo)
+            self._evento.clear()
@@ -3,6 +3,9 @@
 -- ============================================
 -- Este script deve ser executado no SQL Editor do Supabase
 -- para criar todas as tabelas necessárias para o sistema.
+-- Pode ser executado de novo sobre um banco existente. Para atualizar um
+-- banco criado com uma versão anterior, execute as migrações de
+-- migracoes/ em ordem.
 
 -- ============================================
 -- 1. TABELA DE UNIDADES
@@ -31,9 +34,8 @@ CREATE TABLE IF NOT EXISTS instrutores (
     atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
--- Índice para busca rápida por unidade
-CREATE INDEX IF NOT EXISTS idx_instrutores_unidade ON instrutores(unidade_id);
-CREATE INDEX IF NOT EXISTS idx_instrutores_ativo ON instrutores(ativo);
+-- Instrutores da unidade ordenados por nome (ver migracoes/001_indices_consultas.sql)
+CREATE INDEX IF NOT EXISTS idx_instrutores_unidade_nome ON instrutores(unidade_id, nome, id);
 
 -- ============================================
 -- 3. TABELA DE ALUNOS
@@ -53,16 +55,109 @@ CREATE TABLE IF NOT EXISTS alunos (
     instrutor_id INTEGER REFERENCES instrutores(id) ON DELETE SET NULL,
     unidade_id INTEGER NOT NULL REFERENCES unidades(id) ON DELETE CASCADE,
     arquivado BOOLEAN DEFAULT FALSE,
+    -- Ações com status 'Pendente', mantida pelos triggers de acoes (seção 6.3)
+    acoes_pendentes INTEGER NOT NULL DEFAULT 0,
     criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Bancos criados antes da coluna acoes_pendentes (preenchida na seção 6.3)
+ALTER TABLE alunos ADD COLUMN IF NOT EXISTS acoes_pendentes INTEGER NOT NULL DEFAULT 0;
+
 -- Índices para otimização de consultas
-CREATE INDEX IF NOT EXISTS idx_alunos_unidade ON alunos(unidade_id);
 CREATE INDEX IF NOT EXISTS idx_alunos_instrutor ON alunos(instrutor_id);
-CREATE INDEX IF NOT EXISTS idx_alunos_arquivado ON alunos(arquivado);
 CREATE INDEX IF NOT EXISTS idx_alunos_situacao ON alunos(situacao_academica);
 
+-- Lista da tela principal: alunos ativos da unidade na ordem (nome, id)
+-- da paginação, sem os arquivados
+CREATE INDEX IF NOT EXISTS idx_alunos_ativos ON alunos(unidade_id, nome, id)
+    WHERE arquivado = FALSE;
+
+-- Lista com ativos e arquivados juntos
+CREATE INDEX IF NOT EXISTS idx_alunos_unidade_nome ON alunos(unidade_id, nome, id);
+
+-- Índice parcial para a lista de arquivados: cobre somente as linhas
+-- arquivadas, então a consulta não depende do número de alunos ativos
+CREATE INDEX IF NOT EXISTS idx_alunos_arquivados ON alunos(unidade_id, nome, id)
+    WHERE arquivado = TRUE;
+
+-- Índice para a sincronização incremental (alterações desde uma marca d'água)
+CREATE INDEX IF NOT EXISTS idx_alunos_unidade_atualizado ON alunos(unidade_id, atualizado_em, id);
+
+-- Coluna calculada com o início das observações (até 50 caracteres).
+-- O PostgREST expõe a função como a coluna "observacoes_resumo" de alunos,
+-- usada pela lista da tela principal para não baixar o texto completo.
+CREATE OR REPLACE FUNCTION observacoes_resumo(alunos)
+RETURNS TEXT AS $$
+    SELECT CASE
+        WHEN length($1.observacoes) > 50 THEN left($1.observacoes, 47) || '...'
+        ELSE $1.observacoes
+    END;
+$$ LANGUAGE sql STABLE;
+
+-- Busca de alunos por nome, curso e observações (buscar_alunos no aplicativo).
+-- O texto é normalizado (minúsculas, sem acentos) e indexado por trigramas:
+-- o índice GIN atende tanto o trecho digitado (LIKE '%termo%') quanto a
+-- busca aproximada com erros de digitação (operador <% do pg_trgm).
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE OR REPLACE FUNCTION normalizar_busca(p_texto TEXT)
+RETURNS TEXT AS $$
+    SELECT translate(lower(coalesce(p_texto, '')),
+                     'áàâãäéèêëíìîïóòôõöúùûüçñ',
+                     'aaaaaeeeeiiiiooooouuuucn');
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+CREATE OR REPLACE FUNCTION texto_busca_aluno(p_nome TEXT, p_curso TEXT, p_observacoes TEXT)
+RETURNS TEXT AS $$
+    SELECT normalizar_busca(p_nome || ' ' || coalesce(p_curso, '') || ' ' || coalesce(p_observacoes, ''));
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+CREATE INDEX IF NOT EXISTS idx_alunos_busca
+    ON alunos USING GIN (texto_busca_aluno(nome, curso_matriculado, observacoes) gin_trgm_ops);
+
+-- Página de resultados de uma busca, da maior para a menor relevância.
+-- Trecho no início do nome vale mais que no meio do nome, que vale mais
+-- que em outro campo; a semelhança por trigramas desempata e classifica
+-- os resultados aproximados. Retorna só os ids: o aplicativo busca as
+-- colunas da lista em seguida (mesmo perfil da tela principal).
+CREATE OR REPLACE FUNCTION buscar_alunos(
+    p_unidade_id INTEGER,
+    p_termo TEXT,
+    p_incluir_arquivados BOOLEAN DEFAULT FALSE,
+    p_limite INTEGER DEFAULT 50,
+    p_deslocamento INTEGER DEFAULT 0
+)
+RETURNS TABLE (aluno_id INTEGER, relevancia REAL) AS $$
+DECLARE
+    termo TEXT := normalizar_busca(trim(p_termo));
+    -- Curingas digitados (% e _) são procurados literalmente
+    padrao TEXT := '%' || replace(replace(replace(termo, '\', '\\'), '%', '\%'), '_', '\_') || '%';
+BEGIN
+    IF termo = '' THEN
+        RETURN;
+    END IF;
+
+    RETURN QUERY
+    SELECT a.id,
+           (CASE
+                WHEN normalizar_busca(a.nome) LIKE ltrim(padrao, '%') THEN 2
+                WHEN normalizar_busca(a.nome) LIKE padrao THEN 1
+                ELSE 0
+            END
+            + word_similarity(termo, normalizar_busca(a.nome))
+            + word_similarity(termo, texto_busca_aluno(a.nome, a.curso_matriculado, a.observacoes))
+           )::REAL
+    FROM alunos a
+    WHERE a.unidade_id = p_unidade_id
+      AND (p_incluir_arquivados OR a.arquivado = FALSE)
+      AND (texto_busca_aluno(a.nome, a.curso_matriculado, a.observacoes) LIKE padrao
+           OR termo <% texto_busca_aluno(a.nome, a.curso_matriculado, a.observacoes))
+    ORDER BY 2 DESC, a.nome, a.id
+    LIMIT p_limite OFFSET p_deslocamento;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
 -- ============================================
 -- 4. TABELA DE AÇÕES
 -- ============================================
@@ -79,26 +174,167 @@ CREATE TABLE IF NOT EXISTS acoes (
 );
 
 -- Índices para busca rápida
-CREATE INDEX IF NOT EXISTS idx_acoes_aluno ON acoes(aluno_id);
-CREATE INDEX IF NOT EXISTS idx_acoes_status ON acoes(status);
 CREATE INDEX IF NOT EXISTS idx_acoes_instrutor ON acoes(instrutor_resp_id);
 
+-- Ações de um aluno, das mais recentes para as mais antigas
+CREATE INDEX IF NOT EXISTS idx_acoes_aluno_data ON acoes(aluno_id, data_proposta DESC, id DESC);
+
+-- Ações pendentes de um aluno (contador acoes_pendentes e reconciliação)
+CREATE INDEX IF NOT EXISTS idx_acoes_pendentes ON acoes(aluno_id)
+    WHERE status = 'Pendente';
+
+-- Download incremental das ações para a réplica local
+CREATE INDEX IF NOT EXISTS idx_acoes_atualizado ON acoes(atualizado_em, id);
+
 -- ============================================
 -- 5. TABELA DE LOGS
 -- ============================================
+-- Particionada por mês (data_hora): a listagem lê só as partições mais
+-- recentes e a retenção (seção 5.1) remove um mês inteiro com DROP TABLE,
+-- sem DELETE linha a linha. A chave primária precisa incluir data_hora.
 CREATE TABLE IF NOT EXISTS logs (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
     instrutor_id INTEGER REFERENCES instrutores(id) ON DELETE SET NULL,
     atividade TEXT NOT NULL,
-    data_hora TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    unidade_id INTEGER REFERENCES unidades(id) ON DELETE CASCADE
-);
+    data_hora TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    unidade_id INTEGER REFERENCES unidades(id) ON DELETE CASCADE,
+    PRIMARY KEY (id, data_hora)
+) PARTITION BY RANGE (data_hora);
 
--- Índice para busca por data e unidade
+-- Índices criados na tabela particionada valem para todas as partições
 CREATE INDEX IF NOT EXISTS idx_logs_data ON logs(data_hora DESC);
-CREATE INDEX IF NOT EXISTS idx_logs_unidade ON logs(unidade_id);
 CREATE INDEX IF NOT EXISTS idx_logs_instrutor ON logs(instrutor_id);
 
+-- Logs da unidade, do mais recente para o mais antigo
+CREATE INDEX IF NOT EXISTS idx_logs_unidade_data ON logs(unidade_id, data_hora DESC, id DESC);
+
+-- Logs novos de uma unidade para a réplica local (id > último baixado)
+CREATE INDEX IF NOT EXISTS idx_logs_unidade_id ON logs(unidade_id, id);
+
+-- Cria as partições mensais de p_inicio até p_meses_a_frente meses depois
+-- do mês atual. Logs do período que estavam na partição padrão são movidos
+-- para a nova partição. Retorna a quantidade de partições criadas.
+CREATE OR REPLACE FUNCTION criar_particoes_logs(
+    p_inicio DATE DEFAULT CURRENT_DATE,
+    p_meses_a_frente INTEGER DEFAULT 3
+)
+RETURNS INTEGER AS $$
+DECLARE
+    mes DATE := date_trunc('month', p_inicio)::DATE;
+    ultimo DATE := (date_trunc('month', CURRENT_DATE) + make_interval(months => p_meses_a_frente))::DATE;
+    proximo DATE;
+    particao TEXT;
+    criadas INTEGER := 0;
+BEGIN
+    WHILE mes <= ultimo LOOP
+        proximo := (mes + INTERVAL '1 month')::DATE;
+        particao := 'logs_' || to_char(mes, 'YYYY_MM');
+        IF to_regclass(particao) IS NULL THEN
+            EXECUTE format('CREATE TABLE %I (LIKE logs INCLUDING DEFAULTS)', particao);
+            EXECUTE format(
+                'WITH movidos AS (DELETE FROM logs_padrao WHERE data_hora >= %L AND data_hora < %L RETURNING *) '
+                'INSERT INTO %I SELECT * FROM movidos',
+                mes, proximo, particao
+            );
+            EXECUTE format(
+                'ALTER TABLE logs ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                particao, mes, proximo
+            );
+            criadas := criadas + 1;
+        END IF;
+        mes := proximo;
+    END LOOP;
+    RETURN criadas;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Partição padrão, que recebe os logs fora das partições mensais (ex.:
+-- relógio errado), e partições dos próximos meses. Um banco com a tabela
+-- logs antiga (não particionada) precisa antes da migração 002.
+DO $$
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'logs'::regclass) = 'p' THEN
+        CREATE TABLE IF NOT EXISTS logs_padrao PARTITION OF logs DEFAULT;
+        PERFORM criar_particoes_logs();
+    ELSE
+        RAISE NOTICE 'logs não é particionada: execute migracoes/002_logs_particionados.sql';
+    END IF;
+END;
+$$;
+
+-- ============================================
+-- 5.1. RETENÇÃO E RESUMO DIÁRIO DOS LOGS
+-- ============================================
+-- Os logs detalhados ficam p_meses_retidos meses (além do mês atual). Antes
+-- de remover as partições mais antigas, reter_logs soma as atividades de
+-- cada dia por unidade e instrutor em logs_resumo_diario, que o histórico
+-- do aplicativo exibe para os períodos sem logs detalhados. O nome do
+-- instrutor é copiado: o resumo continua legível se ele for excluído.
+CREATE TABLE IF NOT EXISTS logs_resumo_diario (
+    id SERIAL PRIMARY KEY,
+    dia DATE NOT NULL,
+    unidade_id INTEGER REFERENCES unidades(id) ON DELETE CASCADE,
+    instrutor_id INTEGER,
+    instrutor_nome VARCHAR(255),
+    quantidade INTEGER NOT NULL,
+    primeira_atividade TIMESTAMP,
+    ultima_atividade TIMESTAMP,
+    -- Logs do sistema (sem instrutor) também têm um único resumo por dia
+    UNIQUE NULLS NOT DISTINCT (dia, unidade_id, instrutor_id)
+);
+
+-- Resumos da unidade, do dia mais recente para o mais antigo
+CREATE INDEX IF NOT EXISTS idx_logs_resumo_unidade_dia
+    ON logs_resumo_diario(unidade_id, dia DESC, id DESC);
+
+-- Resume e remove os logs anteriores ao período retido e cria as partições
+-- dos próximos meses. Retorna a quantidade de logs resumidos.
+CREATE OR REPLACE FUNCTION reter_logs(p_meses_retidos INTEGER DEFAULT 12)
+RETURNS INTEGER AS $$
+DECLARE
+    limite DATE := (date_trunc('month', CURRENT_DATE) - make_interval(months => p_meses_retidos))::DATE;
+    particao RECORD;
+    resumidos INTEGER;
+BEGIN
+    SELECT COUNT(*) INTO resumidos FROM logs WHERE data_hora < limite;
+
+    INSERT INTO logs_resumo_diario (
+        dia, unidade_id, instrutor_id, instrutor_nome, quantidade,
+        primeira_atividade, ultima_atividade
+    )
+    SELECT l.data_hora::DATE, l.unidade_id, l.instrutor_id, MAX(i.nome), COUNT(*),
+           MIN(l.data_hora), MAX(l.data_hora)
+    FROM logs l
+    LEFT JOIN instrutores i ON i.id = l.instrutor_id
+    WHERE l.data_hora < limite
+    GROUP BY l.data_hora::DATE, l.unidade_id, l.instrutor_id
+    ON CONFLICT (dia, unidade_id, instrutor_id) DO UPDATE SET
+        instrutor_nome = COALESCE(EXCLUDED.instrutor_nome, logs_resumo_diario.instrutor_nome),
+        quantidade = logs_resumo_diario.quantidade + EXCLUDED.quantidade,
+        primeira_atividade = LEAST(logs_resumo_diario.primeira_atividade, EXCLUDED.primeira_atividade),
+        ultima_atividade = GREATEST(logs_resumo_diario.ultima_atividade, EXCLUDED.ultima_atividade);
+
+    -- Partições mensais inteiramente anteriores ao limite
+    FOR particao IN
+        SELECT c.relname
+        FROM pg_inherits h
+        JOIN pg_class c ON c.oid = h.inhrelid
+        WHERE h.inhparent = 'logs'::regclass
+          AND c.relname ~ '^logs_[0-9]{4}_[0-9]{2}$'
+          AND to_date(substring(c.relname FROM 6), 'YYYY_MM') < limite
+    LOOP
+        EXECUTE format('DROP TABLE %I', particao.relname);
+    END LOOP;
+    DELETE FROM logs_padrao WHERE data_hora < limite;
+
+    PERFORM criar_particoes_logs();
+    RETURN resumidos;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Para executar todo dia 1º com a extensão pg_cron (opcional):
+-- SELECT cron.schedule('reter-logs', '0 4 1 * *', 'SELECT reter_logs(12)');
+
 -- ============================================
 -- 6. TRIGGERS PARA ATUALIZAR TIMESTAMP
 -- ============================================
@@ -113,23 +349,189 @@ END;
 $$ LANGUAGE plpgsql;
 
 -- Trigger para instrutores
+DROP TRIGGER IF EXISTS trigger_atualizar_instrutores ON instrutores;
 CREATE TRIGGER trigger_atualizar_instrutores
     BEFORE UPDATE ON instrutores
     FOR EACH ROW
     EXECUTE FUNCTION atualizar_timestamp();
 
 -- Trigger para alunos
+DROP TRIGGER IF EXISTS trigger_atualizar_alunos ON alunos;
 CREATE TRIGGER trigger_atualizar_alunos
     BEFORE UPDATE ON alunos
     FOR EACH ROW
     EXECUTE FUNCTION atualizar_timestamp();
 
 -- Trigger para ações
+DROP TRIGGER IF EXISTS trigger_atualizar_acoes ON acoes;
 CREATE TRIGGER trigger_atualizar_acoes
     BEFORE UPDATE ON acoes
     FOR EACH ROW
     EXECUTE FUNCTION atualizar_timestamp();
 
+-- ============================================
+-- 6.1. SINCRONIZAÇÃO INCREMENTAL
+-- ============================================
+-- O aplicativo busca somente os alunos com atualizado_em a partir da
+-- última sincronização. Exclusões ficam registradas em registros_excluidos
+-- e mudanças nas ações atualizam o atualizado_em do aluno, já que a lista
+-- exibe a contagem de ações pendentes.
+
+CREATE TABLE IF NOT EXISTS registros_excluidos (
+    id SERIAL PRIMARY KEY,
+    tabela VARCHAR(50) NOT NULL,
+    registro_id INTEGER NOT NULL,
+    unidade_id INTEGER,
+    excluido_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_registros_excluidos_busca
+    ON registros_excluidos(tabela, unidade_id, excluido_em, id);
+
+-- Registra a exclusão de um aluno
+CREATE OR REPLACE FUNCTION registrar_exclusao_aluno()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO registros_excluidos (tabela, registro_id, unidade_id)
+    VALUES ('alunos', OLD.id, OLD.unidade_id);
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_exclusao_alunos ON alunos;
+CREATE TRIGGER trigger_exclusao_alunos
+    AFTER DELETE ON alunos
+    FOR EACH ROW
+    EXECUTE FUNCTION registrar_exclusao_aluno();
+
+-- Atualiza o atualizado_em do aluno quando suas ações mudam e mantém o
+-- contador acoes_pendentes (seção 6.3) com uma única atualização por aluno
+CREATE OR REPLACE FUNCTION tocar_aluno_da_acao()
+RETURNS TRIGGER AS $$
+DECLARE
+    pendente_antes INTEGER := 0;
+    pendente_depois INTEGER := 0;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        pendente_antes := (OLD.status = 'Pendente')::INTEGER;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        pendente_depois := (NEW.status = 'Pendente')::INTEGER;
+    END IF;
+
+    IF TG_OP = 'UPDATE' AND OLD.aluno_id = NEW.aluno_id THEN
+        UPDATE alunos SET atualizado_em = CURRENT_TIMESTAMP,
+            acoes_pendentes = acoes_pendentes + pendente_depois - pendente_antes
+        WHERE id = NEW.aluno_id;
+        RETURN NULL;
+    END IF;
+
+    -- Exclusão, inserção ou ação transferida para outro aluno
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE alunos SET atualizado_em = CURRENT_TIMESTAMP,
+            acoes_pendentes = acoes_pendentes - pendente_antes
+        WHERE id = OLD.aluno_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE alunos SET atualizado_em = CURRENT_TIMESTAMP,
+            acoes_pendentes = acoes_pendentes + pendente_depois
+        WHERE id = NEW.aluno_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_tocar_aluno_acoes ON acoes;
+CREATE TRIGGER trigger_tocar_aluno_acoes
+    AFTER INSERT OR UPDATE OR DELETE ON acoes
+    FOR EACH ROW
+    EXECUTE FUNCTION tocar_aluno_da_acao();
+
+-- ============================================
+-- 6.2. ALTERAÇÕES EM TEMPO REAL
+-- ============================================
+-- Publica as alterações de alunos e acoes no Supabase Realtime (cada
+-- tabela só é adicionada se ainda não estiver na publicação: ADD TABLE
+-- falharia ao executar o script de novo).
+-- REPLICA IDENTITY FULL envia a linha anterior completa em UPDATE/DELETE
+-- (a tela principal precisa do aluno_id de uma ação excluída).
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_publication_tables
+        WHERE pubname = 'supabase_realtime' AND schemaname = 'public' AND tablename = 'alunos'
+    ) THEN
+        ALTER PUBLICATION supabase_realtime ADD TABLE alunos;
+    END IF;
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_publication_tables
+        WHERE pubname = 'supabase_realtime' AND schemaname = 'public' AND tablename = 'acoes'
+    ) THEN
+        ALTER PUBLICATION supabase_realtime ADD TABLE acoes;
+    END IF;
+END;
+$$;
+ALTER TABLE acoes REPLICA IDENTITY FULL;
+
+-- ============================================
+-- 6.3. CONTADOR DE AÇÕES PENDENTES
+-- ============================================
+-- alunos.acoes_pendentes é mantida por tocar_aluno_da_acao (seção 6.1), então
+-- a lista de alunos com a urgência é uma leitura simples da tabela, sem
+-- contar as ações de cada aluno. Um trigger desativado, uma carga feita com
+-- session_replication_role = replica ou uma edição manual podem deixar o
+-- contador errado: a função abaixo recalcula os contadores e corrige só os
+-- que divergem (o atualizado_em dos corrigidos muda, então os aplicativos
+-- recebem o valor certo na próxima sincronização).
+
+CREATE OR REPLACE FUNCTION reconciliar_acoes_pendentes(p_unidade_id INTEGER DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+    corrigidos INTEGER;
+BEGIN
+    WITH contagens AS (
+        SELECT a.id, COUNT(ac.id) AS pendentes
+        FROM alunos a
+        LEFT JOIN acoes ac ON ac.aluno_id = a.id AND ac.status = 'Pendente'
+        WHERE p_unidade_id IS NULL OR a.unidade_id = p_unidade_id
+        GROUP BY a.id
+    )
+    UPDATE alunos SET acoes_pendentes = contagens.pendentes
+    FROM contagens
+    WHERE alunos.id = contagens.id
+      AND alunos.acoes_pendentes <> contagens.pendentes;
+
+    GET DIAGNOSTICS corrigidos = ROW_COUNT;
+    RETURN corrigidos;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Preenche os contadores de um banco criado antes da coluna
+SELECT reconciliar_acoes_pendentes();
+
+-- Para reconciliar toda madrugada com a extensão pg_cron (opcional):
+-- SELECT cron.schedule('reconciliar-acoes-pendentes', '30 3 * * *',
+--     'SELECT reconciliar_acoes_pendentes()');
+
+-- ============================================
+-- 6.4. REENVIO IDEMPOTENTE DA RÉPLICA LOCAL
+-- ============================================
+-- Inserções reenviadas pela réplica local (modo offline) levam um
+-- id_cliente gerado no computador que as fez. Se a resposta de uma
+-- inserção se perder, o reenvio encontra a chave já gravada e não duplica
+-- o registro (upsert com ignore_duplicates em replica_local.py). Registros
+-- inseridos fora da réplica ficam com id_cliente nulo.
+ALTER TABLE instrutores ADD COLUMN IF NOT EXISTS id_cliente UUID;
+ALTER TABLE alunos ADD COLUMN IF NOT EXISTS id_cliente UUID;
+ALTER TABLE acoes ADD COLUMN IF NOT EXISTS id_cliente UUID;
+ALTER TABLE logs ADD COLUMN IF NOT EXISTS id_cliente UUID;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_instrutores_id_cliente ON instrutores(id_cliente);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_alunos_id_cliente ON alunos(id_cliente);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_acoes_id_cliente ON acoes(id_cliente);
+-- Em uma tabela particionada, a restrição única inclui a chave de partição
+CREATE UNIQUE INDEX IF NOT EXISTS idx_logs_id_cliente ON logs(id_cliente, data_hora);
+
 -- ============================================
 -- 7. VIEWS ÚTEIS (OPCIONAL)
 -- ============================================
@@ -152,7 +554,7 @@ SELECT
     u.nome AS unidade_nome,
     a.criado_em,
     a.atualizado_em,
-    (SELECT COUNT(*) FROM acoes WHERE aluno_id = a.id AND status = 'Pendente') AS acoes_pendentes
+    a.acoes_pendentes
 FROM alunos a
 LEFT JOIN instrutores i ON a.instrutor_id = i.id
 LEFT JOIN unidades u ON a.unidade_id = u.id
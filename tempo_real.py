@@ -0,0 +1,132 @@
+"""
+Alterações em Tempo Real
+Fontes de eventos de inserção, alteração e exclusão nas tabelas, para que
+as telas atualizem só as linhas afetadas em vez de recarregar as listas
+"""
+
+from typing import Optional, List, Dict, Any, Callable, NamedTuple
+import asyncio
+import threading
+
+
+class EventoAlteracao(NamedTuple):
+    """Uma alteração em uma linha de uma tabela"""
+
+    tabela: str
+    # "INSERT", "UPDATE" ou "DELETE"
+    tipo: str
+    # Linha depois da alteração (vazia em DELETE)
+    registro: Dict[str, Any]
+    # Linha antes da alteração (pode trazer só a chave primária, conforme o REPLICA IDENTITY)
+    anterior: Dict[str, Any]
+
+    @property
+    def registro_id(self) -> Optional[int]:
+        return self.registro.get('id', self.anterior.get('id'))
+
+    def valor(self, coluna: str) -> Any:
+        """Valor de uma coluna na linha nova ou, se ausente, na anterior"""
+        if coluna in self.registro:
+            return self.registro[coluna]
+        return self.anterior.get(coluna)
+
+
+class FonteAlteracoes:
+    """
+    Fonte de eventos de alteração (interface)
+
+    iniciar() recebe a função chamada a cada evento; ela pode ser chamada
+    de qualquer thread.
+    """
+
+    def iniciar(self, ao_receber: Callable[[EventoAlteracao], None]):
+        raise NotImplementedError
+
+    def encerrar(self):
+        pass
+
+
+class FonteLocal(FonteAlteracoes):
+    """
+    Fonte de eventos dentro do próprio processo
+
+    Usada pela réplica local (publica o que foi baixado do Supabase) e
+    como substituta do Supabase Realtime em testes e medições.
+    """
+
+    def __init__(self):
+        self._ao_receber: Optional[Callable[[EventoAlteracao], None]] = None
+
+    def iniciar(self, ao_receber: Callable[[EventoAlteracao], None]):
+        self._ao_receber = ao_receber
+
+    def encerrar(self):
+        self._ao_receber = None
+
+    def publicar(self, tabela: str, tipo: str, registro: Optional[Dict[str, Any]] = None,
+                 anterior: Optional[Dict[str, Any]] = None):
+        """Entrega um evento imediatamente, na thread de quem publica"""
+        if self._ao_receber:
+            self._ao_receber(EventoAlteracao(tabela, tipo, registro or {}, anterior or {}))
+
+
+class FonteSupabaseRealtime(FonteAlteracoes):
+    """
+    Eventos do Supabase Realtime (postgres_changes)
+
+    O cliente Realtime do supabase-py é assíncrono, então roda em um laço
+    asyncio em uma thread própria. As tabelas precisam estar na publicação
+    supabase_realtime (ver schema.sql).
+    """
+
+    def __init__(self, url: str, chave: str, tabelas: List[str]):
+        self.url = url
+        self.chave = chave
+        self.tabelas = tabelas
+        self._ao_receber: Optional[Callable[[EventoAlteracao], None]] = None
+        self._thread: Optional[threading.Thread] = None
+        self._laco: Optional[asyncio.AbstractEventLoop] = None
+        self._encerrada = False
+
+    def iniciar(self, ao_receber: Callable[[EventoAlteracao], None]):
+        self._ao_receber = ao_receber
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._executar, name="SupabaseRealtime", daemon=True)
+            self._thread.start()
+
+    def encerrar(self):
+        self._encerrada = True
+
+    def _executar(self):
+        self._laco = asyncio.new_event_loop()
+        try:
+            self._laco.run_until_complete(self._escutar())
+        except Exception as e:
+            print(f"Erro na conexão de tempo real: {e}")
+        finally:
+            self._laco.close()
+
+    async def _escutar(self):
+        from supabase import acreate_client
+
+        cliente = await acreate_client(self.url, self.chave)
+        canal = cliente.channel("alteracoes")
+        for tabela in self.tabelas:
+            canal.on_postgres_changes("*", schema="public", table=tabela, callback=self._ao_receber_payload)
+        await canal.subscribe()
+
+        while not self._encerrada:
+            await asyncio.sleep(1)
+        await cliente.remove_all_channels()
+
+    def _ao_receber_payload(self, payload: Dict[str, Any]):
+        """Converte o payload do Realtime em EventoAlteracao"""
+        dados = payload.get('data', payload)
+        evento = EventoAlteracao(
+            dados.get('table', ''),
+            dados.get('type') or dados.get('eventType', ''),
+            dados.get('record') or dados.get('new') or {},
+            dados.get('old_record') or dados.get('old') or {}
+        )
+        if self._ao_receber and evento.tabela:
+            self._ao_receber(evento)
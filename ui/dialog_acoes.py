@@ -10,6 +10,10 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Qt
 from database import db
+from fila_logs import fila_logs
+from rastreio_requisicoes import rastreador
+from ui.escritas import escritas
+from ui.executor import executor
 from ui.styles import aplicar_classe_botao, aplicar_classe_label
 from utils.formatters import formatar_data_br
 
@@ -17,6 +21,7 @@ from utils.formatters import formatar_data_br
 class DialogAcoes(QDialog):
     """Dialog para gerenciar ações de um aluno"""
     
+    @rastreador.medir_acao("abrir_acoes")
     def __init__(self, aluno_id: int, aluno_nome: str, instrutor_id: int, unidade_id: int, parent=None):
         super().__init__(parent)
         self.aluno_id = aluno_id
@@ -24,6 +29,9 @@ class DialogAcoes(QDialog):
         self.instrutor_id = instrutor_id
         self.unidade_id = unidade_id
         self.acoes = []
+        # Cópia do que a tabela desenhou: as ações do armazém mudam no lugar
+        self._acoes_exibidas = []
+        self._tarefa_acoes = None
         
         self.init_ui()
         self.carregar_acoes()
@@ -112,8 +120,34 @@ class DialogAcoes(QDialog):
         self.setLayout(layout)
         
     def carregar_acoes(self):
-        """Carrega as ações do aluno"""
-        self.acoes = db.listar_acoes(self.aluno_id)
+        """Solicita as ações do aluno em segundo plano"""
+        if self._tarefa_acoes:
+            self._tarefa_acoes.cancelar()
+        
+        encontrado, acoes = db.acoes_pre_carregadas(self.aluno_id)
+        if encontrado:
+            # Lidas ao selecionar a linha: exibe na hora e confere em segundo plano
+            self.exibir_acoes(acoes)
+        else:
+            self.label_status.setText("Carregando ações...")
+        self._tarefa_acoes = executor.executar(
+            db.consultar,
+            db.listar_acoes,
+            self.aluno_id,
+            ao_concluir=self.revalidar_acoes if encontrado else self.exibir_acoes,
+            ao_falhar=self.exibir_erro_carregamento,
+            dono=self
+        )
+        
+    def exibir_acoes(self, acoes: list):
+        """Preenche a tabela com as ações recebidas do banco"""
+        self._tarefa_acoes = None
+        self.desenhar_acoes(acoes)
+        
+    def desenhar_acoes(self, acoes: list):
+        """Preenche a tabela com as ações informadas"""
+        self.acoes = acoes
+        self._acoes_exibidas = [dict(acao) for acao in acoes]
         
         self.tabela.setRowCount(0)
         
@@ -139,9 +173,7 @@ class DialogAcoes(QDialog):
             self.tabela.setItem(row, 1, item_status)
             
             # Instrutor Responsável
-            instrutor_nome = ""
-            if acao.get('instrutores'):
-                instrutor_nome = acao['instrutores'].get('nome', '')
+            instrutor_nome = db.entidades.nome_instrutor(acao.get('instrutor_resp_id'))
             self.tabela.setItem(row, 2, QTableWidgetItem(instrutor_nome))
             
             # Data Proposta
@@ -161,6 +193,19 @@ class DialogAcoes(QDialog):
             f"Pendentes: {pendentes} | Concluídas: {concluidas}"
         )
         
+    def revalidar_acoes(self, acoes: list):
+        """Redesenha a tabela só se as ações mudaram desde o pré-carregamento"""
+        if acoes == self._acoes_exibidas:
+            self._tarefa_acoes = None
+            return
+        self.exibir_acoes(acoes)
+        
+    def exibir_erro_carregamento(self, mensagem: str):
+        """Exibe o erro de uma consulta em segundo plano"""
+        self._tarefa_acoes = None
+        self.label_status.setText(f"Erro ao carregar ações: {mensagem}")
+        
+    @rastreador.medir_acao("propor_acao")
     def propor_acao(self):
         """Propõe uma nova ação"""
         acao_texto = self.input_nova_acao.text().strip()
@@ -177,7 +222,7 @@ class DialogAcoes(QDialog):
         
         if sucesso:
             # Registrar log
-            db.adicionar_log(
+            fila_logs.registrar(
                 instrutor_id=self.instrutor_id,
                 atividade=f"Propôs ação para {self.aluno_nome}: {acao_texto}",
                 unidade_id=self.unidade_id
@@ -189,6 +234,7 @@ class DialogAcoes(QDialog):
         else:
             QMessageBox.critical(self, "Erro", mensagem)
             
+    @rastreador.medir_acao("concluir_acao")
     def concluir_acao(self):
         """Marca a ação selecionada como concluída"""
         linha_selecionada = self.tabela.currentRow()
@@ -215,17 +261,17 @@ class DialogAcoes(QDialog):
         )
         
         if resposta == QMessageBox.Yes:
-            sucesso, mensagem = db.concluir_acao(acao_id)
-            
-            if sucesso:
-                # Registrar log
-                db.adicionar_log(
-                    instrutor_id=self.instrutor_id,
-                    atividade=f"Concluiu ação para {self.aluno_nome}: {acao_texto}",
-                    unidade_id=self.unidade_id
-                )
-                
-                QMessageBox.information(self, "Sucesso", mensagem)
-                self.carregar_acoes()
-            else:
-                QMessageBox.critical(self, "Erro", mensagem)
+            # A ação e a contagem da lista mudam na hora; o banco é
+            # atualizado em segundo plano (desfeito com aviso se falhar)
+            escritas.enviar(
+                "concluir_acao", acao_id,
+                descricao=f"Concluir ação de {self.aluno_nome}",
+                log={
+                    "instrutor_id": self.instrutor_id,
+                    "atividade": f"Concluiu ação para {self.aluno_nome}: {acao_texto}",
+                    "unidade_id": self.unidade_id,
+                },
+                ao_desfazer=lambda: self.desenhar_acoes(self.acoes),
+                dono=self
+            )
+            self.desenhar_acoes(self.acoes)
@@ -13,6 +13,10 @@ from datetime import datetime
 import json
 
 from database import db
+from fila_logs import fila_logs
+from rastreio_requisicoes import rastreador
+from ui.escritas import escritas
+from ui.executor import executor
 from config import (
     TIPOS_PLANO, SITUACOES_ACADEMICAS, DIAS_SEMANA,
     OPCOES_AULAS, OPCOES_PAGAMENTO
@@ -187,6 +191,7 @@ class DialogDiaHorario(QDialog):
 class DialogAluno(QDialog):
     """Dialog para adicionar ou editar aluno"""
     
+    @rastreador.medir_acao("abrir_aluno")
     def __init__(self, unidade_id: int, instrutor_id: int, aluno_id: int = None, parent=None):
         super().__init__(parent)
         self.unidade_id = unidade_id
@@ -194,6 +199,10 @@ class DialogAluno(QDialog):
         self.aluno_id = aluno_id
         self.modo_edicao = aluno_id is not None
         self.dia_horario_dados = {}
+        # Cadastro exibido e o formulário como foi preenchido com ele
+        self._aluno_exibido = None
+        self._formulario_preenchido = None
+        self._tarefa_revalidacao = None
         
         self.init_ui()
         
@@ -348,12 +357,54 @@ class DialogAluno(QDialog):
         
     def carregar_dados_aluno(self):
         """Carrega os dados do aluno para edição"""
-        aluno = db.obter_aluno(self.aluno_id)
+        encontrado, aluno = db.aluno_pre_carregado(self.aluno_id)
+        if encontrado:
+            # Lido ao selecionar a linha: exibe na hora e confere em segundo plano
+            self._tarefa_revalidacao = executor.executar(
+                db.consultar,
+                db.obter_aluno,
+                self.aluno_id,
+                ao_concluir=self.revalidar_dados_aluno,
+                ao_falhar=self.falha_revalidacao,
+                dono=self
+            )
+        else:
+            aluno = db.obter_aluno(self.aluno_id)
+        
         if not aluno:
             QMessageBox.critical(self, "Erro", "Aluno não encontrado")
             self.reject()
             return
         
+        self.preencher_campos(aluno)
+        
+    def revalidar_dados_aluno(self, aluno):
+        """Atualiza o formulário se o cadastro mudou desde o pré-carregamento"""
+        self._tarefa_revalidacao = None
+        if not aluno or aluno == self._aluno_exibido:
+            return
+        if self._estado_formulario() != self._formulario_preenchido:
+            # O usuário já começou a editar: mantém o que foi digitado
+            return
+        self.preencher_campos(aluno)
+        
+    def falha_revalidacao(self, mensagem: str):
+        """Sem conexão para conferir: o formulário fica com o cadastro pré-carregado"""
+        self._tarefa_revalidacao = None
+        print(f"Erro ao conferir o cadastro do aluno: {mensagem}")
+        
+    def _estado_formulario(self) -> tuple:
+        """Valores atuais dos campos, para saber se o usuário editou algo"""
+        return (
+            self.input_nome.text(), self.input_data_inicio.text(), self.input_curso.text(),
+            self.combo_tipo_plano.currentText(), self.input_modulo.text(),
+            self.combo_aulas.currentText(), json.dumps(self.dia_horario_dados, sort_keys=True),
+            self.combo_situacao.currentText(), self.input_observacoes.toPlainText(),
+            self.combo_pagamento.currentText(),
+        )
+        
+    def preencher_campos(self, aluno: dict):
+        """Preenche o formulário com o cadastro do aluno"""
         # Preencher campos
         self.input_nome.setText(aluno.get('nome', ''))
         
@@ -384,7 +435,7 @@ class DialogAluno(QDialog):
                 except:
                     self.dia_horario_dados = {}
             elif isinstance(dia_horario, dict):
-                self.dia_horario_dados = dia_horario
+                self.dia_horario_dados = dict(dia_horario)
             self.atualizar_label_horario()
         
         # Situação acadêmica
@@ -398,6 +449,10 @@ class DialogAluno(QDialog):
         pagamento = str(aluno.get('pagamento_parcelas', ''))
         if pagamento in OPCOES_PAGAMENTO:
             self.combo_pagamento.setCurrentText(pagamento)
+        
+        # Cópia: o registro do armazém muda no lugar a cada nova leitura
+        self._aluno_exibido = dict(aluno)
+        self._formulario_preenchido = self._estado_formulario()
             
     def validar_campos(self) -> tuple[bool, str]:
         """Valida todos os campos do formulário"""
@@ -420,6 +475,7 @@ class DialogAluno(QDialog):
         
         return True, ""
         
+    @rastreador.medir_acao("salvar_aluno")
     def salvar(self):
         """Salva os dados do aluno"""
         # Validar
@@ -447,19 +503,30 @@ class DialogAluno(QDialog):
             'unidade_id': self.unidade_id
         }
         
-        # Salvar no banco
+        # Edição: a lista exibe os dados novos na hora e o banco é
+        # atualizado em segundo plano (desfeito com aviso se falhar)
         if self.modo_edicao:
-            sucesso, mensagem = db.atualizar_aluno(self.aluno_id, dados)
-            acao_log = f"Editou aluno: {dados['nome']}"
-        else:
-            sucesso, mensagem = db.adicionar_aluno(dados)
-            acao_log = f"Adicionou aluno: {dados['nome']}"
+            escritas.enviar(
+                # O aluno é da unidade da tela; o armazém já terá os dados novos no envio
+                "atualizar_aluno", self.aluno_id, dados, self.unidade_id,
+                descricao=f"Editar aluno {dados['nome']}",
+                log={
+                    "instrutor_id": self.instrutor_id,
+                    "atividade": f"Editou aluno: {dados['nome']}",
+                    "unidade_id": self.unidade_id,
+                }
+            )
+            self.accept()
+            return
+        
+        # Salvar no banco
+        sucesso, mensagem = db.adicionar_aluno(dados)
         
         if sucesso:
             # Registrar log
-            db.adicionar_log(
+            fila_logs.registrar(
                 instrutor_id=self.instrutor_id,
-                atividade=acao_log,
+                atividade=f"Adicionou aluno: {dados['nome']}",
                 unidade_id=self.unidade_id
             )
             
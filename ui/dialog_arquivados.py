@@ -10,6 +10,8 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Qt
 from database import db
+from ui.escritas import escritas
+from ui.executor import executor
 from ui.styles import aplicar_classe_botao, aplicar_classe_label
 from utils.formatters import formatar_data_br, truncar_texto
 
@@ -21,6 +23,7 @@ class DialogArquivados(QDialog):
         super().__init__(parent)
         self.unidade_id = unidade_id
         self.alunos = []
+        self._tarefa_alunos = None
         
         self.init_ui()
         self.carregar_alunos()
@@ -99,12 +102,28 @@ class DialogArquivados(QDialog):
         self.setLayout(layout)
         
     def carregar_alunos(self):
-        """Carrega os alunos arquivados"""
-        # Buscar todos os alunos (incluindo arquivados)
-        todos_alunos = db.listar_alunos(self.unidade_id, incluir_arquivados=True)
+        """Solicita os alunos arquivados em segundo plano"""
+        if self._tarefa_alunos:
+            self._tarefa_alunos.cancelar()
+        
+        self.label_status.setText("Carregando alunos arquivados...")
+        
+        # Somente os arquivados são buscados (filtro feito no servidor)
+        self._tarefa_alunos = executor.executar(
+            db.consultar,
+            db.listar_alunos,
+            self.unidade_id,
+            apenas_arquivados=True,
+            perfil="arquivo",
+            ao_concluir=self.exibir_alunos,
+            ao_falhar=self.exibir_erro_carregamento,
+            dono=self
+        )
         
-        # Filtrar apenas os arquivados
-        self.alunos = [a for a in todos_alunos if a.get('arquivado', False)]
+    def exibir_alunos(self, alunos: list):
+        """Preenche a tabela com os alunos arquivados recebidos do banco"""
+        self._tarefa_alunos = None
+        self.alunos = alunos
         
         self.tabela.setRowCount(0)
         
@@ -131,17 +150,21 @@ class DialogArquivados(QDialog):
             self.tabela.setItem(row, 3, item_situacao)
             
             # Instrutor
-            instrutor_nome = ""
-            if aluno.get('instrutores'):
-                instrutor_nome = aluno['instrutores'].get('nome', '')
+            instrutor_nome = db.entidades.nome_instrutor(aluno.get('instrutor_id'))
             self.tabela.setItem(row, 4, QTableWidgetItem(instrutor_nome))
             
             # Observações (truncadas)
-            obs = truncar_texto(aluno.get('observacoes', ''), 50)
+            obs = aluno.get('observacoes_resumo', aluno.get('observacoes', ''))
+            obs = truncar_texto(obs, 50)
             self.tabela.setItem(row, 5, QTableWidgetItem(obs))
         
         self.label_status.setText(f"Total de alunos arquivados: {len(self.alunos)}")
         
+    def exibir_erro_carregamento(self, mensagem: str):
+        """Exibe o erro de uma consulta em segundo plano"""
+        self._tarefa_alunos = None
+        self.label_status.setText(f"Erro ao carregar alunos: {mensagem}")
+        
     def desarquivar_aluno(self):
         """Desarquiva o aluno selecionado (volta para a lista principal)"""
         linha_selecionada = self.tabela.currentRow()
@@ -163,10 +186,14 @@ class DialogArquivados(QDialog):
         )
         
         if resposta == QMessageBox.Yes:
-            sucesso, mensagem = db.arquivar_aluno(aluno_id, arquivar=False)
-            
-            if sucesso:
-                QMessageBox.information(self, "Sucesso", mensagem)
-                self.carregar_alunos()
-            else:
-                QMessageBox.critical(self, "Erro", mensagem)
+            # Sai desta lista na hora e volta à lista principal pelo armazém
+            # de entidades; o banco é atualizado em segundo plano
+            escritas.enviar(
+                "arquivar_aluno", aluno_id, False,
+                descricao=f"Desarquivar {aluno_nome}",
+                ao_desfazer=self.carregar_alunos,
+                dono=self
+            )
+            self.tabela.removeRow(linha_selecionada)
+            self.alunos = [aluno for aluno in self.alunos if aluno['id'] != aluno_id]
+            self.label_status.setText(f"Total de alunos arquivados: {len(self.alunos)}")
@@ -0,0 +1,168 @@
+"""
+Dialog de Diagnóstico
+Exibe o tempo das consultas ao banco: percentis por método, chamadas
+mais lentas, erros recentes e aproveitamento do cache
+"""
+
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QPushButton,
+    QLabel, QTableWidget, QTableWidgetItem, QHeaderView,
+    QAbstractItemView, QTabWidget
+)
+from PySide6.QtCore import Qt
+from datetime import datetime
+from database import db
+from ui.styles import aplicar_classe_botao, aplicar_classe_label
+
+
+class DialogDiagnostico(QDialog):
+    """Dialog com as medições do monitor de consultas (ver diagnostico)"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        
+        self.init_ui()
+        self.carregar()
+    
+    def init_ui(self):
+        """Inicializa a interface"""
+        self.setWindowTitle("Diagnóstico do Banco de Dados")
+        self.setMinimumSize(950, 550)
+        
+        layout = QVBoxLayout()
+        layout.setSpacing(15)
+        
+        # Título
+        titulo = QLabel("Desempenho das Consultas")
+        aplicar_classe_label(titulo, "subtitle")
+        layout.addWidget(titulo)
+        
+        descricao = QLabel(
+            "Tempos medidos nesta sessão. Os percentis consideram as chamadas "
+            "mais recentes; o cache mostra as leituras atendidas sem ir ao banco."
+        )
+        descricao.setWordWrap(True)
+        aplicar_classe_label(descricao, "info")
+        layout.addWidget(descricao)
+        
+        self.abas = QTabWidget()
+        
+        self.tabela_metodos = self._criar_tabela([
+            "Método", "Chamadas", "Erros", "p50 (ms)", "p95 (ms)", "Máx. (ms)",
+            "Requisições", "Linhas", "Cache", "Distribuição"
+        ])
+        self.abas.addTab(self.tabela_metodos, "Por método")
+        
+        self.tabela_lentas = self._criar_tabela([
+            "Método", "Horário", "Duração (ms)", "Requisições", "Linhas", "Bytes", "Erro"
+        ])
+        self.abas.addTab(self.tabela_lentas, "Mais lentas")
+        
+        self.tabela_erros = self._criar_tabela(["Método", "Horário", "Duração (ms)", "Erro"])
+        self.abas.addTab(self.tabela_erros, "Erros")
+        
+        layout.addWidget(self.abas)
+        
+        # Botões
+        layout_botoes = QHBoxLayout()
+        
+        btn_atualizar = QPushButton("Atualizar")
+        btn_atualizar.clicked.connect(self.carregar)
+        layout_botoes.addWidget(btn_atualizar)
+        
+        btn_limpar = QPushButton("Limpar")
+        aplicar_classe_botao(btn_limpar, "secondary")
+        btn_limpar.clicked.connect(self.limpar)
+        layout_botoes.addWidget(btn_limpar)
+        
+        layout_botoes.addStretch()
+        
+        btn_fechar = QPushButton("Fechar")
+        aplicar_classe_botao(btn_fechar, "secondary")
+        btn_fechar.clicked.connect(self.accept)
+        layout_botoes.addWidget(btn_fechar)
+        
+        layout.addLayout(layout_botoes)
+        
+        # Label de status
+        self.label_status = QLabel("")
+        aplicar_classe_label(self.label_status, "info")
+        layout.addWidget(self.label_status)
+        
+        self.setLayout(layout)
+    
+    def _criar_tabela(self, colunas: list) -> QTableWidget:
+        """Cria uma tabela somente leitura com as colunas informadas"""
+        tabela = QTableWidget()
+        tabela.setColumnCount(len(colunas))
+        tabela.setHorizontalHeaderLabels(colunas)
+        tabela.setSelectionBehavior(QAbstractItemView.SelectRows)
+        tabela.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        tabela.setAlternatingRowColors(True)
+        tabela.verticalHeader().setVisible(False)
+        
+        header = tabela.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(len(colunas) - 1, QHeaderView.Stretch)
+        return tabela
+    
+    def _preencher(self, tabela: QTableWidget, linhas: list):
+        """Substitui o conteúdo da tabela; números ficam alinhados à direita"""
+        tabela.setRowCount(len(linhas))
+        for linha, valores in enumerate(linhas):
+            for coluna, valor in enumerate(valores):
+                item = QTableWidgetItem(str(valor))
+                if isinstance(valor, (int, float)):
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                tabela.setItem(linha, coluna, item)
+    
+    def carregar(self):
+        """Lê as medições do monitor e do cache"""
+        resumo = db.monitor.resumo_por_metodo()
+        cache = db.cache.taxa_acertos()
+        
+        linhas = []
+        # Métodos com maior p95 primeiro
+        for metodo, dados in sorted(resumo.items(), key=lambda item: item[1]["p95_ms"], reverse=True):
+            acertos, falhas = cache.get(metodo, (0, 0))
+            taxa_cache = f"{100 * acertos / (acertos + falhas):.0f}% de {acertos + falhas}" if acertos + falhas else "-"
+            linhas.append([
+                metodo, dados["chamadas"], dados["erros"],
+                round(dados["p50_ms"], 1), round(dados["p95_ms"], 1), round(dados["max_ms"], 1),
+                round(dados["requisicoes"], 1), round(dados["linhas"], 1), taxa_cache,
+                "  ".join(f"{faixa}: {n}" for faixa, n in dados["faixas"]),
+            ])
+        self._preencher(self.tabela_metodos, linhas)
+        
+        self._preencher(self.tabela_lentas, [
+            [
+                r.metodo, self._horario(r.inicio), round(r.duracao_ms, 1),
+                r.requisicoes, r.linhas, r.bytes if db.rastreador.medir_bytes else "-", r.erro or "",
+            ]
+            for r in db.monitor.mais_lentas(50)
+        ])
+        
+        erros = db.monitor.erros_recentes(100)
+        self._preencher(self.tabela_erros, [
+            [r.metodo, self._horario(r.inicio), round(r.duracao_ms, 1), r.erro]
+            for r in erros
+        ])
+        self.abas.setTabText(2, f"Erros ({len(erros)})" if erros else "Erros")
+        
+        total = sum(dados["chamadas"] for dados in resumo.values())
+        acertos = sum(a for a, _ in cache.values())
+        consultas_cache = sum(a + f for a, f in cache.values())
+        status = f"{total} chamada(s) ao banco em {len(resumo)} método(s)"
+        if consultas_cache:
+            status += f" - cache: {100 * acertos / consultas_cache:.0f}% de acertos"
+        self.label_status.setText(status)
+    
+    @staticmethod
+    def _horario(instante: float) -> str:
+        return datetime.fromtimestamp(instante).strftime("%H:%M:%S.%f")[:-3]
+    
+    def limpar(self):
+        """Descarta as medições feitas até agora"""
+        db.monitor.limpar()
+        db.cache.zerar_taxa_acertos()
+        self.carregar()
@@ -5,18 +5,20 @@ Exibe o histórico de atividades do sistema
 
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QPushButton,
-    QLabel, QTableWidget, QTableWidgetItem, QHeaderView,
+    QLabel, QTableView, QHeaderView,
     QAbstractItemView, QSpinBox
 )
 from PySide6.QtCore import Qt
 from database import db
+from rastreio_requisicoes import rastreador
+from ui.modelos import ModeloLogs
 from ui.styles import aplicar_classe_botao, aplicar_classe_label
-from utils.formatters import formatar_data_hora
 
 
 class DialogLogs(QDialog):
     """Dialog para visualizar logs do sistema"""
     
+    @rastreador.medir_acao("abrir_logs")
     def __init__(self, unidade_id: int, parent=None):
         super().__init__(parent)
         self.unidade_id = unidade_id
@@ -40,16 +42,17 @@ class DialogLogs(QDialog):
         
         # Descrição
         descricao = QLabel(
-            "Este é o registro de todas as atividades realizadas no sistema."
+            "Este é o registro de todas as atividades realizadas no sistema. "
+            "Os períodos mais antigos aparecem como resumos diários por instrutor."
         )
         descricao.setWordWrap(True)
         aplicar_classe_label(descricao, "info")
         layout.addWidget(descricao)
         
-        # Controle de limite
+        # Controle do tamanho da página
         layout_controle = QHBoxLayout()
         
-        label_limite = QLabel("Exibir últimos:")
+        label_limite = QLabel("Registros por página:")
         layout_controle.addWidget(label_limite)
         
         self.spin_limite = QSpinBox()
@@ -59,7 +62,7 @@ class DialogLogs(QDialog):
         self.spin_limite.setSingleStep(50)
         layout_controle.addWidget(self.spin_limite)
         
-        label_registros = QLabel("registros")
+        label_registros = QLabel("(role a tabela para carregar mais)")
         layout_controle.addWidget(label_registros)
         
         layout_controle.addStretch()
@@ -70,12 +73,15 @@ class DialogLogs(QDialog):
         
         layout.addLayout(layout_controle)
         
-        # Tabela de logs
-        self.tabela = QTableWidget()
-        self.tabela.setColumnCount(3)
-        self.tabela.setHorizontalHeaderLabels([
-            "Instrutor", "Atividade", "Data e Hora"
-        ])
+        # Tabela de logs (carregada por páginas conforme a rolagem)
+        self.modelo = ModeloLogs(
+            self.buscar_pagina, self.spin_limite.value(), self,
+            buscar_resumos=self.buscar_resumos
+        )
+        self.modelo.pagina_carregada.connect(self.exibir_status)
+        self.modelo.carregamento_falhou.connect(self.exibir_erro_carregamento)
+        self.tabela = QTableView()
+        self.tabela.setModel(self.modelo)
         
         # Configurações da tabela
         self.tabela.setSelectionBehavior(QAbstractItemView.SelectRows)
@@ -83,12 +89,14 @@ class DialogLogs(QDialog):
         self.tabela.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.tabela.setAlternatingRowColors(True)
         self.tabela.verticalHeader().setVisible(False)
+        self.tabela.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
         
         # Ajustar colunas
         header = self.tabela.horizontalHeader()
         header.setSectionResizeMode(0, QHeaderView.ResizeToContents)  # Instrutor
         header.setSectionResizeMode(1, QHeaderView.Stretch)  # Atividade
         header.setSectionResizeMode(2, QHeaderView.ResizeToContents)  # Data e Hora
+        header.setResizeContentsPrecision(200)
         
         layout.addWidget(self.tabela)
         
@@ -114,28 +122,34 @@ class DialogLogs(QDialog):
         self.setLayout(layout)
         
     def carregar_logs(self):
-        """Carrega os logs do banco de dados"""
-        limite = self.spin_limite.value()
-        self.logs = db.listar_logs(self.unidade_id, limite=limite)
-        
-        self.tabela.setRowCount(0)
-        
-        for log in self.logs:
-            row = self.tabela.rowCount()
-            self.tabela.insertRow(row)
-            
-            # Instrutor
-            instrutor_nome = "Sistema"
-            if log.get('instrutores'):
-                instrutor_nome = log['instrutores'].get('nome', 'Sistema')
-            self.tabela.setItem(row, 0, QTableWidgetItem(instrutor_nome))
-            
-            # Atividade
-            atividade = log.get('atividade', '')
-            self.tabela.setItem(row, 1, QTableWidgetItem(atividade))
-            
-            # Data e Hora
-            data_hora = formatar_data_hora(log.get('data_hora'))
-            self.tabela.setItem(row, 2, QTableWidgetItem(data_hora))
-        
-        self.label_status.setText(f"Exibindo {len(self.logs)} registro(s) de log")
+        """Recarrega os logs a partir do registro mais recente"""
+        self.label_status.setText("Carregando logs...")
+        self.modelo.reiniciar(self.spin_limite.value())
+        
+    def buscar_pagina(self, cursor, limite: int) -> list:
+        """
+        Busca uma página de logs (executado em segundo plano pelo modelo)
+        
+        Levanta ErroConsulta em caso de falha: uma lista vazia seria lida
+        como o fim dos logs, e não como uma página a buscar de novo.
+        """
+        return db.consultar(db.listar_logs, self.unidade_id, limite=limite, antes_de=cursor)
+        
+    def buscar_resumos(self, cursor, limite: int) -> list:
+        """Busca uma página de resumos diários, após os logs detalhados (levanta ErroConsulta)"""
+        return db.consultar(db.listar_resumos_logs, self.unidade_id, limite=limite, antes_de=cursor)
+        
+    def exibir_status(self, total: int):
+        """Atualiza o status após cada página carregada"""
+        self.logs = self.modelo.logs
+        resumos = self.modelo.resumos
+        texto = f"Exibindo {total - resumos} registro(s) de log"
+        if resumos:
+            texto += f" e {resumos} resumo(s) diário(s)"
+        if not self.modelo.esgotado:
+            texto += " - role até o fim para carregar mais"
+        self.label_status.setText(texto)
+        
+    def exibir_erro_carregamento(self, mensagem: str):
+        """Exibe o erro de uma consulta em segundo plano"""
+        self.label_status.setText(f"Erro ao carregar logs: {mensagem}")
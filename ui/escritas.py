@@ -0,0 +1,94 @@
+"""
+Escritas Otimistas
+Aplica o efeito de uma escrita na tela na hora e a envia ao banco em
+segundo plano, desfazendo o efeito se o banco recusar
+"""
+
+from typing import Any, Callable, Dict, Optional
+from PySide6.QtCore import QObject, Signal
+import shiboken6
+from config import Config
+from database import db
+from fila_logs import fila_logs
+from ui.executor import ExecutorConsultas
+
+
+class EscritasOtimistas(QObject):
+    """
+    Fila de escritas do DatabaseManager enviadas em segundo plano
+
+    O efeito esperado vai para o armazém de entidades antes do envio
+    (db.prever_escrita), então todas as telas já exibem o resultado. As
+    escritas saem uma de cada vez, na ordem em que foram feitas. Se uma
+    falhar, o efeito é desfeito e o signal falhou é emitido.
+    """
+
+    # Emitido quando uma escrita falha e é desfeita: (descrição, mensagem)
+    falhou = Signal(str, str)
+
+    def __init__(self):
+        super().__init__()
+        # Uma única thread: a segunda edição de um aluno nunca chega antes da primeira
+        self._executor = ExecutorConsultas(max_threads=1)
+        self._pendentes = 0
+
+    def enviar(self, metodo: str, *args, descricao: str,
+               log: Optional[Dict[str, Any]] = None,
+               ao_desfazer: Optional[Callable[[], None]] = None,
+               dono: Optional[QObject] = None):
+        """
+        Aplica o efeito de uma escrita e a agenda
+
+        Args:
+            metodo: Escrita do DatabaseManager (ver db.prever_escrita)
+            *args: Argumentos da escrita
+            descricao: Texto da notificação em caso de falha (ex.: "Editar Maria")
+            log: Registro de atividade (argumentos de fila_logs.registrar),
+                enfileirado somente se a escrita for confirmada
+            ao_desfazer: Chamado após desfazer o efeito, se o dono ainda existir
+            dono: Widget que recebe ao_desfazer
+        """
+        desfazer = db.prever_escrita(metodo, *args)
+        self._pendentes += 1
+
+        def falha(mensagem: str):
+            self._pendentes -= 1
+            desfazer()
+            if ao_desfazer and (dono is None or shiboken6.isValid(dono)):
+                ao_desfazer()
+            self.falhou.emit(descricao, mensagem)
+
+        def concluida(resultado):
+            sucesso, mensagem = resultado
+            if not sucesso:
+                falha(mensagem)
+                return
+            self._pendentes -= 1
+
+        self._executor.executar(
+            self._escrever, metodo, args, log,
+            ao_concluir=concluida,
+            ao_falhar=falha
+        )
+
+    @staticmethod
+    def _escrever(metodo: str, args: tuple, log: Optional[Dict[str, Any]]) -> tuple[bool, str]:
+        """Envia a escrita (na thread da fila) e registra o log se confirmada"""
+        sucesso, mensagem = getattr(db, metodo)(*args)
+        if sucesso and log:
+            # Registrado aqui, e não no callback: no encerramento o event loop já parou
+            fila_logs.registrar(**log)
+        return sucesso, mensagem
+
+    def pendentes(self) -> int:
+        """Escritas aplicadas na tela que o banco ainda não confirmou"""
+        return self._pendentes
+
+    def encerrar(self):
+        """Aguarda as escritas em andamento (chamado ao fechar a aplicação)"""
+        if not self._executor.aguardar(int(Config.ESCRITAS_ESPERA_ENCERRAMENTO * 1000)):
+            print("Encerrando com escritas ainda não confirmadas pelo banco")
+
+
+# Instância global da fila de escritas
+escritas = EscritasOtimistas()
@@ -0,0 +1,147 @@
+"""
+Executor de Consultas em Segundo Plano
+Executa chamadas ao banco de dados em um QThreadPool e entrega os
+resultados na thread da interface, sem travar o event loop do Qt
+"""
+
+from typing import Any, Callable, Optional
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot, Qt
+import contextvars
+import shiboken6
+from config import Config
+
+
+class _SinaisTarefa(QObject):
+    """Signals emitidos por uma tarefa ao terminar (QRunnable não é QObject)"""
+
+    concluida = Signal(object, object)  # (tarefa, resultado)
+    falhou = Signal(object, str)        # (tarefa, mensagem)
+
+
+class Tarefa(QRunnable):
+    """Chamada de função executada fora da thread da interface"""
+
+    def __init__(self, funcao: Callable, args: tuple, kwargs: dict,
+                 ao_concluir: Optional[Callable] = None,
+                 ao_falhar: Optional[Callable] = None,
+                 dono: Optional[QObject] = None):
+        super().__init__()
+        # O executor mantém a referência até a entrega do resultado
+        self.setAutoDelete(False)
+        self.funcao = funcao
+        self.args = args
+        self.kwargs = kwargs
+        self.ao_concluir = ao_concluir
+        self.ao_falhar = ao_falhar
+        self.dono = dono
+        self.cancelada = False
+        self.sinais = _SinaisTarefa()
+        # Contexto de quem agendou (ex.: a ação do usuário em rastreio_requisicoes)
+        self.contexto = contextvars.copy_context()
+
+    def cancelar(self):
+        """Descarta o resultado da tarefa (o callback não será chamado)"""
+        self.cancelada = True
+
+    def run(self):
+        """Executa a função na thread do pool"""
+        if self.cancelada:
+            self.sinais.concluida.emit(self, None)
+            return
+
+        try:
+            resultado = self.contexto.run(self.funcao, *self.args, **self.kwargs)
+        except Exception as e:
+            self.sinais.falhou.emit(self, str(e))
+            return
+
+        self.sinais.concluida.emit(self, resultado)
+
+
+class ExecutorConsultas(QObject):
+    """
+    Executa consultas do DatabaseManager em segundo plano
+
+    Os callbacks são sempre chamados na thread da interface. Se o widget
+    dono da tarefa já tiver sido destruído, o resultado é descartado.
+    """
+
+    def __init__(self, max_threads: int = Config.MAX_THREADS_CONSULTA):
+        super().__init__()
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(max_threads)
+        self._pendentes = set()
+
+    def executar(self, funcao: Callable, *args,
+                 ao_concluir: Optional[Callable[[Any], None]] = None,
+                 ao_falhar: Optional[Callable[[str], None]] = None,
+                 dono: Optional[QObject] = None,
+                 **kwargs) -> Tarefa:
+        """
+        Agenda uma chamada em segundo plano
+
+        Args:
+            funcao: Função a executar (ex: db.listar_alunos)
+            *args, **kwargs: Argumentos repassados à função
+            ao_concluir: Callback com o resultado, chamado na thread da interface
+            ao_falhar: Callback com a mensagem de erro
+            dono: Widget que recebe o resultado; se for destruído, o resultado é descartado
+
+        Returns:
+            Tarefa: Permite cancelar a entrega do resultado
+        """
+        tarefa = Tarefa(funcao, args, kwargs, ao_concluir, ao_falhar, dono)
+        tarefa.sinais.concluida.connect(self._entregar_resultado, Qt.QueuedConnection)
+        tarefa.sinais.falhou.connect(self._entregar_erro, Qt.QueuedConnection)
+        self._pendentes.add(tarefa)
+        self.pool.start(tarefa)
+        return tarefa
+
+    def aguardar(self, timeout_ms: int = -1) -> bool:
+        """Bloqueia até todas as tarefas do pool terminarem (uso em scripts e testes)"""
+        return self.pool.waitForDone(timeout_ms)
+
+    def _destino_valido(self, tarefa: Tarefa) -> bool:
+        """Verifica se o resultado ainda deve ser entregue"""
+        if tarefa.cancelada:
+            return False
+        if tarefa.dono is not None and not shiboken6.isValid(tarefa.dono):
+            return False
+        return True
+
+    @Slot(object, object)
+    def _entregar_resultado(self, tarefa: Tarefa, resultado: Any):
+        """Entrega o resultado na thread da interface"""
+        self._pendentes.discard(tarefa)
+        if self._destino_valido(tarefa) and tarefa.ao_concluir:
+            tarefa.ao_concluir(resultado)
+
+    @Slot(object, str)
+    def _entregar_erro(self, tarefa: Tarefa, mensagem: str):
+        """Entrega o erro na thread da interface"""
+        self._pendentes.discard(tarefa)
+        if not self._destino_valido(tarefa):
+            return
+        if tarefa.ao_falhar:
+            tarefa.ao_falhar(mensagem)
+        else:
+            print(f"Erro em consulta de segundo plano: {mensagem}")
+
+
+class ReceptorEventos(QObject):
+    """
+    Entrega na thread da interface eventos gerados em outras threads
+
+    entregar() pode ser chamado de qualquer thread; o signal recebido é
+    emitido na thread do receptor (conexão enfileirada do Qt).
+    """
+
+    recebido = Signal(object)
+
+    def entregar(self, evento: Any):
+        if shiboken6.isValid(self):
+            self.recebido.emit(evento)
+
+
+# Instância global do executor de consultas
+executor = ExecutorConsultas()
@@ -0,0 +1,379 @@
+"""
+Modelos de Dados das Tabelas
+Modelos Qt (model/view) servidos diretamente a partir das listas de
+dicionários retornadas pelo DatabaseManager, sem criar um item por célula
+"""
+
+from typing import Optional, List, Dict, Any, Callable
+import bisect
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, Signal
+from PySide6.QtGui import QColor
+from database import db
+from ui.executor import executor
+from utils.formatters import truncar_texto, formatar_data_hora, formatar_data_br
+
+
+class ModeloAlunos(QAbstractTableModel):
+    """
+    Modelo da tabela de alunos da tela principal
+
+    Textos, cores e contagens são calculados em data() somente para as
+    células que a view realmente desenha.
+    """
+
+    COLUNAS = ["Nome", "Situação", "Observação", "Ações Pendentes", "Instrutor(a)"]
+    COLUNA_NOME, COLUNA_SITUACAO, COLUNA_OBSERVACAO, COLUNA_ACOES, COLUNA_INSTRUTOR = range(5)
+
+    # Definição das cores para fácil manutenção
+    COR_ACOES_PENDENTES = QColor(255, 100, 100)  # Vermelho mais forte
+    COR_FORMADOS = QColor(100, 150, 255)         # Azul mais forte
+    COR_ADIANTADO_ATRASADO = QColor(255, 255, 100) # Amarelo mais forte
+    COR_TEXTO_CLARO = QColor(255, 255, 255)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._alunos: List[Dict[str, Any]] = []
+
+    # ============================================
+    # INTERFACE QAbstractTableModel
+    # ============================================
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._alunos)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.COLUNAS)
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUNAS[section]
+        return None
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        aluno = self._alunos[index.row()]
+
+        if role == Qt.DisplayRole:
+            return self._texto(aluno, index.column())
+
+        if role == Qt.BackgroundRole:
+            return self.cor_linha(aluno)
+
+        if role == Qt.ForegroundRole:
+            # Texto branco para melhor contraste nas cores mais escuras
+            cor = self.cor_linha(aluno)
+            if cor in (self.COR_ACOES_PENDENTES, self.COR_FORMADOS):
+                return self.COR_TEXTO_CLARO
+            return None
+
+        if role == Qt.UserRole:
+            return aluno['id']
+
+        return None
+
+    # ============================================
+    # DADOS
+    # ============================================
+
+    def definir_alunos(self, alunos: List[Dict[str, Any]]):
+        """Substitui todos os alunos com um único reset do modelo"""
+        self.beginResetModel()
+        self._alunos = list(alunos)
+        self.endResetModel()
+
+    def aplicar_alteracoes(self, alterados: List[Dict[str, Any]], removidos: List[int]):
+        """
+        Aplica uma sincronização incremental alterando somente as linhas afetadas
+
+        Linhas removidas saem com beginRemoveRows, alteradas que mantêm a
+        posição emitem dataChanged e as demais são reinseridas na posição
+        da ordem (nome, id). Muitas alterações de uma vez viram um reset.
+
+        Os alunos vêm do armazém de entidades: a linha pode ser o mesmo
+        dicionário, já alterado, então a posição é conferida pelas vizinhas.
+        """
+        if len(alterados) + len(removidos) > max(50, len(self._alunos) // 4):
+            linhas = {aluno['id']: aluno for aluno in self._alunos}
+            for aluno_id in removidos:
+                linhas.pop(aluno_id, None)
+            for aluno in alterados:
+                linhas[aluno['id']] = aluno
+            self.definir_alunos(sorted(linhas.values(), key=self._chave_ordem))
+            return
+
+        for aluno_id in removidos:
+            self._remover_linha(self.linha_do_aluno(aluno_id))
+
+        ultima_coluna = len(self.COLUNAS) - 1
+        for aluno in alterados:
+            linha = self.linha_do_aluno(aluno['id'])
+            if linha >= 0:
+                self._alunos[linha] = aluno
+                if self._em_ordem(linha):
+                    self.dataChanged.emit(self.index(linha, 0), self.index(linha, ultima_coluna))
+                    continue
+
+            self._remover_linha(linha)
+            chaves = [self._chave_ordem(a) for a in self._alunos]
+            destino = bisect.bisect_left(chaves, self._chave_ordem(aluno))
+            self.beginInsertRows(QModelIndex(), destino, destino)
+            self._alunos.insert(destino, aluno)
+            self.endInsertRows()
+
+    def atualizar_linhas(self, aluno_ids: List[int]):
+        """Redesenha as linhas de alunos alterados no lugar (mesma posição)"""
+        ids = set(aluno_ids)
+        ultima_coluna = len(self.COLUNAS) - 1
+        for linha, aluno in enumerate(self._alunos):
+            if aluno['id'] in ids:
+                self.dataChanged.emit(self.index(linha, 0), self.index(linha, ultima_coluna))
+
+    def _em_ordem(self, linha: int) -> bool:
+        """Verifica se a linha continua entre as vizinhas na ordem (nome, id)"""
+        chave = self._chave_ordem(self._alunos[linha])
+        if linha > 0 and self._chave_ordem(self._alunos[linha - 1]) > chave:
+            return False
+        if linha + 1 < len(self._alunos) and chave > self._chave_ordem(self._alunos[linha + 1]):
+            return False
+        return True
+
+    def _remover_linha(self, linha: int):
+        """Remove uma linha do modelo (ignora linhas inválidas)"""
+        if linha < 0:
+            return
+        self.beginRemoveRows(QModelIndex(), linha, linha)
+        del self._alunos[linha]
+        self.endRemoveRows()
+
+    @staticmethod
+    def _chave_ordem(aluno: Dict[str, Any]) -> tuple:
+        """Chave da ordem da lista (a mesma usada pelo servidor)"""
+        return (aluno['nome'].casefold(), aluno['id'])
+
+    @property
+    def alunos(self) -> List[Dict[str, Any]]:
+        """Alunos exibidos, na ordem das linhas"""
+        return self._alunos
+
+    def aluno(self, linha: int) -> Optional[Dict[str, Any]]:
+        """Retorna o aluno de uma linha (ou None se a linha for inválida)"""
+        if 0 <= linha < len(self._alunos):
+            return self._alunos[linha]
+        return None
+
+    def linha_do_aluno(self, aluno_id: int) -> int:
+        """Retorna a linha de um aluno (-1 se não estiver no modelo)"""
+        for linha, aluno in enumerate(self._alunos):
+            if aluno['id'] == aluno_id:
+                return linha
+        return -1
+
+    def cor_linha(self, aluno: Dict[str, Any]) -> Optional[QColor]:
+        """Determina a cor de fundo da linha de um aluno"""
+        situacao = aluno.get('situacao_academica', '')
+        if aluno.get('acoes_pendentes', 0) > 0:
+            # Vermelho para ações pendentes (prioridade máxima)
+            return self.COR_ACOES_PENDENTES
+        if situacao == "Formado(a)":
+            # Azul para formados
+            return self.COR_FORMADOS
+        if situacao in ["Atrasado", "Adiantado"]:
+            # Amarelo para atrasado e adiantado
+            return self.COR_ADIANTADO_ATRASADO
+        return None
+
+    def _texto(self, aluno: Dict[str, Any], coluna: int) -> str:
+        """Texto exibido em uma célula"""
+        if coluna == self.COLUNA_NOME:
+            return aluno['nome']
+        if coluna == self.COLUNA_SITUACAO:
+            return aluno.get('situacao_academica', '')
+        if coluna == self.COLUNA_OBSERVACAO:
+            # O perfil "lista" traz apenas o resumo calculado no servidor
+            obs = aluno.get('observacoes_resumo', aluno.get('observacoes', ''))
+            return truncar_texto(obs, 50)
+        if coluna == self.COLUNA_ACOES:
+            return str(aluno.get('acoes_pendentes', 0))
+        if coluna == self.COLUNA_INSTRUTOR:
+            return db.entidades.nome_instrutor(aluno.get('instrutor_id'))
+        return ""
+
+
+class ModeloLogs(QAbstractTableModel):
+    """
+    Modelo paginado da tabela de logs
+
+    Carrega uma página por vez conforme o usuário rola a tabela
+    (canFetchMore/fetchMore). Cada página é buscada em segundo plano a
+    partir do cursor (data_hora, id) do último registro exibido.
+
+    Quando os logs detalhados acabam e há uma função de resumos, a
+    rolagem continua pelos resumos diários dos períodos já removidos pela
+    retenção (cursor (dia, id) do último resumo, None no primeiro).
+    """
+
+    COLUNAS = ["Instrutor", "Atividade", "Data e Hora"]
+
+    # Emitido após cada página recebida, com o total de registros exibidos
+    pagina_carregada = Signal(int)
+    # Emitido quando a busca de uma página falha
+    carregamento_falhou = Signal(str)
+
+    def __init__(self, buscar_pagina: Callable[[Optional[tuple], int], List[Dict[str, Any]]],
+                 tamanho_pagina: int = 100, parent=None,
+                 buscar_resumos: Optional[Callable[[Optional[tuple], int], List[Dict[str, Any]]]] = None):
+        """
+        Args:
+            buscar_pagina: Função (cursor, limite) -> lista de logs
+            tamanho_pagina: Quantidade de registros por página
+            buscar_resumos: Função (cursor, limite) -> lista de resumos diários
+        """
+        super().__init__(parent)
+        self.buscar_pagina = buscar_pagina
+        self.buscar_resumos = buscar_resumos
+        self.tamanho_pagina = tamanho_pagina
+        self._logs: List[Dict[str, Any]] = []
+        self._esgotado = False
+        self._em_resumos = False
+        self._tarefa = None
+
+    @property
+    def logs(self) -> List[Dict[str, Any]]:
+        """Registros carregados até o momento"""
+        return self._logs
+
+    @property
+    def esgotado(self) -> bool:
+        """True quando não há mais páginas a carregar"""
+        return self._esgotado
+
+    @property
+    def carregando(self) -> bool:
+        """True enquanto uma página está sendo buscada"""
+        return self._tarefa is not None
+
+    @property
+    def resumos(self) -> int:
+        """Quantidade de resumos diários carregados (após os logs detalhados)"""
+        return sum(1 for log in self._logs if self._eh_resumo(log))
+
+    @staticmethod
+    def _eh_resumo(log: Dict[str, Any]) -> bool:
+        return 'dia' in log
+
+    # ============================================
+    # INTERFACE QAbstractTableModel
+    # ============================================
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._logs)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.COLUNAS)
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUNAS[section]
+        return None
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+
+        log = self._logs[index.row()]
+        coluna = index.column()
+
+        if self._eh_resumo(log):
+            return self._dado_resumo(log, coluna)
+        if coluna == 0:
+            return db.entidades.nome_instrutor(log.get('instrutor_id')) or "Sistema"
+        if coluna == 1:
+            return log.get('atividade', '')
+        if coluna == 2:
+            return formatar_data_hora(log.get('data_hora'))
+        return None
+
+    def _dado_resumo(self, resumo: Dict[str, Any], coluna: int):
+        """Célula de um resumo diário (logs removidos pela retenção)"""
+        if coluna == 0:
+            if resumo.get('instrutor_nome'):
+                return resumo['instrutor_nome']
+            return "Sistema" if resumo.get('instrutor_id') is None else "Instrutor excluído"
+        if coluna == 1:
+            return f"{resumo.get('quantidade', 0)} atividade(s) no dia (resumo diário)"
+        if coluna == 2:
+            return formatar_data_br(resumo.get('dia'))
+        return None
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        return not parent.isValid() and not self._esgotado and self._tarefa is None
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+
+        cursor = None
+        ultimo = self._logs[-1] if self._logs else None
+        if self._em_resumos:
+            if ultimo is not None and self._eh_resumo(ultimo):
+                cursor = (ultimo['dia'], ultimo['id'])
+        elif ultimo is not None:
+            cursor = (ultimo['data_hora'], ultimo['id'])
+
+        self._tarefa = executor.executar(
+            self.buscar_resumos if self._em_resumos else self.buscar_pagina,
+            cursor,
+            self.tamanho_pagina,
+            ao_concluir=self._adicionar_pagina,
+            ao_falhar=self._falha_pagina,
+            dono=self
+        )
+
+    # ============================================
+    # DADOS
+    # ============================================
+
+    def reiniciar(self, tamanho_pagina: Optional[int] = None):
+        """Descarta os registros carregados e busca a primeira página"""
+        if self._tarefa:
+            self._tarefa.cancelar()
+            self._tarefa = None
+        if tamanho_pagina:
+            self.tamanho_pagina = tamanho_pagina
+
+        self.beginResetModel()
+        self._logs = []
+        self._esgotado = False
+        self._em_resumos = False
+        self.endResetModel()
+
+        self.fetchMore()
+
+    def _adicionar_pagina(self, logs: List[Dict[str, Any]]):
+        """Acrescenta uma página ao final do modelo"""
+        self._tarefa = None
+        if len(logs) < self.tamanho_pagina:
+            # Os resumos são buscados na próxima rolagem, não junto com esta página
+            if self._em_resumos or self.buscar_resumos is None:
+                self._esgotado = True
+            else:
+                self._em_resumos = True
+
+        if logs:
+            inicio = len(self._logs)
+            self.beginInsertRows(QModelIndex(), inicio, inicio + len(logs) - 1)
+            self._logs.extend(logs)
+            self.endInsertRows()
+        elif self._em_resumos and not self._esgotado:
+            # Sem linhas novas a view não pede a próxima página
+            self.fetchMore()
+            return
+
+        self.pagina_carregada.emit(len(self._logs))
+
+    def _falha_pagina(self, mensagem: str):
+        """Libera o modelo para uma nova tentativa após uma falha"""
+        self._tarefa = None
+        self.carregamento_falhou.emit(mensagem)
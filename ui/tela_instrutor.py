@@ -10,6 +10,8 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Signal, Qt, QSettings
 from database import db
+from fila_logs import fila_logs
+from ui.executor import executor
 from ui.styles import aplicar_classe_label, aplicar_classe_botao
 
 
@@ -21,6 +23,7 @@ class DialogGerenciarInstrutores(QDialog):
         self.unidade_id = unidade_id
         self.unidade_nome = unidade_nome
         self.instrutores = []
+        self._tarefa_instrutores = None
         self.init_ui()
         self.carregar_instrutores()
         
@@ -85,9 +88,27 @@ class DialogGerenciarInstrutores(QDialog):
         self.setLayout(layout)
         
     def carregar_instrutores(self):
-        """Carrega a lista de instrutores"""
+        """Solicita a lista de instrutores em segundo plano"""
+        if self._tarefa_instrutores:
+            self._tarefa_instrutores.cancelar()
+        
+        self.lista_instrutores.clear()
+        self.lista_instrutores.addItem("Carregando instrutores...")
+        self._tarefa_instrutores = executor.executar(
+            db.consultar,
+            db.listar_instrutores,
+            self.unidade_id,
+            apenas_ativos=False,
+            ao_concluir=self.exibir_instrutores,
+            ao_falhar=self.exibir_erro_carregamento,
+            dono=self
+        )
+        
+    def exibir_instrutores(self, instrutores: list):
+        """Preenche a lista com os instrutores recebidos do banco"""
+        self._tarefa_instrutores = None
         self.lista_instrutores.clear()
-        self.instrutores = db.listar_instrutores(self.unidade_id, apenas_ativos=False)
+        self.instrutores = instrutores
         
         for instrutor in self.instrutores:
             status = "✓ Ativo" if instrutor['ativo'] else "✗ Inativo"
@@ -95,6 +116,13 @@ class DialogGerenciarInstrutores(QDialog):
             item.setData(Qt.UserRole, instrutor['id'])
             self.lista_instrutores.addItem(item)
             
+    def exibir_erro_carregamento(self, mensagem: str):
+        """Exibe o erro de uma consulta em segundo plano"""
+        self._tarefa_instrutores = None
+        self.lista_instrutores.clear()
+        self.instrutores = []
+        self.lista_instrutores.addItem(f"Erro ao carregar instrutores: {mensagem}")
+        
     def adicionar_instrutor(self):
         """Adiciona um novo instrutor"""
         nome = self.input_nome.text().strip()
@@ -111,7 +139,7 @@ class DialogGerenciarInstrutores(QDialog):
             self.carregar_instrutores()
             
             # Registrar log
-            db.adicionar_log(
+            fila_logs.registrar(
                 instrutor_id=None,
                 atividade=f"Adicionou instrutor: {nome}",
                 unidade_id=self.unidade_id
@@ -151,7 +179,7 @@ class DialogGerenciarInstrutores(QDialog):
                 self.carregar_instrutores()
                 
                 # Registrar log
-                db.adicionar_log(
+                fila_logs.registrar(
                     instrutor_id=None,
                     atividade=f"Excluiu instrutor: {instrutor['nome']}",
                     unidade_id=self.unidade_id
@@ -171,6 +199,7 @@ class TelaInstrutor(QWidget):
         self.unidade_id = unidade_id
         self.unidade_nome = unidade_nome
         self.instrutores = []
+        self._tarefa_instrutores = None
         self.settings = QSettings("SistemaGestao", "GestaoAlunos")
         self.init_ui()
         self.restaurar_geometria()
@@ -233,9 +262,29 @@ class TelaInstrutor(QWidget):
         self.carregar_instrutores()
         
     def carregar_instrutores(self):
-        """Carrega os instrutores no ComboBox"""
+        """Solicita os instrutores em segundo plano"""
+        if self._tarefa_instrutores:
+            self._tarefa_instrutores.cancelar()
+        
+        self.combo_instrutor.clear()
+        self.combo_instrutor.addItem("Carregando instrutores...")
+        self.combo_instrutor.setEnabled(False)
+        self._tarefa_instrutores = executor.executar(
+            db.consultar,
+            db.listar_instrutores,
+            self.unidade_id,
+            apenas_ativos=True,
+            ao_concluir=self.exibir_instrutores,
+            ao_falhar=self.exibir_erro_carregamento,
+            dono=self
+        )
+        
+    def exibir_instrutores(self, instrutores: list):
+        """Preenche o ComboBox com os instrutores recebidos do banco"""
+        self._tarefa_instrutores = None
         self.combo_instrutor.clear()
-        self.instrutores = db.listar_instrutores(self.unidade_id, apenas_ativos=True)
+        self.combo_instrutor.setEnabled(True)
+        self.instrutores = instrutores
         
         if not self.instrutores:
             self.combo_instrutor.addItem("Nenhum instrutor cadastrado")
@@ -244,6 +293,13 @@ class TelaInstrutor(QWidget):
         for instrutor in self.instrutores:
             self.combo_instrutor.addItem(instrutor['nome'], instrutor['id'])
             
+    def exibir_erro_carregamento(self, mensagem: str):
+        """Exibe o erro de uma consulta em segundo plano"""
+        self._tarefa_instrutores = None
+        self.combo_instrutor.clear()
+        self.instrutores = []
+        self.combo_instrutor.addItem(f"Erro ao carregar instrutores: {mensagem}")
+        
     def abrir_gerenciar(self):
         """Abre o dialog de gerenciamento de instrutores"""
         dialog = DialogGerenciarInstrutores(self.unidade_id, self.unidade_nome, self)
@@ -8,16 +8,20 @@ Corrigido o erro de atributo no QStyledItemDelegate.
 
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-    QLabel, QTableWidget, QTableWidgetItem, QHeaderView,
+    QLabel, QLineEdit, QTableView, QHeaderView,
     QMessageBox, QAbstractItemView, QStyledItemDelegate, QStyleOptionViewItem,
     QStyle # Adicionado para corrigir o erro State_Selected
 )
-from PySide6.QtCore import Qt, QSettings, QModelIndex
-from PySide6.QtGui import QColor, QPainter
-from database import db
+from PySide6.QtCore import Qt, QSettings, QModelIndex, QTimer
+from PySide6.QtGui import QPainter
+from config import Config
+from database import db, Alteracoes
+from rastreio_requisicoes import rastreador
 from ui.styles import aplicar_classe_label, aplicar_classe_botao
 from ui.dialog_aluno import DialogAluno
-from utils.formatters import truncar_texto
+from ui.escritas import escritas
+from ui.executor import executor, ReceptorEventos
+from ui.modelos import ModeloAlunos
 import json
 
 
@@ -27,8 +31,8 @@ import json
 
 class LinhaColoridaDelegate(QStyledItemDelegate):
     """
-    Delegate para pintar a linha inteira do QTableWidget com a cor
-    definida no Qt.BackgroundRole do primeiro item da linha.
+    Delegate para pintar a linha inteira da tabela com a cor
+    definida no Qt.BackgroundRole da primeira coluna da linha.
     """
     def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex):
         # A cor de fundo é definida no item da primeira coluna (coluna 0)
@@ -73,11 +77,12 @@ class LinhaColoridaDelegate(QStyledItemDelegate):
 class TelaPrincipal(QWidget):
     """Tela principal com lista de alunos"""
     
-    # Definição das cores para fácil manutenção
-    COR_ACOES_PENDENTES = QColor(255, 100, 100)  # Vermelho mais forte
-    COR_FORMADOS = QColor(100, 150, 255)         # Azul mais forte
-    COR_ADIANTADO_ATRASADO = QColor(255, 255, 100) # Amarelo mais forte
+    # Cores definidas no modelo da tabela
+    COR_ACOES_PENDENTES = ModeloAlunos.COR_ACOES_PENDENTES
+    COR_FORMADOS = ModeloAlunos.COR_FORMADOS
+    COR_ADIANTADO_ATRASADO = ModeloAlunos.COR_ADIANTADO_ATRASADO
     
+    @rastreador.medir_acao("abrir_tela_principal")
     def __init__(self, unidade_id: int, unidade_nome: str, instrutor_id: int, instrutor_nome: str):
         super().__init__()
         self.unidade_id = unidade_id
@@ -87,10 +92,38 @@ class TelaPrincipal(QWidget):
         self.alunos = []
         self.mostrar_formados = False  # Estado do botão de mostrar/ocultar formados
         self.settings = QSettings("SistemaGestao", "GestaoAlunos")
+        self._tarefa_lista = None
+        # Nova sincronização pedida enquanto outra estava em andamento
+        self._sincronizacao_pendente = False
+        self._sincronizacao_completa = False
+        # Alunos com alterações recebidas em tempo real, aguardando a rebusca
+        self._alunos_alterados = set()
+        self._tarefa_alteracoes = None
+        # Busca em andamento e termo cujo resultado está sendo aguardado
+        self._tarefa_busca = None
+        self._termo_busca = ""
+        # Aluno selecionado ou sob o mouse, aguardando o pré-carregamento
+        self._aluno_a_pre_carregar = None
+        self._tarefa_pre_carregamento = None
         
         self.init_ui()
         self.restaurar_geometria()
-        self.atualizar_lista()
+        self.atualizar_lista(completa=True)
+        
+        # Alterações feitas por outros instrutores chegam como eventos
+        self._receptor = ReceptorEventos(self)
+        self._receptor.recebido.connect(self.ao_receber_alteracao)
+        self._cancelar_assinatura = db.assinar_alteracoes(self._receptor.entregar)
+        
+        # Registros alterados por leituras e escritas de qualquer tela
+        self._receptor_entidades = ReceptorEventos(self)
+        self._receptor_entidades.recebido.connect(self.ao_alterar_entidades)
+        self._cancelar_entidades = db.entidades.assinar(
+            lambda tabela, ids: self._receptor_entidades.entregar((tabela, ids))
+        )
+        
+        # Edições salvas em segundo plano que o banco recusou (já desfeitas)
+        escritas.falhou.connect(self.exibir_falha_escrita)
         
     def init_ui(self):
         """Inicializa a interface"""
@@ -120,12 +153,35 @@ class TelaPrincipal(QWidget):
         
         layout.addLayout(header_layout)
         
-        # Tabela de alunos
-        self.tabela = QTableWidget()
-        self.tabela.setColumnCount(5)
-        self.tabela.setHorizontalHeaderLabels([
-            "Nome", "Situação", "Observação", "Ações Pendentes", "Instrutor(a)"
-        ])
+        # Campo de busca: consulta só depois de uma pausa na digitação
+        self.campo_busca = QLineEdit()
+        self.campo_busca.setPlaceholderText("Buscar aluno (nome, curso ou observações)...")
+        self.campo_busca.setClearButtonEnabled(True)
+        self.campo_busca.textChanged.connect(self._agendar_busca)
+        self.campo_busca.returnPressed.connect(self.buscar_alunos)
+        layout.addWidget(self.campo_busca)
+        
+        self._timer_busca = QTimer(self)
+        self._timer_busca.setSingleShot(True)
+        self._timer_busca.setInterval(Config.BUSCA_ATRASO_MS)
+        self._timer_busca.timeout.connect(self.buscar_alunos)
+        
+        # Tabela de alunos (model/view: só as linhas visíveis são desenhadas).
+        # Os resultados da busca ficam em um modelo próprio, trocado na tabela,
+        # para que a lista completa continue recebendo a sincronização.
+        self.modelo = ModeloAlunos(self)
+        self.modelo_busca = ModeloAlunos(self)
+        self.tabela = QTableView()
+        self.tabela.setModel(self.modelo)
+        
+        # Pré-carrega o aluno selecionado ou sob o mouse (ver pre_carregar_aluno)
+        self._timer_pre_carregamento = QTimer(self)
+        self._timer_pre_carregamento.setSingleShot(True)
+        self._timer_pre_carregamento.setInterval(Config.PRE_CARREGAMENTO_ATRASO_MS)
+        self._timer_pre_carregamento.timeout.connect(self._pre_carregar)
+        self.tabela.setMouseTracking(True)
+        self.tabela.entered.connect(self._agendar_pre_carregamento)
+        self.tabela.selectionModel().currentRowChanged.connect(self._agendar_pre_carregamento)
         
         # Configurações da tabela
         self.tabela.setSelectionBehavior(QAbstractItemView.SelectRows)
@@ -133,17 +189,14 @@ class TelaPrincipal(QWidget):
         self.tabela.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.tabela.setAlternatingRowColors(True)
         self.tabela.verticalHeader().setVisible(False)
+        # Altura fixa evita medir cada linha ao recarregar o modelo
+        self.tabela.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
         
         # Aplica o delegate personalizado
         self.tabela.setItemDelegate(LinhaColoridaDelegate(self.tabela))
         
         # Ajustar colunas
-        header = self.tabela.horizontalHeader()
-        header.setSectionResizeMode(0, QHeaderView.Stretch)  # Nome
-        header.setSectionResizeMode(1, QHeaderView.ResizeToContents)  # Situação
-        header.setSectionResizeMode(2, QHeaderView.Stretch)  # Observação
-        header.setSectionResizeMode(3, QHeaderView.ResizeToContents)  # Ações Pendentes
-        header.setSectionResizeMode(4, QHeaderView.ResizeToContents)  # Instrutor
+        self._ajustar_colunas()
         
         layout.addWidget(self.tabela)
         
@@ -169,7 +222,7 @@ class TelaPrincipal(QWidget):
         botoes_layout.addWidget(self.btn_arquivados)
         
         btn_atualizar = QPushButton("Atualizar Lista")
-        btn_atualizar.clicked.connect(self.atualizar_lista)
+        btn_atualizar.clicked.connect(lambda: self.atualizar_lista())
         botoes_layout.addWidget(btn_atualizar)
         
         btn_logs = QPushButton("Ver Log")
@@ -177,6 +230,11 @@ class TelaPrincipal(QWidget):
         btn_logs.clicked.connect(self.ver_logs)
         botoes_layout.addWidget(btn_logs)
         
+        btn_diagnostico = QPushButton("Diagnóstico")
+        aplicar_classe_botao(btn_diagnostico, "secondary")
+        btn_diagnostico.clicked.connect(self.ver_diagnostico)
+        botoes_layout.addWidget(btn_diagnostico)
+        
         layout.addLayout(botoes_layout)
         
         # Label de status
@@ -186,71 +244,296 @@ class TelaPrincipal(QWidget):
         
         self.setLayout(layout)
         
-    def atualizar_lista(self):
-        """Atualiza a lista de alunos"""
-        self.alunos = db.listar_alunos(self.unidade_id, incluir_arquivados=self.mostrar_formados)
+    def _ajustar_colunas(self):
+        """Define o redimensionamento das colunas (refeito ao trocar o modelo da tabela)"""
+        header = self.tabela.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.Stretch)  # Nome
+        header.setSectionResizeMode(1, QHeaderView.ResizeToContents)  # Situação
+        header.setSectionResizeMode(2, QHeaderView.Stretch)  # Observação
+        header.setSectionResizeMode(3, QHeaderView.ResizeToContents)  # Ações Pendentes
+        header.setSectionResizeMode(4, QHeaderView.ResizeToContents)  # Instrutor
+        # Limita quantas linhas são medidas pelo ajuste automático das colunas
+        header.setResizeContentsPrecision(200)
+        
+    @rastreador.medir_acao("atualizar_lista")
+    def atualizar_lista(self, completa: bool = False):
+        """
+        Sincroniza a lista de alunos em segundo plano
+        
+        Busca apenas o que mudou desde a última sincronização; com
+        completa=True a lista inteira é recarregada.
+        """
+        if self._tarefa_lista:
+            # As sincronizações são sequenciais: repete ao terminar a atual
+            self._sincronizacao_pendente = True
+            self._sincronizacao_completa = self._sincronizacao_completa or completa
+            return
         
-        self.tabela.setRowCount(0)
+        if completa:
+            self.label_status.setText("Carregando alunos...")
+        
+        self._tarefa_lista = executor.executar(
+            db.sincronizar_alunos,
+            self.unidade_id,
+            incluir_arquivados=self.mostrar_formados,
+            completa=completa,
+            ao_concluir=lambda alteracoes, modo=self.mostrar_formados: self.exibir_alunos(alteracoes, modo),
+            ao_falhar=self.exibir_erro_carregamento,
+            dono=self
+        )
+        
+    def exibir_alunos(self, alteracoes, mostrar_formados: bool):
+        """Aplica ao modelo o resultado de uma sincronização"""
+        self._tarefa_lista = None
+        
+        # Resultado de um modo que já foi trocado: a sincronização pendente resolve
+        if mostrar_formados == self.mostrar_formados:
+            self._aplicar_no_modelo(alteracoes)
+        
+        self._executar_sincronizacao_pendente()
+        self._processar_alteracoes()
+        if self._termo_busca:
+            # Alunos alterados saem do cache da busca: refaz com os dados novos
+            self.buscar_alunos()
+        
+    def _aplicar_no_modelo(self, alteracoes):
+        """Aplica alterações ao modelo mantendo a seleção do usuário"""
+        aluno_selecionado = self.aluno_selecionado()
+        
+        if alteracoes.completa:
+            self.modelo.definir_alunos(alteracoes.alterados)
+        else:
+            self.modelo.aplicar_alteracoes(alteracoes.alterados, alteracoes.removidos)
+        self.alunos = self.modelo.alunos
+        
+        # Manter a seleção do usuário após a atualização
+        if aluno_selecionado:
+            linha = self.modelo.linha_do_aluno(aluno_selecionado['id'])
+            if linha >= 0:
+                self.tabela.selectRow(linha)
+        
+        if not self._termo_busca:
+            self._exibir_total()
+        
+    def _exibir_total(self):
+        """Exibe no status o total de alunos da lista completa"""
+        status = f"Total: {len(self.alunos)} aluno(s)"
+        pendentes = db.escritas_pendentes()
+        if pendentes:
+            status += f" - {pendentes} alteração(ões) aguardando conexão"
+        self.label_status.setText(status)
+        
+    def _executar_sincronizacao_pendente(self):
+        """Inicia a sincronização pedida durante a anterior, se houver"""
+        if self._sincronizacao_pendente:
+            completa = self._sincronizacao_completa
+            self._sincronizacao_pendente = False
+            self._sincronizacao_completa = False
+            self.atualizar_lista(completa=completa)
+        
+    def ao_receber_alteracao(self, evento):
+        """Agenda a rebusca do aluno afetado por uma alteração em tempo real"""
+        if evento.tabela == "alunos":
+            aluno_id = evento.registro_id
+            exibido = self.modelo.linha_do_aluno(aluno_id) >= 0
+            if not exibido and evento.valor('unidade_id') != self.unidade_id:
+                return
+        elif evento.tabela == "acoes":
+            aluno_id = evento.valor('aluno_id')
+            if aluno_id is None or self.modelo.linha_do_aluno(aluno_id) < 0:
+                return
+        else:
+            return
         
-        for aluno in self.alunos:
-            row = self.tabela.rowCount()
-            self.tabela.insertRow(row)
-            
-            # 1. Determinar a cor da linha
-            situacao = aluno.get('situacao_academica', '')
-            acoes_pendentes = db.contar_acoes_pendentes(aluno['id'])
-            
-            cor_linha = None
-            if acoes_pendentes > 0:
-                # Vermelho para ações pendentes (prioridade máxima)
-                cor_linha = self.COR_ACOES_PENDENTES
-            elif situacao == "Formado(a)":
-                # Azul para formados
-                cor_linha = self.COR_FORMADOS
-            elif situacao in ["Atrasado", "Adiantado"]:
-                # Amarelo para atrasado e adiantado
-                cor_linha = self.COR_ADIANTADO_ATRASADO
-            
-            # 2. Criar e configurar os itens da tabela
-            
-            # Nome (Coluna 0) - Armazena a cor de fundo e o ID do aluno
-            item_nome = QTableWidgetItem(aluno['nome'])
-            item_nome.setData(Qt.UserRole, aluno['id'])
-            if cor_linha:
-                # A cor é definida apenas no primeiro item (coluna 0)
-                # O delegate usará essa cor para pintar a linha inteira
-                item_nome.setData(Qt.BackgroundRole, cor_linha)
-            self.tabela.setItem(row, 0, item_nome)
-            
-            # Situação (Coluna 1)
-            item_situacao = QTableWidgetItem(situacao)
-            self.tabela.setItem(row, 1, item_situacao)
-            
-            # Observação (Coluna 2)
-            obs = truncar_texto(aluno.get('observacoes', ''), 50)
-            item_obs = QTableWidgetItem(obs)
-            self.tabela.setItem(row, 2, item_obs)
-            
-            # Ações Pendentes (Coluna 3)
-            item_acoes = QTableWidgetItem(str(acoes_pendentes))
-            self.tabela.setItem(row, 3, item_acoes)
-            
-            # Instrutor (Coluna 4)
-            instrutor_nome = ""
-            if aluno.get('instrutores'):
-                instrutor_nome = aluno['instrutores'].get('nome', '')
-            item_instrutor = QTableWidgetItem(instrutor_nome)
-            self.tabela.setItem(row, 4, item_instrutor)
-            
-            # 3. Aplicar a cor do texto (opcional, para melhor contraste)
-            # Se a cor de fundo for muito escura, podemos mudar a cor do texto para branco.
-            if cor_linha and cor_linha in [self.COR_ACOES_PENDENTES, self.COR_FORMADOS]:
-                for col in range(self.tabela.columnCount()):
-                    item = self.tabela.item(row, col)
-                    if item:
-                        item.setForeground(QColor(255, 255, 255)) # Texto branco
+        self._alunos_alterados.add(aluno_id)
+        self._processar_alteracoes()
         
-        self.label_status.setText(f"Total: {len(self.alunos)} aluno(s)")
+    def ao_alterar_entidades(self, alteracao):
+        """Reflete nas tabelas os alunos alterados no armazém de entidades"""
+        tabela, ids = alteracao
+        if tabela == "instrutores":
+            # Nomes resolvidos localmente: basta redesenhar
+            self.tabela.viewport().update()
+            return
+        if tabela != "alunos":
+            return
+        
+        alterados, removidos = [], []
+        for aluno_id in ids:
+            aluno = db.entidades.obter("alunos", aluno_id)
+            if aluno is None or 'nome' not in aluno:
+                continue
+            visivel = (aluno.get('unidade_id') == self.unidade_id
+                       and (self.mostrar_formados or not aluno.get('arquivado')))
+            if visivel:
+                alterados.append(aluno)
+            elif self.modelo.linha_do_aluno(aluno_id) >= 0:
+                removidos.append(aluno_id)
+        if alterados or removidos:
+            self._aplicar_no_modelo(Alteracoes(alterados, removidos, False))
+        # A busca mantém a ordem de relevância: só redesenha as linhas
+        self.modelo_busca.atualizar_linhas(ids)
+        
+    def exibir_falha_escrita(self, descricao: str, mensagem: str):
+        """Avisa, sem bloquear a tela, que uma edição foi desfeita"""
+        aviso = QMessageBox(
+            QMessageBox.Warning,
+            "Alteração desfeita",
+            f"{descricao}: não foi possível salvar e a alteração foi desfeita.\n\n{mensagem}",
+            QMessageBox.Ok,
+            self
+        )
+        aviso.setAttribute(Qt.WA_DeleteOnClose)
+        aviso.setModal(False)
+        aviso.show()
+        
+    def _processar_alteracoes(self):
+        """Rebusca em segundo plano os alunos alterados (uma requisição por lote)"""
+        if not self._alunos_alterados or self._tarefa_alteracoes or self._tarefa_lista:
+            # Ao terminar, a tarefa em andamento chama este método de novo
+            return
+        
+        if len(self._alunos_alterados) > 100:
+            # Muitas alterações de uma vez: a sincronização incremental é mais barata
+            self._alunos_alterados.clear()
+            self.atualizar_lista()
+            return
+        
+        aluno_ids = list(self._alunos_alterados)
+        self._alunos_alterados.clear()
+        self._tarefa_alteracoes = executor.executar(
+            db.atualizar_alunos_sincronizados,
+            self.unidade_id,
+            self.mostrar_formados,
+            aluno_ids,
+            ao_concluir=lambda alteracoes, modo=self.mostrar_formados: self._exibir_alteracoes(alteracoes, modo),
+            ao_falhar=self._falha_alteracoes,
+            dono=self
+        )
+        
+    def _exibir_alteracoes(self, alteracoes, mostrar_formados: bool):
+        """Aplica ao modelo os alunos rebuscados após eventos em tempo real"""
+        self._tarefa_alteracoes = None
+        if mostrar_formados == self.mostrar_formados:
+            self._aplicar_no_modelo(alteracoes)
+        self._processar_alteracoes()
+        
+    def _falha_alteracoes(self, mensagem: str):
+        """Sem conexão para rebuscar: a próxima sincronização traz as alterações"""
+        self._tarefa_alteracoes = None
+        print(f"Erro ao aplicar alterações em tempo real: {mensagem}")
+        
+    def _agendar_busca(self):
+        """Reinicia a espera a cada tecla: só o termo final é consultado"""
+        self._timer_busca.start()
+        
+    @rastreador.medir_acao("buscar_alunos")
+    def buscar_alunos(self):
+        """Busca em segundo plano os alunos que correspondem ao texto digitado"""
+        self._timer_busca.stop()
+        if self._tarefa_busca:
+            # O resultado do termo anterior não interessa mais
+            self._tarefa_busca.cancelar()
+            self._tarefa_busca = None
+        
+        termo = self.campo_busca.text().strip()
+        if len(termo) < Config.BUSCA_MIN_CARACTERES:
+            self._encerrar_busca()
+            return
+        
+        self._termo_busca = termo
+        self.label_status.setText("Buscando alunos...")
+        self._tarefa_busca = executor.executar(
+            db.consultar,
+            db.buscar_alunos,
+            self.unidade_id,
+            termo,
+            incluir_arquivados=self.mostrar_formados,
+            ao_concluir=lambda alunos, termo=termo: self.exibir_busca(alunos, termo),
+            ao_falhar=self.exibir_erro_busca,
+            dono=self
+        )
+        
+    def exibir_busca(self, alunos, termo: str):
+        """Exibe os alunos encontrados, do mais relevante para o menos"""
+        if termo != self._termo_busca:
+            return
+        self._tarefa_busca = None
+        
+        aluno_selecionado = self.aluno_selecionado()
+        self.modelo_busca.definir_alunos(alunos)
+        if self.tabela.model() is not self.modelo_busca:
+            self._trocar_modelo(self.modelo_busca)
+        if aluno_selecionado:
+            linha = self.modelo_busca.linha_do_aluno(aluno_selecionado['id'])
+            if linha >= 0:
+                self.tabela.selectRow(linha)
+        
+        self.label_status.setText(f"{len(alunos)} aluno(s) encontrado(s) para \"{termo}\"")
+        
+    def exibir_erro_busca(self, mensagem: str):
+        """Exibe o erro de uma busca em segundo plano"""
+        self._tarefa_busca = None
+        self.label_status.setText(f"Erro ao buscar alunos: {mensagem}")
+        
+    def _encerrar_busca(self):
+        """Volta a exibir a lista completa de alunos"""
+        if not self._termo_busca:
+            return
+        self._termo_busca = ""
+        if self.tabela.model() is not self.modelo:
+            self._trocar_modelo(self.modelo)
+        self.modelo_busca.definir_alunos([])
+        self._exibir_total()
+        
+    def _trocar_modelo(self, modelo: ModeloAlunos):
+        """Exibe outro modelo na tabela (lista completa ou resultado da busca)"""
+        self.tabela.setModel(modelo)
+        self._ajustar_colunas()
+        self.tabela.selectionModel().currentRowChanged.connect(self._agendar_pre_carregamento)
+        
+    def _agendar_pre_carregamento(self, indice: QModelIndex):
+        """Pré-carrega o aluno da linha se a seleção ou o mouse parar nela"""
+        if not indice.isValid():
+            return
+        aluno = self.tabela.model().aluno(indice.row())
+        if aluno:
+            self._aluno_a_pre_carregar = aluno['id']
+            self._timer_pre_carregamento.start()
+        
+    def _pre_carregar(self):
+        """Lê em segundo plano o cadastro e as ações do aluno agendado"""
+        if self._tarefa_pre_carregamento or self._aluno_a_pre_carregar is None:
+            # Ao terminar, a tarefa em andamento chama este método de novo
+            return
+        aluno_id = self._aluno_a_pre_carregar
+        self._tarefa_pre_carregamento = executor.executar(
+            db.pre_carregar_aluno,
+            aluno_id,
+            ao_concluir=lambda _, aluno_id=aluno_id: self._fim_pre_carregamento(aluno_id),
+            ao_falhar=lambda _, aluno_id=aluno_id: self._fim_pre_carregamento(aluno_id),
+            dono=self
+        )
+        
+    def _fim_pre_carregamento(self, aluno_id: int):
+        """Passa ao próximo aluno, se a seleção mudou durante a leitura"""
+        self._tarefa_pre_carregamento = None
+        if self._aluno_a_pre_carregar != aluno_id:
+            self._pre_carregar()
+        
+    def aluno_selecionado(self):
+        """Retorna o aluno da linha selecionada (ou None)"""
+        indice = self.tabela.currentIndex()
+        if not indice.isValid():
+            return None
+        return self.tabela.model().aluno(indice.row())
+        
+    def exibir_erro_carregamento(self, mensagem: str):
+        """Exibe o erro de uma consulta em segundo plano"""
+        self._tarefa_lista = None
+        self.label_status.setText(f"Erro ao carregar alunos: {mensagem}")
+        self._executar_sincronizacao_pendente()
+        self._processar_alteracoes()
         
     def adicionar_aluno(self):
         """Abre o dialog para adicionar um novo aluno"""
@@ -260,35 +543,35 @@ class TelaPrincipal(QWidget):
             
     def editar_aluno(self):
         """Abre o dialog para editar o aluno selecionado"""
-        linha_selecionada = self.tabela.currentRow()
+        aluno = self.aluno_selecionado()
         
-        if linha_selecionada < 0:
+        if not aluno:
             QMessageBox.warning(self, "Atenção", "Selecione um aluno para editar")
             return
         
-        aluno_id = self.tabela.item(linha_selecionada, 0).data(Qt.UserRole)
+        aluno_id = aluno['id']
         
+        # A linha é atualizada pelo armazém de entidades ao salvar
         dialog = DialogAluno(self.unidade_id, self.instrutor_id, aluno_id, parent=self)
-        if dialog.exec() == DialogAluno.Accepted:
-            self.atualizar_lista()
+        dialog.exec()
             
     def gerenciar_acoes(self):
         """Abre o dialog para gerenciar ações do aluno selecionado"""
-        linha_selecionada = self.tabela.currentRow()
+        aluno = self.aluno_selecionado()
         
-        if linha_selecionada < 0:
+        if not aluno:
             QMessageBox.warning(self, "Atenção", "Selecione um aluno para gerenciar ações")
             return
         
-        aluno_id = self.tabela.item(linha_selecionada, 0).data(Qt.UserRole)
-        aluno_nome = self.tabela.item(linha_selecionada, 0).text()
+        aluno_id = aluno['id']
+        aluno_nome = aluno['nome']
         
         # Importar aqui para evitar importação circular
         from ui.dialog_acoes import DialogAcoes
         
+        # A contagem de pendências é atualizada pelo armazém de entidades
         dialog = DialogAcoes(aluno_id, aluno_nome, self.instrutor_id, self.unidade_id, parent=self)
-        if dialog.exec() == DialogAcoes.Accepted:
-            self.atualizar_lista()
+        dialog.exec()
             
     def alternar_formados(self):
         """Alterna entre mostrar e ocultar alunos formados"""
@@ -299,7 +582,9 @@ class TelaPrincipal(QWidget):
         else:
             self.btn_arquivados.setText("Mostrar Formados(a)")
         
-        self.atualizar_lista()
+        self.atualizar_lista(completa=True)
+        if self._termo_busca:
+            self.buscar_alunos()
             
     def ver_logs(self):
         """Abre o dialog para ver os logs"""
@@ -309,8 +594,18 @@ class TelaPrincipal(QWidget):
         dialog = DialogLogs(self.unidade_id, parent=self)
         dialog.exec()
         
+    def ver_diagnostico(self):
+        """Abre o dialog com o tempo das consultas ao banco"""
+        from ui.dialog_diagnostico import DialogDiagnostico
+        
+        dialog = DialogDiagnostico(parent=self)
+        dialog.exec()
+        
     def closeEvent(self, event):
         """Salva a geometria da janela ao fechar"""
+        self._cancelar_assinatura()
+        self._cancelar_entidades()
+        escritas.falhou.disconnect(self.exibir_falha_escrita)
         self.salvar_geometria()
         super().closeEvent(event)
         
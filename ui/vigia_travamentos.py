@@ -0,0 +1,220 @@
+"""
+Vigia de Travamentos
+Detecta pausas do event loop do Qt maiores que um limite e grava um
+relatório com a pilha da thread principal, o slot e o método do banco
+que estavam em execução durante o travamento
+"""
+
+from typing import Optional, List, Tuple, NamedTuple
+from collections import Counter
+from datetime import datetime
+from PySide6.QtCore import QObject, QTimer
+from config import Config
+import linecache
+import os
+import sys
+import threading
+import time
+
+
+# Raiz do projeto: só os quadros de arquivos daqui identificam slots
+RAIZ_PROJETO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Envoltórios que aparecem entre o Qt e o slot de verdade
+ARQUIVOS_IGNORADOS = {
+    os.path.join(RAIZ_PROJETO, nome) for nome in (
+        "rastreio_requisicoes.py", "diagnostico.py",
+        os.path.join("ui", "executor.py"), os.path.join("ui", "vigia_travamentos.py"),
+    )
+}
+ARQUIVO_BANCO = os.path.join(RAIZ_PROJETO, "database.py")
+
+# Travamentos mais longos que isso são relatados antes de terminar
+# (um travamento definitivo nunca terminaria)
+RELATAR_APOS_SEGUNDOS = 10.0
+
+
+class Quadro(NamedTuple):
+    """Um quadro da pilha (do mais externo para o mais interno)"""
+
+    arquivo: str
+    linha: int
+    funcao: str
+
+    def local(self) -> str:
+        return f"{os.path.relpath(self.arquivo, RAIZ_PROJETO)}:{self.linha}"
+
+
+def capturar_pilha(thread_id: int) -> List[Quadro]:
+    """Pilha atual de outra thread, do quadro mais externo ao mais interno"""
+    quadro = sys._current_frames().get(thread_id)
+    pilha = []
+    while quadro is not None:
+        codigo = quadro.f_code
+        funcao = getattr(codigo, "co_qualname", codigo.co_name)
+        pilha.append(Quadro(os.path.abspath(codigo.co_filename), quadro.f_lineno, funcao))
+        quadro = quadro.f_back
+    pilha.reverse()
+    return pilha
+
+
+def atribuir(pilha: List[Quadro]) -> Tuple[Optional[Quadro], Optional[Quadro]]:
+    """
+    Identifica o slot e o método do banco em uma pilha da thread principal
+
+    O slot é o primeiro quadro do projeto depois do último exec() (event
+    loop principal ou de um dialog modal) fora da camada de dados; o método
+    do banco é o método do DatabaseManager mais externo na pilha.
+
+    Returns:
+        tuple: (slot, metodo_banco), cada um None se não encontrado
+    """
+    inicio = 0
+    for indice, quadro in enumerate(pilha):
+        if ".exec(" in linecache.getline(quadro.arquivo, quadro.linha):
+            inicio = indice + 1
+
+    candidatos = [
+        quadro for quadro in pilha[inicio:]
+        if quadro.arquivo.startswith(RAIZ_PROJETO)
+        and quadro.arquivo not in ARQUIVOS_IGNORADOS and quadro.arquivo != ARQUIVO_BANCO
+    ]
+    # Um lambda conectado ao signal só repassa a chamada ao método que interessa
+    slot = next((q for q in candidatos if not q.funcao.endswith("<lambda>")), None)
+    if slot is None and candidatos:
+        slot = candidatos[0]
+    banco = next((
+        quadro for quadro in pilha
+        if quadro.arquivo == ARQUIVO_BANCO and quadro.funcao.startswith("DatabaseManager.")
+    ), None)
+    return slot, banco
+
+
+class VigiaTravamentos(QObject):
+    """
+    Vigia do event loop do Qt
+
+    Um QTimer na thread da interface marca um batimento a cada intervalo;
+    uma thread comum confere os batimentos e, quando eles param por mais
+    que o limite, amostra a pilha da thread principal até o event loop
+    voltar. O relatório é acrescentado ao arquivo configurado.
+
+    Pausas em código C que segura o GIL (sem liberar para outras threads)
+    só são amostradas quando o GIL é liberado.
+    """
+
+    def __init__(self, limite_ms: int, arquivo: str, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.limite = limite_ms / 1000
+        self.arquivo = arquivo
+        self.intervalo = min(0.05, self.limite / 2)
+        self.thread_principal = threading.main_thread().ident
+        self.travamentos = 0
+        self._ultimo_batimento = time.monotonic()
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._timer = QTimer(self)
+        self._timer.setInterval(int(self.intervalo * 1000))
+        self._timer.timeout.connect(self._batimento)
+
+    def iniciar(self):
+        """Começa a vigiar (chamar na thread da interface)"""
+        self._ultimo_batimento = time.monotonic()
+        self._timer.start()
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._vigiar, name="VigiaTravamentos", daemon=True)
+        self._thread.start()
+
+    def parar(self):
+        """Para de vigiar"""
+        self._timer.stop()
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def _batimento(self):
+        self._ultimo_batimento = time.monotonic()
+
+    def _vigiar(self):
+        """Laço da thread de vigia"""
+        amostras: List[List[Quadro]] = []
+        inicio = 0.0
+        relatado = False
+        while not self._parar.wait(self.intervalo):
+            ultimo = self._ultimo_batimento
+            # O timer pode atrasar até um intervalo sem que haja travamento
+            travado = time.monotonic() - ultimo - self.intervalo > self.limite
+
+            if travado:
+                if not amostras:
+                    inicio = ultimo
+                    relatado = False
+                amostras.append(capturar_pilha(self.thread_principal))
+                if not relatado and time.monotonic() - inicio > RELATAR_APOS_SEGUNDOS:
+                    self._relatar(time.monotonic() - inicio, amostras, em_andamento=True)
+                    relatado = True
+            elif amostras:
+                self._relatar(ultimo - inicio - self.intervalo, amostras, em_andamento=False)
+                amostras = []
+
+    def _relatar(self, duracao: float, amostras: List[List[Quadro]], em_andamento: bool):
+        """Grava o relatório de um travamento"""
+        self.travamentos += 1
+        # Agrupadas por função (a linha muda de uma amostra para outra)
+        atribuidas = [(atribuir(pilha), pilha) for pilha in amostras]
+        atribuicoes = Counter(self._chave(atribuicao) for atribuicao, _ in atribuidas)
+        mais_frequente, _ = atribuicoes.most_common(1)[0]
+        # Pilha mais representativa: a última amostra com a atribuição mais frequente
+        (slot, banco), pilha = next(
+            item for item in reversed(atribuidas) if self._chave(item[0]) == mais_frequente
+        )
+
+        titulo = f"Travamento de {duracao * 1000:.0f} ms"
+        if em_andamento:
+            titulo = f"Travamento em andamento há {duracao * 1000:.0f} ms"
+        linhas = [
+            f"=== {titulo} em {datetime.now().isoformat(timespec='seconds')} ===",
+            f"Slot: {self._descrever(slot, 'nenhum slot Python (tempo gasto dentro do Qt)')}",
+            f"Banco: {self._descrever(banco, 'nenhuma chamada ao banco')}",
+            f"Amostras: {len(amostras)} (a cada {self.intervalo * 1000:.0f} ms)",
+        ]
+        for (funcao_slot, funcao_banco), quantidade in atribuicoes.most_common():
+            linhas.append(f"  {quantidade:4d}x {funcao_slot} -> {funcao_banco}")
+        linhas.append("Pilha da thread principal:")
+        for quadro in pilha:
+            linhas.append(f'  File "{quadro.arquivo}", line {quadro.linha}, in {quadro.funcao}')
+            codigo = linecache.getline(quadro.arquivo, quadro.linha).strip()
+            if codigo:
+                linhas.append(f"    {codigo}")
+        relatorio = "\n".join(linhas) + "\n\n"
+
+        print(f"{titulo}: {self._descrever(slot, '-')} -> {self._descrever(banco, '-')} (ver {self.arquivo})")
+        try:
+            with open(self.arquivo, "a", encoding="utf-8") as f:
+                f.write(relatorio)
+        except OSError as e:
+            print(f"Erro ao gravar relatório de travamento: {e}")
+
+    @staticmethod
+    def _chave(atribuicao: Tuple[Optional[Quadro], Optional[Quadro]]) -> Tuple[str, str]:
+        slot, banco = atribuicao
+        return (slot.funcao if slot else "-", banco.funcao if banco else "-")
+
+    @staticmethod
+    def _descrever(quadro: Optional[Quadro], padrao: str) -> str:
+        return f"{quadro.funcao} ({quadro.local()})" if quadro else padrao
+
+
+def iniciar_vigia(parent: Optional[QObject] = None) -> Optional[VigiaTravamentos]:
+    """
+    Inicia o vigia se VIGIA_TRAVAMENTOS_MS estiver configurado
+
+    Returns:
+        VigiaTravamentos ou None se desativado
+    """
+    if Config.VIGIA_TRAVAMENTOS_MS <= 0:
+        return None
+    vigia = VigiaTravamentos(Config.VIGIA_TRAVAMENTOS_MS, Config.VIGIA_ARQUIVO, parent)
+    vigia.iniciar()
+    return vigia